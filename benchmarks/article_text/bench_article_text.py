@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+本文抽出のベンチマーク
+
+fixtures/*.html について、旧実装（ページ全体の get_text から空白を全削除）と
+本文抽出（定型要素除去・空白正規化・トークン上限）を比較し、
+記事ごとのトークン削減量と抽出スループットを表示する。
+
+    python benchmarks/article_text/bench_article_text.py --budget 3000
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs"))
+
+from bs4 import BeautifulSoup
+from common.article_text import extract_article_text
+from common.tokens import count_tokens, truncate_to_token_budget
+
+
+# -- 旧実装 --------------
+def legacy_extract(html: bytes) -> str:
+    article_text = BeautifulSoup(html, "html.parser").get_text()
+    for char in ["\n", "\t", "\r", " "]:
+        article_text = article_text.replace(char, "")
+    return article_text.strip()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--budget", type=int, default=3000, help="LLM入力のトークン上限")
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(BENCH_DIR, "fixtures", "*.html")))
+    pages = {os.path.basename(path): open(path, "rb").read() for path in paths}
+
+    total_legacy = total_new = 0
+    print(f"{'fixture':<24}{'旧トークン':>10}{'新トークン':>10}{'削減率':>8}  先頭")
+    for name, html in pages.items():
+        legacy_tokens = count_tokens(legacy_extract(html))
+        text = truncate_to_token_budget(extract_article_text(BeautifulSoup(html, "html.parser")), args.budget)
+        new_tokens = count_tokens(text)
+        total_legacy += legacy_tokens
+        total_new += new_tokens
+        saved = 1 - new_tokens / legacy_tokens if legacy_tokens else 0.0
+        preview = text[:30].replace("\n", " ")
+        print(f"{name:<24}{legacy_tokens:>12}{new_tokens:>12}{saved:>9.1%}  {preview}")
+
+    print(f"\n合計: {total_legacy} → {total_new} トークン "
+          f"（1記事あたり {(total_legacy - total_new) / len(pages):.0f} トークン削減）")
+
+    # 抽出スループット
+    started_at = time.perf_counter()
+    for _ in range(args.iterations):
+        for html in pages.values():
+            extract_article_text(BeautifulSoup(html, "html.parser"))
+    elapsed = time.perf_counter() - started_at
+    total_bytes = sum(len(html) for html in pages.values()) * args.iterations
+    print(f"抽出スループット: {args.iterations * len(pages) / elapsed:.1f}ページ/秒 "
+          f"({total_bytes / elapsed / 1024 / 1024:.2f}MB/秒, パース込み)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+metadata-generator の Batch APIモードの検証
+
+スタブのOpenAI互換サーバ（/v1/files, /v1/batches）に対して、リクエストJSONLの作成 → 投入 →
+ポーリング → 出力JSONLの解析までを実行し、同期モードと比べたHTTPリクエスト数と結果件数を表示する。
+DBへの反映（llm_batches / articles）は含まない。
+
+    python benchmarks/batch_mode/bench_batch_mode.py --articles 200 --error-rate 0.05 --batch-delay 2
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "stub_openai"))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs", "metadata-generator"))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs"))
+
+from stub_openai_server import start_server
+
+
+SAMPLE_TEXT = "TSMCは熊本県に第2工場を建設し、2027年の量産開始を目指すと発表した。" * 20
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--articles", type=int, default=200)
+    arg_parser.add_argument("--error-rate", type=float, default=0.05)
+    arg_parser.add_argument("--batch-delay", type=float, default=2.0)
+    arg_parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = arg_parser.parse_args()
+
+    server, state = start_server(error_rate=args.error_rate, batch_delay=args.batch_delay)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    from openai import OpenAI
+    from llm_batch import TERMINAL_STATUSES, build_batch_request, download_batch_results, submit_batch
+
+    client = OpenAI(api_key="stub", base_url=base_url)
+    article_ids = [f"00000000-0000-0000-0000-{index:012d}" for index in range(args.articles)]
+
+    # 投入
+    started_at = time.perf_counter()
+    batch = submit_batch(client, [build_batch_request(article_id, SAMPLE_TEXT) for article_id in article_ids])
+    print(f"投入: {batch.id} ({args.articles}件, {batch.status})")
+
+    # ポーリング
+    polls = 0
+    while batch.status not in TERMINAL_STATUSES:
+        time.sleep(args.poll_interval)
+        batch = client.batches.retrieve(batch.id)
+        polls += 1
+
+    # 結果の解析
+    results = download_batch_results(client, batch)
+    elapsed = time.perf_counter() - started_at
+
+    missing = set(article_ids) - set(results)
+    counts = batch.request_counts
+    http_requests = sum(state.snapshot()["requests"].values())
+    print(f"状態: {batch.status} ({counts.completed}件完了, {counts.failed}件失敗), ポーリング{polls}回")
+    print(f"結果: {len(results)}件解析, {len(missing)}件は結果なし（未処理に戻す対象）")
+    print(f"HTTPリクエスト: {http_requests}回（同期モードでは最低{args.articles}回）, {elapsed:.1f}秒")
+
+    assert len(results) + len(missing) == args.articles
+    assert all(summary and tags for summary, tags in results.values())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
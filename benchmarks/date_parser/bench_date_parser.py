@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+日付パーサのコーパス検証とベンチマーク
+
+corpus.tsv の各文字列について、ローカルパーサの結果を期待値と照合し、
+パース率・旧実装（dateutilのみ）比で削減できたLLM呼び出し数・処理速度を表示する。
+期待値と異なる結果があれば終了コード1で終了する。
+"""
+import os
+import sys
+import time
+import warnings
+from dateutil import parser as dateparser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "jobs", "rss-collector"))
+
+from bs4 import BeautifulSoup
+from date_extractor import DateCache, DateParseStats, extract_date_candidates, parse_date_string, resolve_date
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.tsv")
+
+# 候補抽出の検証用HTML（HTML, 期待する先頭候補のパース結果）
+HTML_CASES = [
+    ('<script type="application/ld+json">{"@graph": [{"@type": "NewsArticle", "datePublished": "2025-12-16T09:00:00+09:00"}]}</script>'
+     '<time>昨日</time>', "2025-12-16"),
+    ('<meta property="article:published_time" content="2025-12-15T23:00:00Z">'
+     '<meta property="article:modified_time" content="2025-12-17T00:00:00Z">', "2025-12-15"),
+    ('<time datetime="2025-12-14">12月14日</time>', "2025-12-14"),
+    ('<div class="article-date">2025年12月13日 10:00 公開</div>', "2025-12-13"),
+]
+
+
+# -- コーパス読み込み --------------
+def load_corpus(path: str) -> list[tuple[str, str | None]]:
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            raw, _, expected = line.rstrip("\n").partition("\t")
+            corpus.append((raw, expected or None))
+    return corpus
+
+
+# -- 旧実装（YYYY-MM-DD一致 → dateutil） --------------
+def legacy_parse(raw: str) -> str | None:
+    warnings.simplefilter("ignore")
+    try:
+        parsed = dateparser.parse(raw, fuzzy=True)
+        return parsed.strftime("%Y-%m-%d") if parsed else None
+    except (ValueError, OverflowError):
+        return None
+
+
+def main():
+    corpus = load_corpus(CORPUS_PATH)
+    failures = []
+
+    # 文字列単位の照合
+    resolved = 0
+    avoided = 0
+    for raw, expected in corpus:
+        parsed, method = parse_date_string(raw)
+        if parsed != expected:
+            failures.append(f"  {raw!r}: 期待値 {expected}, 結果 {parsed} ({method})")
+        if parsed:
+            resolved += 1
+            # 旧実装では誤変換またはLLM行きだった文字列
+            if legacy_parse(raw) != expected:
+                avoided += 1
+
+    # HTMLからの候補抽出
+    for html, expected in HTML_CASES:
+        candidates = extract_date_candidates(BeautifulSoup(html, "html.parser"))
+        parsed, _ = parse_date_string(candidates[0]) if candidates else (None, "none")
+        if parsed != expected:
+            failures.append(f"  HTML {html[:40]!r}...: 期待値 {expected}, 候補 {candidates}")
+
+    # キャッシュ経由でLLMが文字列ごとに最大1回であること
+    llm_calls = []
+    cache = DateCache()
+    stats = DateParseStats()
+    for _ in range(3):
+        for raw, _ in corpus:
+            resolve_date([raw], cache, stats, lambda text: llm_calls.append(text))
+    unresolved = sum(1 for _, expected in corpus if expected is None)
+    if len(llm_calls) != unresolved:
+        failures.append(f"  LLM呼び出し {len(llm_calls)}回（期待値 {unresolved}回）")
+
+    # LLM呼び出しの失敗はキャッシュせず、次の記事で再試行すること
+    def failing_llm(text):
+        raise ConnectionError("stub")
+    cache = DateCache()
+    stats = DateParseStats()
+    raw = next(raw for raw, expected in corpus if expected is None)
+    resolve_date([raw], cache, stats, failing_llm)
+    if raw in cache or resolve_date([raw], cache, stats, lambda text: "2024-05-01") != "2024-05-01":
+        failures.append(f"  LLM呼び出しの失敗がキャッシュされた: {raw!r}")
+
+    # 処理速度
+    iterations = 2000
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        for raw, _ in corpus:
+            parse_date_string(raw)
+    elapsed = time.perf_counter() - started_at
+    per_second = iterations * len(corpus) / elapsed
+
+    print(f"コーパス: {len(corpus)}件")
+    print(f"ローカルパース率: {resolved}/{len(corpus)} ({resolved / len(corpus):.1%})")
+    print(f"旧実装比で削減したLLM呼び出し・誤変換: {avoided}件")
+    print(f"3周実行時のLLM呼び出し: {len(llm_calls)}回（未解決文字列 {unresolved}件）")
+    print(f"処理速度: {per_second:,.0f}件/秒")
+
+    if failures:
+        print("\n不一致:")
+        print("\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+RSS Collector / Metadata Generator のE2Eベンチマーク（オフライン）
+
+記録済みフィクスチャ（なければ合成フィクスチャ）をリプレイサーバから配信し、スタブのOpenAI互換サーバと
+ローカルのPostgreSQL（docker-compose.yml）に向けて両ジョブを別プロセスで実行する。
+ジョブごとに 記事/秒・記事あたりの所要時間 p50/p95・ピークRSSメモリ・記事あたりのリクエスト数とDB往復回数を表示し、
+保存済みのベースライン（baseline.json）と比較して悪化があれば終了コード1で終了する。
+
+    docker compose -f benchmarks/e2e/docker-compose.yml up -d
+    python benchmarks/e2e/bench_e2e.py --articles-per-feed 20
+    python benchmarks/e2e/bench_e2e.py --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import psycopg2
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DIR = os.path.join(BENCH_DIR, "..", "..", "jobs")
+sys.path.append(os.path.join(BENCH_DIR, "..", "stub_openai"))
+
+from fixtures import FIXTURES_DIR, FixtureStore, synthesize
+from replay_server import start_replay_servers
+from stub_openai_server import start_server as start_stub_openai
+
+
+RSS_FEEDS_PATH = os.path.join(JOBS_DIR, "rss-collector", "rss_feeds.yaml")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# ベンチマーク用DB（docker-compose.yml の既定値）
+DB_ENV = {
+    "DB_HOST": os.environ.get("BENCH_DB_HOST", "127.0.0.1"),
+    "DB_PORT": os.environ.get("BENCH_DB_PORT", "5433"),
+    "DB_NAME": os.environ.get("BENCH_DB_NAME", "semicon_survey"),
+    "DB_USER": os.environ.get("BENCH_DB_USER", "postgres"),
+    "DB_PASSWORD": os.environ.get("BENCH_DB_PASSWORD", "postgres"),
+}
+RESET_TABLES = ["articles", "feed_state", "date_parse_cache", "llm_cache", "llm_batches",
+                "article_minhash", "article_lsh_bands", "tags", "article_tags", "tag_counts", "article_content_archive"]
+
+# ベースライン比較の指標（True: 大きいほど良い）
+METRICS = {
+    "articles_per_sec": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "peak_rss_mb": False,
+    "requests_per_article": False,
+    "db_round_trips_per_article": False,
+}
+
+
+# -- DB初期化 --------------
+def reset_database():
+    conn = psycopg2.connect(host=DB_ENV["DB_HOST"], port=DB_ENV["DB_PORT"], dbname=DB_ENV["DB_NAME"],
+                            user=DB_ENV["DB_USER"], password=DB_ENV["DB_PASSWORD"])
+    cursor = conn.cursor()
+    cursor.execute(f"TRUNCATE {', '.join(RESET_TABLES)} CASCADE")
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+# -- ベンチマーク用のフィード設定（フィードURLをリプレイサーバに向ける） --------------
+def write_rss_config(path: str, store: FixtureStore, bases: dict[str, str], min_delay: float | None):
+    with open(RSS_FEEDS_PATH, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    sources = {}
+    for source_name, source_config in (config.get("sources") or {}).items():
+        feeds = []
+        for feed_config in source_config.get("feeds", []):
+            if feed_config["url"] not in store:
+                continue
+            key = FixtureStore.key(feed_config["url"])
+            host = key.split("/", 1)[0]
+            feeds.append({**feed_config, "url": bases[host] + key[len(host):]})
+        if feeds:
+            sources[source_name] = {**source_config, "feeds": feeds}
+    config["sources"] = sources
+
+    if min_delay is not None:
+        config.setdefault("fetch", {})["min_delay_seconds"] = min_delay
+        for source_config in sources.values():
+            if source_config.get("fetch"):
+                source_config["fetch"]["min_delay_seconds"] = min_delay
+
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+
+
+# -- ジョブ実行（ピークRSSは子プロセスの rusage から取得） --------------
+def run_job(name: str, script: str, env: dict, work_dir: str) -> dict:
+    report_path = os.path.join(work_dir, f"{name}-report.json")
+    log_path = os.path.join(work_dir, f"{name}.log")
+    env = {**env, "RUN_REPORT_PATH": report_path}
+
+    started_at = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen([sys.executable, script], env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started_at
+
+    if process.returncode != 0 or not os.path.exists(report_path):
+        raise RuntimeError(f"{name} が失敗しました（終了コード{process.returncode}）。ログ: {log_path}")
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+
+    # ru_maxrss は Linux では KB、macOS では bytes
+    peak_rss = rusage.ru_maxrss / 1024 if platform.system() != "Darwin" else rusage.ru_maxrss / 1024 / 1024
+    return {"report": report, "elapsed": elapsed, "peak_rss_mb": peak_rss, "log": log_path}
+
+
+def summarize(result: dict, requests: int) -> dict:
+    report = result["report"]
+    articles = report.get("articles") or 0
+    article_stage = report["stages"].get("article", {})
+    per_article = max(articles, 1)
+    return {
+        "articles": articles,
+        "elapsed_seconds": round(result["elapsed"], 2),
+        "articles_per_sec": round(articles / result["elapsed"], 2),
+        "p50_ms": round(article_stage.get("p50_seconds", 0.0) * 1000, 1),
+        "p95_ms": round(article_stage.get("p95_seconds", 0.0) * 1000, 1),
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+        "requests_per_article": round(requests / per_article, 2),
+        "db_round_trips_per_article": round(report["counters"].get("db.round_trips", 0) / per_article, 2),
+    }
+
+
+def print_summary(name: str, summary: dict, request_label: str):
+    print(f"\n[{name}]")
+    print(f"  記事: {summary['articles']}件, {summary['elapsed_seconds']:.1f}秒 ({summary['articles_per_sec']:.2f}記事/秒)")
+    print(f"  記事あたり: p50 {summary['p50_ms']:.0f}ms, p95 {summary['p95_ms']:.0f}ms")
+    print(f"  ピークRSS: {summary['peak_rss_mb']:.1f}MB")
+    print(f"  記事あたり{request_label}: {summary['requests_per_article']:.2f}回, "
+          f"DB往復: {summary['db_round_trips_per_article']:.2f}回")
+
+
+# -- ベースライン比較 --------------
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for job, summary in results.items():
+        base = baseline.get(job)
+        if not base:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            current, previous = summary.get(metric), base.get(metric)
+            if not previous or current is None:
+                continue
+            change = (current - previous) / previous
+            worse = -change if higher_is_better else change
+            mark = "悪化" if worse > tolerance else ""
+            print(f"  {job} {metric}: {previous} -> {current} ({change:+.1%}) {mark}")
+            if mark:
+                regressions.append(f"{job} {metric}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--fixtures", default=FIXTURES_DIR, help="記録済みフィクスチャのディレクトリ")
+    arg_parser.add_argument("--synthetic", action="store_true", help="記録済みフィクスチャがあっても合成フィクスチャを使う")
+    arg_parser.add_argument("--articles-per-feed", type=int, default=20, help="合成フィクスチャの記事数")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="リプレイサーバの応答遅延（秒）")
+    arg_parser.add_argument("--jitter", type=float, default=0.05, help="応答遅延のゆらぎ（秒）")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.3, help="スタブLLMの応答遅延（秒）")
+    arg_parser.add_argument("--min-delay", type=float, default=None, help="同一ホストへのリクエスト間隔を上書き（秒）")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH)
+    arg_parser.add_argument("--update-baseline", action="store_true")
+    arg_parser.add_argument("--tolerance", type=float, default=0.15, help="悪化とみなす変化率")
+    args = arg_parser.parse_args()
+
+    # フィクスチャ・リプレイサーバ・スタブLLM
+    store = None if args.synthetic else FixtureStore.load(args.fixtures)
+    fixture_kind = "記録済み"
+    if store is None:
+        with open(RSS_FEEDS_PATH, "r", encoding="utf-8") as f:
+            sources = (yaml.safe_load(f) or {}).get("sources", {})
+        store = synthesize(sources, args.articles_per_feed)
+        fixture_kind = "合成"
+    servers, replay_state = start_replay_servers(store, args.latency, args.jitter)
+    stub_server, stub_state = start_stub_openai(latency=args.llm_latency)
+    print(f"フィクスチャ: {fixture_kind} {len(store)}件 ({len(store.hosts)}ホスト)")
+
+    reset_database()
+    with tempfile.TemporaryDirectory() as work_dir:
+        rss_config_path = os.path.join(work_dir, "rss_feeds.yaml")
+        write_rss_config(rss_config_path, store, replay_state.bases, args.min_delay)
+        env = {
+            **os.environ,
+            **DB_ENV,
+            "RSS_FEEDS_PATH": rss_config_path,
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_server.server_address[1]}/v1",
+            "OPENAI_API_KEY": "stub",
+            "STRUCTURED_LOGS": "false",
+            # ベースラインと同じ条件（合成記事も全件LLMで処理）で比較する
+            "RELEVANCE_ENABLED": "false",
+        }
+
+        results = {}
+        collector = run_job("rss-collector", os.path.join(JOBS_DIR, "rss-collector", "main.py"), env, work_dir)
+        results["rss-collector"] = summarize(collector, replay_state.total_requests)
+        print_summary("rss-collector", results["rss-collector"], "HTTPリクエスト")
+
+        llm_requests_before = sum(stub_state.snapshot()["requests"].values())
+        generator = run_job("metadata-generator", os.path.join(JOBS_DIR, "metadata-generator", "main.py"), env, work_dir)
+        llm_requests = sum(stub_state.snapshot()["requests"].values()) - llm_requests_before
+        results["metadata-generator"] = summarize(generator, llm_requests)
+        print_summary("metadata-generator", results["metadata-generator"], "LLMリクエスト")
+
+    for server in servers + [stub_server]:
+        server.shutdown()
+
+    config = {"fixtures": fixture_kind, "fixture_count": len(store), "latency": args.latency,
+              "jitter": args.jitter, "llm_latency": args.llm_latency, "min_delay": args.min_delay}
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": config, **results}, f, ensure_ascii=False, indent=2)
+        print(f"\nベースラインを更新: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("\nベースラインなし（--update-baseline で保存）")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"\n注意: ベースラインと条件が異なります: {baseline.get('config')}")
+
+    print(f"\nベースライン比較（許容 {args.tolerance:.0%}）")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n悪化: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n悪化なし")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+E2Eベンチマーク用のフィクスチャ（フィード・記事ページ）
+
+record_fixtures.py で実サイトから記録したものを fixtures/ に保存し、リプレイサーバから配信する。
+記録がない環境では rss_feeds.yaml のフィードURLに対して合成フィクスチャを生成する。
+"""
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import urlsplit
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MANIFEST_NAME = "manifest.json"
+
+
+# -- フィクスチャ --------------
+@dataclass
+class Fixture:
+    status: int
+    content_type: str
+    body: bytes
+
+
+class FixtureStore:
+    """元のURL（スキームを除く host + path?query）ごとの応答"""
+
+    def __init__(self):
+        self.fixtures: dict[str, Fixture] = {}
+
+    @staticmethod
+    def key(url: str) -> str:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        return f"{parts.netloc.lower()}{path}" + (f"?{parts.query}" if parts.query else "")
+
+    def add(self, url: str, fixture: Fixture):
+        self.fixtures[self.key(url)] = fixture
+
+    def get(self, host: str, path: str) -> Fixture | None:
+        return self.fixtures.get(f"{host.lower()}{path}")
+
+    def __contains__(self, url: str) -> bool:
+        return self.key(url) in self.fixtures
+
+    def __len__(self) -> int:
+        return len(self.fixtures)
+
+    @property
+    def hosts(self) -> list[str]:
+        return sorted({key.split("/", 1)[0] for key in self.fixtures})
+
+    # -- 保存・読み込み --------------
+    def save(self, directory: str = FIXTURES_DIR):
+        files_dir = os.path.join(directory, "files")
+        os.makedirs(files_dir, exist_ok=True)
+        entries = []
+        for key, fixture in sorted(self.fixtures.items()):
+            name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+            with open(os.path.join(files_dir, name), "wb") as f:
+                f.write(fixture.body)
+            entries.append({"key": key, "status": fixture.status, "content_type": fixture.content_type, "file": name})
+
+        manifest = {"recorded_at": datetime.now(timezone.utc).isoformat(), "entries": entries}
+        with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str = FIXTURES_DIR) -> "FixtureStore | None":
+        path = os.path.join(directory, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        store = cls()
+        for entry in manifest["entries"]:
+            with open(os.path.join(directory, "files", entry["file"]), "rb") as f:
+                store.fixtures[entry["key"]] = Fixture(entry["status"], entry["content_type"], f.read())
+        return store
+
+
+# -- 合成フィクスチャ --------------
+WORDS = [
+    "半導体", "ファウンドリ", "メモリ", "露光装置", "ウエハー", "量産", "投資", "工場", "熊本", "北海道",
+    "TSMC", "Rapidus", "Samsung", "Intel", "NVIDIA", "キオクシア", "東京エレクトロン", "2nm", "HBM", "EUV",
+    "生成AI", "データセンター", "需要", "供給", "出荷", "前年同期比", "増加", "発表", "計画", "開発",
+]
+BOILERPLATE = "<nav><ul>" + "".join(f"<li><a href='/c/{i}'>カテゴリ{i}</a></li>" for i in range(30)) + "</ul></nav>"
+
+
+def _sentence(rng: random.Random) -> str:
+    return "".join(rng.choice(WORDS) + rng.choice("がをにはのでと") for _ in range(rng.randint(8, 16))) + "。"
+
+
+def _article_html(rng: random.Random, url: str, title: str, published_at: datetime) -> bytes:
+    paragraphs = "".join(f"<p>{''.join(_sentence(rng) for _ in range(4))}</p>" for _ in range(rng.randint(6, 14)))
+    html = (
+        f"<!DOCTYPE html><html lang='ja'><head><meta charset='utf-8'><title>{title}</title>"
+        f"<meta property='article:published_time' content='{published_at.isoformat()}'>"
+        f"<meta property='og:image' content='{url.rsplit('/', 1)[0]}/images/{rng.getrandbits(32):08x}.jpg'>"
+        f"<link rel='canonical' href='{url}'></head><body>{BOILERPLATE}"
+        f"<article><h1>{title}</h1>{paragraphs}</article>"
+        f"<aside>{''.join(f'<a href=/r/{i}>関連記事{i}</a>' for i in range(20))}</aside>"
+        f"<footer>Copyright</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def _rss(title: str, link: str, items: list[tuple[str, str, datetime]]) -> bytes:
+    body = "".join(
+        f"<item><title>{item_title}</title><link>{item_url}</link><guid>{item_url}</guid>"
+        f"<pubDate>{format_datetime(published_at)}</pubDate></item>"
+        for item_title, item_url, published_at in items
+    )
+    return (
+        f"<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel>"
+        f"<title>{title}</title><link>{link}</link>{body}</channel></rss>"
+    ).encode("utf-8")
+
+
+def synthesize(sources: dict, articles_per_feed: int, seed: int = 42) -> FixtureStore:
+    """
+    rss_feeds.yaml の各フィードURLに合成RSSを置き、記事ページを生成する。
+    一部の記事は同じソースの別フィードにも掲載し（フィード間の重複）、一部は404・PDFにする。
+    """
+    rng = random.Random(seed)
+    store = FixtureStore()
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+    for source_index, (source_name, source_config) in enumerate(sources.items()):
+        previous_items: list[tuple[str, str, datetime]] = []
+        for feed_index, feed_config in enumerate(source_config.get("feeds", [])):
+            feed_url = feed_config["url"]
+            origin = f"https://{urlsplit(feed_url).netloc}"
+            items = []
+            for index in range(articles_per_feed):
+                # 20件に1件は同じソースの前のフィードと同じ記事
+                if previous_items and index % 20 == 19:
+                    items.append(rng.choice(previous_items))
+                    continue
+
+                url = f"{origin}/bench/{source_index}/{feed_index}/{index}.html"
+                title = f"{source_name} {rng.choice(WORDS)}{rng.choice(WORDS)}の{rng.choice(WORDS)} ({index})"
+                published_at = now - timedelta(hours=rng.randint(0, 72))
+                items.append((title, url, published_at))
+
+                roll = rng.random()
+                if roll < 0.03:
+                    store.add(url, Fixture(404, "text/html", b"<html><body>Not Found</body></html>"))
+                elif roll < 0.05:
+                    store.add(url, Fixture(200, "application/pdf", b"%PDF-1.7\n" + rng.randbytes(256 * 1024)))
+                else:
+                    store.add(url, Fixture(200, "text/html; charset=utf-8", _article_html(rng, url, title, published_at)))
+
+            store.add(feed_url, Fixture(200, "application/rss+xml; charset=utf-8", _rss(source_name, origin, items)))
+            previous_items = items
+    return store
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+E2Eベンチマーク用フィクスチャの記録
+
+rss_feeds.yaml の各フィードと、フィードごとに先頭 --articles-per-feed 件の記事ページを実サイトから取得し、
+benchmarks/e2e/fixtures/ に保存する（ネットワーク接続が必要。記録後はオフラインで実行できる）。
+
+    python benchmarks/e2e/record_fixtures.py --articles-per-feed 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import feedparser
+import requests
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs"))
+
+from common.http_client import HttpClient
+from fixtures import FIXTURES_DIR, Fixture, FixtureStore
+
+
+DEFAULT_RSS_FEEDS_PATH = os.path.join(BENCH_DIR, "..", "..", "jobs", "rss-collector", "rss_feeds.yaml")
+
+
+def record(client: HttpClient, store: FixtureStore, url: str, delay: float) -> Fixture | None:
+    if url in store:
+        return None
+    time.sleep(delay)
+    try:
+        response = client.get(url, allowed_content_types=None, raise_for_status=False)
+    except requests.exceptions.RequestException as e:
+        print(f"  取得エラー: {url}: {e}")
+        return None
+    fixture = Fixture(response.status_code, response.headers.get("Content-Type", ""), response.content)
+    store.add(url, fixture)
+    return fixture
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rss-feeds", default=DEFAULT_RSS_FEEDS_PATH)
+    arg_parser.add_argument("--articles-per-feed", type=int, default=20)
+    arg_parser.add_argument("--delay", type=float, default=0.5, help="リクエスト間隔（秒）")
+    arg_parser.add_argument("--output", default=FIXTURES_DIR)
+    args = arg_parser.parse_args()
+
+    with open(args.rss_feeds, "r", encoding="utf-8") as f:
+        sources = (yaml.safe_load(f) or {}).get("sources", {})
+
+    client = HttpClient(max_retries=1)
+    store = FixtureStore()
+    for source_name, source_config in sources.items():
+        for feed_config in source_config.get("feeds", []):
+            feed_url = feed_config["url"]
+            print(f"{source_name}: {feed_url}")
+            feed_fixture = record(client, store, feed_url, args.delay)
+            if feed_fixture is None or feed_fixture.status != 200:
+                continue
+
+            links = [entry.get("link") for entry in feedparser.parse(feed_fixture.body).entries if entry.get("link")]
+            for link in links[:args.articles_per_feed]:
+                record(client, store, link, args.delay)
+
+    store.save(args.output)
+    print(f"\n{len(store)}件を記録: {args.output}")
+    print(client.stats.summary())
+
+
+if __name__ == "__main__":
+    main()
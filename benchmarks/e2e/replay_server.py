@@ -0,0 +1,98 @@
+"""
+フィクスチャのリプレイサーバ
+
+元のホストごとに 127.0.0.1 の別ポートでサーバを起動する（ジョブのホスト単位の同時接続数・間隔制御を保つため）。
+テキスト応答内の元URL（https://host）はリプレイサーバのURLに書き換えて返す。
+応答には ETag を付け、If-None-Match が一致すれば 304 を返す。
+"""
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixtures import FixtureStore
+
+
+TEXT_CONTENT_TYPES = ("text/", "application/rss+xml", "application/atom+xml", "application/xml", "application/rdf+xml")
+
+
+# -- サーバ状態 --------------
+class ReplayState:
+    def __init__(self, store: FixtureStore, latency: float, jitter: float):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.bases: dict[str, str] = {}              # 元のホスト -> http://127.0.0.1:port
+        self.requests = Counter()                    # ステータスごとのリクエスト数
+        self.lock = threading.Lock()
+
+    @property
+    def total_requests(self) -> int:
+        with self.lock:
+            return sum(self.requests.values())
+
+    def rewrite(self, body: bytes) -> bytes:
+        # 長いホスト名から置換（サブドメインの部分一致を避ける）
+        for host, base in sorted(self.bases.items(), key=lambda item: -len(item[0])):
+            encoded = base.encode("ascii")
+            body = body.replace(f"https://{host}".encode("ascii"), encoded)
+            body = body.replace(f"http://{host}".encode("ascii"), encoded)
+        return body
+
+
+def make_handler(state: ReplayState, host: str):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(state.latency + random.uniform(0, state.jitter))
+            fixture = state.store.get(host, self.path)
+            if fixture is None:
+                status, content_type, body = 404, "text/plain", b"not recorded"
+            else:
+                status, content_type, body = fixture.status, fixture.content_type, fixture.body
+                if content_type.startswith(TEXT_CONTENT_TYPES):
+                    body = state.rewrite(body)
+
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+
+            with state.lock:
+                state.requests[status] += 1
+            self.send_response(status)
+            if status != 304:
+                self.send_header("Content-Type", content_type)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def start_replay_servers(store: FixtureStore, latency: float = 0.0,
+                         jitter: float = 0.0) -> tuple[list[ThreadingHTTPServer], ReplayState]:
+    state = ReplayState(store, latency, jitter)
+    servers = []
+    for host in store.hosts:
+        server = QuietServer(("127.0.0.1", 0), make_handler(state, host))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        state.bases[host] = f"http://127.0.0.1:{server.server_address[1]}"
+        servers.append(server)
+    return servers, state
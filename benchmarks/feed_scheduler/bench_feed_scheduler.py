@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+rss-collector のフィード取得スケジューラのシミュレーション
+
+公開ペース（日内変動あり）と掲載件数の異なる合成フィードを仮想時計で数日分動かし、
+固定間隔（cron相当）で全フィードを取得する場合と、feed_scheduler.py の適応スケジュール（常駐モードと同じ
+run_scheduler）の取得回数・空振り率（新着なし）・取りこぼし件数・公開から取得までの遅延を比較する。
+ネットワーク・DBは使用しない。
+取得予定順・取得失敗時の間隔・停止条件などの動作も確認し、不一致があれば終了コード1で終了する。
+
+    python benchmarks/feed_scheduler/bench_feed_scheduler.py --feeds 36 --days 7 --cron-minutes 60
+"""
+import argparse
+import bisect
+import math
+import os
+import random
+import sys
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs", "rss-collector"))
+
+from feed_scheduler import FeedQueue, SchedulePolicy, run_scheduler, update_schedule
+from feed_state import FeedState
+
+
+HOUR = 3600.0
+
+
+# -- 仮想時計 --------------
+class FakeClock:
+    def __init__(self, start: float = 0.0):
+        self.current = start
+
+    def now(self) -> float:
+        return self.current
+
+    def sleep(self, seconds: float):
+        self.current += seconds
+
+
+# -- 合成フィード --------------
+@dataclass
+class SimulatedFeed:
+    url: str
+    rate_per_hour: float
+    capacity: int
+    published_at: list[float] = field(default_factory=list)      # エントリの公開時刻（昇順。インデックスがエントリID）
+
+    def visible(self, now: float) -> range:
+        """now 時点でフィードに掲載されているエントリ（新しい capacity 件）"""
+        end = bisect.bisect_right(self.published_at, now)
+        return range(max(0, end - self.capacity), end)
+
+
+def synthesize_feeds(count: int, days: float, seed: int) -> list[SimulatedFeed]:
+    """公開ペースは 0.02〜20件/時の対数一様分布、日中に多く夜間に少ない非定常ポアソン過程"""
+    rng = random.Random(seed)
+    feeds = []
+    for index in range(count):
+        rate = math.exp(rng.uniform(math.log(0.02), math.log(20)))
+        feed = SimulatedFeed(url=f"https://feed{index}.example.com/rss", rate_per_hour=rate,
+                             capacity=rng.choice([20, 30, 50]))
+        peak = rate * 1.8
+        t = 0.0
+        # 間引き法: 最大レートで生成し、時刻ごとのレートの比で採用
+        while True:
+            t += rng.expovariate(peak / HOUR)
+            if t > days * 24 * HOUR:
+                break
+            hour_of_day = (t / HOUR) % 24
+            current = rate * (1 + 0.8 * math.sin(2 * math.pi * (hour_of_day - 9) / 24))
+            if rng.random() < current / peak:
+                feed.published_at.append(t)
+        feeds.append(feed)
+    return feeds
+
+
+# -- 取得結果の集計 --------------
+@dataclass
+class SimulationStats:
+    polls: int = 0
+    empty_polls: int = 0
+    errors: int = 0
+    discovered: int = 0
+    missed: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def summary(self, label: str, total_entries: int) -> str:
+        ordered = sorted(self.latencies) or [0.0]
+        p50 = ordered[len(ordered) // 2] / 60
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] / 60
+        empty_rate = self.empty_polls / max(self.polls, 1)
+        return (f"{label:<10} 取得{self.polls:>6}回 (空振り{empty_rate:>5.1%}, 失敗{self.errors:>4}回)  "
+                f"取得{self.discovered:>6}/{total_entries}件, 取りこぼし{self.missed:>5}件  "
+                f"遅延 p50 {p50:>6.1f}分, p95 {p95:>6.1f}分")
+
+
+class Poller:
+    """collect_feed_entries と同じ手順（304・既読判定）で FeedState を更新する"""
+
+    def __init__(self, feeds: list[SimulatedFeed], error_rate: float, seed: int):
+        self.feeds = {feed.url: feed for feed in feeds}
+        self.states = {feed.url: FeedState(feed_url=feed.url) for feed in feeds}
+        self.last_seen_index = {feed.url: -1 for feed in feeds}    # 取得済みの最新エントリ
+        self.rng = random.Random(seed)
+        self.error_rate = error_rate
+        self.stats = SimulationStats()
+
+    def poll(self, feed_url: str, now: float):
+        feed, state = self.feeds[feed_url], self.states[feed_url]
+        self.stats.polls += 1
+        if self.rng.random() < self.error_rate:
+            self.stats.errors += 1
+            state.update(None, None, None, [], 0)
+            return
+
+        visible = feed.visible(now)
+        entry_ids = [str(index) for index in reversed(visible)]
+        if entry_ids and state.etag == entry_ids[0]:
+            state.update(304, None, None, [], 0)
+            self.stats.empty_polls += 1
+            return
+
+        seen = set(state.seen_entry_ids)
+        new_ids = [int(entry_id) for entry_id in entry_ids if entry_id not in seen]
+        if not new_ids:
+            self.stats.empty_polls += 1
+
+        # 初回取得より前の公開分は対象外
+        if state.fetch_count > 0:
+            published_since = range(self.last_seen_index[feed_url] + 1, visible.stop)
+            self.stats.missed += sum(1 for index in published_since if index not in visible)
+            self.stats.discovered += len(new_ids)
+            self.stats.latencies.extend(now - feed.published_at[index] for index in new_ids)
+        if visible:
+            self.last_seen_index[feed_url] = visible.stop - 1
+        state.update(200, entry_ids[0] if entry_ids else None, None, entry_ids, len(new_ids))
+
+
+def count_entries(feeds: list[SimulatedFeed], start: float, end: float) -> int:
+    return sum(bisect.bisect_right(feed.published_at, end) - bisect.bisect_right(feed.published_at, start)
+               for feed in feeds)
+
+
+# -- 固定間隔（cron） --------------
+def simulate_cron(feeds: list[SimulatedFeed], days: float, interval_minutes: float, error_rate: float,
+                  seed: int) -> SimulationStats:
+    poller = Poller(feeds, error_rate, seed)
+    now = 0.0
+    while now <= days * 24 * HOUR:
+        for feed in feeds:
+            poller.poll(feed.url, now)
+        now += interval_minutes * 60
+    return poller.stats
+
+
+# -- 適応スケジュール（常駐モード） --------------
+def simulate_adaptive(feeds: list[SimulatedFeed], days: float, policy: SchedulePolicy, error_rate: float,
+                      seed: int) -> SimulationStats:
+    poller = Poller(feeds, error_rate, seed)
+    clock = FakeClock()
+    queue = FeedQueue()
+    for feed in feeds:
+        queue.push(feed.url, 0.0)
+
+    def poll(due: list[str], now: float) -> dict[str, float]:
+        next_poll = {}
+        for feed_url in due:
+            poller.poll(feed_url, now)
+            state = poller.states[feed_url]
+            update_schedule(state, policy, now)
+            next_poll[feed_url] = state.next_poll_at
+        return next_poll
+
+    run_scheduler(queue, poll, clock, stop_at=days * 24 * HOUR, max_sleep_seconds=float("inf"))
+    return poller.stats
+
+
+# -- 動作確認（取得予定順・間隔の上下限・サイクル失敗時の再登録・停止条件） --------------
+def check_scheduler(feeds: list[SimulatedFeed], days: float, policy: SchedulePolicy, seed: int) -> list[str]:
+    failures = []
+    rng = random.Random(seed)
+
+    # 予定時刻を過ぎたフィードのみ、予定時刻の早い順に取得する（再登録した予定時刻が優先される）
+    clock = FakeClock()
+    queue = FeedQueue()
+    due_at = {f"feed{index}": rng.uniform(0, HOUR) for index in range(50)}
+    for feed_url, at in due_at.items():
+        queue.push(feed_url, at + HOUR)
+        queue.push(feed_url, at)
+    polled = []
+
+    def record_poll(due: list[str], now: float) -> dict[str, float]:
+        polled.extend((due_at[feed_url], now) for feed_url in due)
+        return {feed_url: float("inf") for feed_url in due}
+
+    run_scheduler(queue, record_poll, clock, stop_at=2 * HOUR, max_sleep_seconds=float("inf"))
+    if [at for at, _ in polled] != sorted(due_at.values()):
+        failures.append("  取得順が予定時刻の順でない")
+    if any(now < at for at, now in polled):
+        failures.append("  予定時刻より前に取得した")
+
+    # 取得間隔は失敗が続いても最短・最長の間隔に収まる
+    poller = Poller(feeds, 0.5, seed)
+    for feed in feeds:
+        now = 0.0
+        for _ in range(20):
+            poller.poll(feed.url, now)
+            state = poller.states[feed.url]
+            update_schedule(state, policy, now)
+            if not policy.min_interval_seconds <= state.poll_interval_seconds <= policy.max_interval_seconds:
+                failures.append(f"  取得間隔が範囲外: {state.poll_interval_seconds:.0f}秒 ({feed.url})")
+                break
+            now = state.next_poll_at
+
+    # サイクルの失敗（DB切断など）で終了せず、取得予定のフィードを倍々の間隔（上限あり）で再登録する
+    clock = FakeClock()
+    queue = FeedQueue()
+    queue.push("feed", 0.0)
+    attempts = []
+
+    def failing_poll(due: list[str], now: float) -> dict[str, float]:
+        attempts.append(now)
+        raise ConnectionError("stub")
+
+    with redirect_stdout(None):
+        run_scheduler(queue, failing_poll, clock, stop_at=days * 24 * HOUR, max_sleep_seconds=float("inf"),
+                      retry_delay_seconds=policy.min_interval_seconds,
+                      max_retry_delay_seconds=policy.max_interval_seconds)
+    delays = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    expected = [min(policy.max_interval_seconds, policy.min_interval_seconds * 2 ** index) for index in range(len(delays))]
+    if len(attempts) < 2 or delays != expected:
+        failures.append(f"  失敗時の再試行間隔が不正: {delays[:8]}")
+
+    # 結果に含まれないフィードもキューから消えない
+    clock = FakeClock()
+    queue = FeedQueue()
+    for feed_url in ("a", "b"):
+        queue.push(feed_url, 0.0)
+    partial_polls = []
+
+    def partial_poll(due: list[str], now: float) -> dict[str, float]:
+        partial_polls.extend(due)
+        return {"a": now + HOUR}
+
+    run_scheduler(queue, partial_poll, clock, stop_at=HOUR, retry_delay_seconds=HOUR / 2)
+    if partial_polls.count("b") != 2 or len(queue) != 2:
+        failures.append(f"  結果にないフィードが再登録されない: {partial_polls}")
+
+    # stop_at / should_stop で終了する
+    clock = FakeClock()
+    queue = FeedQueue()
+    queue.push("feed", 0.0)
+    cycles = run_scheduler(queue, lambda due, now: {"feed": now + 60}, clock, stop_at=HOUR)
+    if clock.now() != HOUR or cycles != 60:
+        failures.append(f"  stop_at で終了しない: 時刻 {clock.now():.0f}, {cycles}サイクル")
+    stop_polls = []
+
+    def counting_poll(due: list[str], now: float) -> dict[str, float]:
+        stop_polls.append(now)
+        return {"feed": now + 60}
+
+    cycles = run_scheduler(queue, counting_poll, clock, should_stop=lambda: len(stop_polls) >= 3)
+    if cycles != 3:
+        failures.append(f"  should_stop で終了しない: {cycles}サイクル")
+    return failures
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--feeds", type=int, default=36)
+    arg_parser.add_argument("--days", type=float, default=7)
+    arg_parser.add_argument("--cron-minutes", type=float, nargs="+", default=[60, 15], help="固定間隔（分）")
+    arg_parser.add_argument("--min-interval", type=float, default=10, help="適応スケジュールの最短間隔（分）")
+    arg_parser.add_argument("--max-interval", type=float, default=360, help="適応スケジュールの最長間隔（分）")
+    arg_parser.add_argument("--target-new-entries", type=float, default=5)
+    arg_parser.add_argument("--error-rate", type=float, default=0.02, help="取得失敗の割合")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    feeds = synthesize_feeds(args.feeds, args.days, args.seed)
+    total = count_entries(feeds, 0.0, args.days * 24 * HOUR)
+    rates = sorted(feed.rate_per_hour for feed in feeds)
+    print(f"フィード: {len(feeds)}件, {args.days:g}日間, エントリ {total}件 "
+          f"(公開ペース {rates[0]:.2f}〜{rates[-1]:.1f}件/時, 失敗率 {args.error_rate:.0%})\n")
+
+    for minutes in args.cron_minutes:
+        stats = simulate_cron(feeds, args.days, minutes, args.error_rate, args.seed)
+        print(stats.summary(f"cron {minutes:g}分", total))
+
+    policy = SchedulePolicy(
+        min_interval_seconds=args.min_interval * 60,
+        max_interval_seconds=args.max_interval * 60,
+        target_new_entries=args.target_new_entries,
+    )
+    stats = simulate_adaptive(feeds, args.days, policy, args.error_rate, args.seed)
+    print(stats.summary("適応", total))
+
+    failures = check_scheduler(feeds, args.days, policy, args.seed)
+    if failures:
+        print("\n不一致:")
+        print("\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
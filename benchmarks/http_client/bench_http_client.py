@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+共有HTTPクライアント（jobs/common/http_client.py）のベンチマーク
+
+ローカルのHTTPサーバ（keep-alive・gzip/br対応）に記事ページ・巨大ページ・PDF・一時的な503を混ぜて配置し、
+従来の requests.get（リクエストごとに接続）と HttpClient（接続プール・再試行・サイズ上限・Content-Type判定）で
+同じURL一覧を並列取得する。処理時間・新規接続数・転送バイト数・失敗/切り捨て/除外件数を表示する。
+新規接続ごとに --handshake-latency 秒待たせてTLSハンドシェイク相当のコストを再現する。
+
+    python benchmarks/http_client/bench_http_client.py --articles 300 --workers 8
+"""
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import brotli
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs"))
+
+from common.http_client import HTML_CONTENT_TYPES, HttpClient
+
+
+ARTICLE_HTML = (
+    "<html><head><title>半導体ニュース</title></head><body><article>"
+    + "<p>TSMCは熊本県に第2工場を建設し、2027年の量産開始を目指すと発表した。</p>" * 400
+    + "</article></body></html>"
+).encode("utf-8")
+LARGE_HTML = b"<html><body>" + (b"<div>" + b"x" * 1000 + b"</div>") * 8000 + b"</body></html>"
+PDF_BODY = b"%PDF-1.7\n" + os.urandom(2 * 1024 * 1024)
+
+
+# -- ローカルサーバ --------------
+class ServerState:
+    def __init__(self, handshake_latency: float):
+        self.handshake_latency = handshake_latency
+        self.connections = 0
+        self.statuses = Counter()
+        self.flaky_seen: set[str] = set()
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.statuses.clear()
+            self.flaky_seen.clear()
+
+
+def make_handler(state: ServerState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+            time.sleep(state.handshake_latency)
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status: int, content_type: str, body: bytes, compress: bool = False):
+            encoding = None
+            accept = self.headers.get("Accept-Encoding", "")
+            if compress and "br" in accept:
+                body, encoding = brotli.compress(body, quality=5), "br"
+            elif compress and "gzip" in accept:
+                body, encoding = gzip.compress(body, compresslevel=6), "gzip"
+
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.end_headers()
+            with state.lock:
+                state.statuses[status] += 1
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # サイズ上限・Content-Type判定でクライアントが途中で切断した
+                self.close_connection = True
+
+        def do_GET(self):
+            if self.path.startswith("/article/"):
+                self.send_body(200, "text/html; charset=utf-8", ARTICLE_HTML, compress=True)
+            elif self.path.startswith("/large/"):
+                self.send_body(200, "text/html; charset=utf-8", LARGE_HTML)
+            elif self.path.startswith("/doc/"):
+                self.send_body(200, "application/pdf", PDF_BODY)
+            elif self.path.startswith("/flaky/"):
+                with state.lock:
+                    first = self.path not in state.flaky_seen
+                    state.flaky_seen.add(self.path)
+                if first:
+                    self.send_body(503, "text/plain", b"unavailable")
+                else:
+                    self.send_body(200, "text/html; charset=utf-8", ARTICLE_HTML, compress=True)
+            else:
+                self.send_body(404, "text/plain", b"not found")
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # クライアント側の切断（上限での打ち切り）は正常系として扱う
+        pass
+
+
+def start_server(handshake_latency: float) -> tuple[ThreadingHTTPServer, ServerState]:
+    state = ServerState(handshake_latency)
+    server = QuietServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def build_urls(base: str, articles: int) -> list[str]:
+    urls = []
+    for index in range(articles):
+        kind = ("article", "article", "article", "article", "article", "article", "article", "large", "doc", "flaky")[index % 10]
+        urls.append(f"{base}/{kind}/{index}")
+    return urls
+
+
+# -- 取得方法 --------------
+def fetch_with_requests(url: str) -> tuple[bool, int, int]:
+    """従来の取得（記事ごとに requests.get、本文を全て読み込む）。(成功, 本文バイト数, 転送バイト数)"""
+    try:
+        response = requests.get(url, timeout=15)
+        response.raise_for_status()
+        return True, len(response.content), response.raw.tell()
+    except requests.exceptions.RequestException:
+        return False, 0, 0
+
+
+def run(label: str, fetch, urls: list[str], workers: int, state: ServerState) -> dict:
+    state.reset()
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fetch, urls))
+    elapsed = time.perf_counter() - started_at
+    ok = sum(1 for success, _, _ in results if success)
+    received = sum(size for _, size, _ in results)
+    wire_bytes = sum(wire for _, _, wire in results)
+    print(f"\n[{label}]")
+    print(f"  時間: {elapsed:.2f}秒 ({len(urls) / elapsed:.1f}件/秒)")
+    print(f"  新規接続: {state.connections}件, サーバ応答: {dict(state.statuses)}")
+    print(f"  成功: {ok}/{len(urls)}件, 本文: {received / 1024 / 1024:.1f}MB, 転送: {wire_bytes / 1024 / 1024:.1f}MB")
+    return {"elapsed": elapsed, "connections": state.connections, "wire_bytes": wire_bytes, "ok": ok}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--articles", type=int, default=300)
+    arg_parser.add_argument("--workers", type=int, default=8)
+    arg_parser.add_argument("--handshake-latency", type=float, default=0.05, help="新規接続ごとの待ち時間（秒）")
+    arg_parser.add_argument("--max-bytes", type=int, default=1024 * 1024)
+    args = arg_parser.parse_args()
+
+    server, state = start_server(args.handshake_latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = build_urls(base, args.articles)
+    print(f"URL: {len(urls)}件 (記事70%, 巨大ページ10%, PDF10%, 一時的な503 10%), 並列数{args.workers}")
+
+    baseline = run("requests.get", fetch_with_requests, urls, args.workers, state)
+
+    client = HttpClient(pool_maxsize=args.workers, backoff_factor=0.05, max_bytes=args.max_bytes)
+
+    def fetch_with_client(url: str) -> tuple[bool, int, int]:
+        try:
+            response = client.get(url, allowed_content_types=HTML_CONTENT_TYPES)
+            return True, len(response.content), response.timing.wire_bytes
+        except requests.exceptions.RequestException:
+            return False, 0, 0
+
+    shared = run("HttpClient", fetch_with_client, urls, args.workers, state)
+    print(f"  {client.stats.summary()}")
+
+    print(f"\n時間 {baseline['elapsed'] / shared['elapsed']:.1f}倍速, "
+          f"新規接続 {baseline['connections']} -> {shared['connections']}, "
+          f"転送 {baseline['wire_bytes'] / 1024 / 1024:.1f}MB -> {shared['wire_bytes'] / 1024 / 1024:.1f}MB")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
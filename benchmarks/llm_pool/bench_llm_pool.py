@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+metadata-generator のLLMワーカープールのベンチマーク
+
+スタブのOpenAI互換サーバを起動し、generate_summary_and_tags をワーカー数を変えて実行する。
+スループット・リトライ回数・失敗件数を表示する。
+
+    python benchmarks/llm_pool/bench_llm_pool.py --articles 40 --latency 0.2 --error-rate 0.1
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "stub_openai"))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs", "metadata-generator"))
+
+from stub_openai_server import start_server
+
+
+SAMPLE_TEXT = "TSMCは熊本県に第2工場を建設し、2027年の量産開始を目指すと発表した。" * 20
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--articles", type=int, default=40)
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    arg_parser.add_argument("--latency", type=float, default=0.2)
+    arg_parser.add_argument("--error-rate", type=float, default=0.1)
+    args = arg_parser.parse_args()
+
+    server, state = start_server(latency=args.latency, error_rate=args.error_rate)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ.setdefault("OPENAI_RPM", "100000")
+    os.environ.setdefault("OPENAI_TPM", "100000000")
+
+    import main as generator
+    from llm_pool import run_pool
+
+    # バックオフ待ちを短縮
+    import llm_pool
+    original_call_with_retry = llm_pool.call_with_retry
+    generator.call_with_retry = lambda fn, **kwargs: original_call_with_retry(fn, base_delay=0.05, **kwargs)
+
+    for workers in args.workers:
+        attempts_before = generator.retry_stats.attempts
+        retries_before = generator.retry_stats.retries
+        started_at = time.perf_counter()
+        results = list(run_pool(generator.generate_summary_and_tags, [SAMPLE_TEXT] * args.articles, workers))
+        elapsed = time.perf_counter() - started_at
+        failed = sum(1 for _, (summary, _tags) in results if not summary)
+        print(
+            f"ワーカー{workers:>2}: {args.articles / elapsed:6.1f}記事/秒 ({elapsed:.2f}秒), "
+            f"LLM実行{generator.retry_stats.attempts - attempts_before}回, "
+            f"リトライ{generator.retry_stats.retries - retries_before}回, 失敗{failed}件"
+        )
+
+    print(f"スタブサーバ: {state.snapshot()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+metadata-generator の近似重複判定（MinHash + LSH）のベンチマーク
+
+合成コーパス（一部を語句の置換・前後の定型文追加で転載記事にしたもの）を順に判定・登録し、
+シグネチャ作成・インデックス構築時間、問い合わせレイテンシ、正解に対する適合率・再現率を表示する。
+DBは使用せず、メモリ上の MinHashLSH で計測する。
+
+    python benchmarks/near_duplicate/bench_near_duplicate.py --articles 100000 --duplicate-rate 0.1
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs", "metadata-generator"))
+
+from near_duplicate import DEFAULT_THRESHOLD, MinHashLSH, minhash_signature
+
+
+WORDS = [
+    "半導体", "ファウンドリ", "メモリ", "ロジック", "露光装置", "ウエハー", "量産", "投資", "工場", "熊本",
+    "北海道", "台湾", "米国", "補助金", "経済産業省", "先端パッケージ", "生成AI", "データセンター", "需要",
+    "供給", "価格", "出荷", "前年同期比", "増加", "減少", "発表", "計画", "開始", "技術", "開発",
+    "TSMC", "Rapidus", "Samsung", "Intel", "NVIDIA", "キオクシア", "東京エレクトロン", "ソニー", "2nm", "3nm",
+    "EUV", "HBM", "DRAM", "NAND", "パワー半導体", "SiC", "GaN", "車載", "スマートフォン", "サーバー",
+]
+PUNCTUATION = ["。", "、", "が", "を", "に", "は", "の", "で", "と", "も"]
+HEADERS = ["【ニュースリリース】", "（共同通信）", "PR TIMES配信：", "以下、プレスリリースより。"]
+FOOTERS = ["本件に関するお問い合わせは広報部まで。", "※記事の内容は発表時点のものです。", "関連記事はこちら。"]
+
+
+# -- 合成コーパス --------------
+def random_article(rng: random.Random, length: int) -> list[str]:
+    return [rng.choice(WORDS) + rng.choice(PUNCTUATION) for _ in range(length)]
+
+
+def mutate(rng: random.Random, tokens: list[str], edit_rate: float) -> list[str]:
+    """一部の語句を置換し、前後に定型文を付けた転載記事を作る"""
+    mutated = [rng.choice(WORDS) + rng.choice(PUNCTUATION) if rng.random() < edit_rate else token for token in tokens]
+    return [rng.choice(HEADERS)] + mutated + [rng.choice(FOOTERS)]
+
+
+def build_corpus(count: int, duplicate_rate: float, edit_rate: float, seed: int) -> list[tuple[str, str, str | None]]:
+    """(記事ID, 本文, 正解の正規記事ID) の一覧"""
+    rng = random.Random(seed)
+    originals: list[tuple[str, list[str]]] = []
+    corpus = []
+    for index in range(count):
+        article_id = f"article-{index}"
+        if originals and rng.random() < duplicate_rate:
+            source_id, tokens = rng.choice(originals)
+            corpus.append((article_id, "".join(mutate(rng, tokens, edit_rate)), source_id))
+        else:
+            tokens = random_article(rng, rng.randint(150, 400))
+            originals.append((article_id, tokens))
+            corpus.append((article_id, "".join(tokens), None))
+    return corpus
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--articles", type=int, default=100000)
+    arg_parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    arg_parser.add_argument("--edit-rate", type=float, default=0.03, help="転載時に置換する語句の割合")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    started_at = time.perf_counter()
+    corpus = build_corpus(args.articles, args.duplicate_rate, args.edit_rate, args.seed)
+    average_chars = statistics.mean(len(text) for _, text, _ in corpus)
+    print(f"合成コーパス: {len(corpus)}件 (平均{average_chars:.0f}文字), {time.perf_counter() - started_at:.1f}秒")
+
+    # シグネチャ作成
+    started_at = time.perf_counter()
+    signatures = [minhash_signature(text) for _, text, _ in corpus]
+    signature_seconds = time.perf_counter() - started_at
+
+    # 到着順に判定し、重複でなければ登録（ジョブと同じ逐次更新）
+    lsh = MinHashLSH()
+    query_latencies = []
+    add_seconds = 0.0
+    true_positive = false_positive = false_negative = 0
+    for (article_id, _, expected), signature in zip(corpus, signatures):
+        if signature is None:
+            continue
+
+        query_started_at = time.perf_counter()
+        match = lsh.query(signature, args.threshold)
+        query_latencies.append(time.perf_counter() - query_started_at)
+
+        if match is not None:
+            if match[0] == expected:
+                true_positive += 1
+            else:
+                false_positive += 1
+            continue
+        if expected is not None:
+            false_negative += 1
+
+        add_started_at = time.perf_counter()
+        lsh.add(article_id, signature)
+        add_seconds += time.perf_counter() - add_started_at
+
+    precision = true_positive / (true_positive + false_positive) if true_positive + false_positive else 0.0
+    recall = true_positive / (true_positive + false_negative) if true_positive + false_negative else 0.0
+    print(f"シグネチャ作成: {signature_seconds:.1f}秒 ({signature_seconds / len(corpus) * 1e3:.3f}ms/件)")
+    print(f"インデックス構築: {len(lsh)}件登録, {add_seconds:.1f}秒, バケット数{len(lsh.buckets)}")
+    print(f"問い合わせ: p50 {percentile(query_latencies, 0.5) * 1e6:.0f}µs, "
+          f"p95 {percentile(query_latencies, 0.95) * 1e6:.0f}µs, p99 {percentile(query_latencies, 0.99) * 1e6:.0f}µs")
+    print(f"判定精度: 適合率{precision:.3f}, 再現率{recall:.3f} "
+          f"(正解{true_positive}件, 誤検出{false_positive}件, 見逃し{false_negative}件)")
+
+
+if __name__ == "__main__":
+    main()
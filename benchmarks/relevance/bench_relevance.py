@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+関連度判定（jobs/metadata-generator/relevance.py）のコーパス検証とベンチマーク
+
+corpus.tsv の各記事の関連度を判定し、閾値（--threshold）での適合率・再現率・対象外にする割合、
+対象外にすることで削減できるLLMトークン数（見込み）、判定のスループットを表示する。
+半導体の記事を対象外にした場合は終了コード1で終了する（再現率 1.0 が必須）。
+--model を指定すると学習済みモデル（scripts/train_relevance）を併用する。
+
+    python benchmarks/relevance/bench_relevance.py --threshold 0.3
+"""
+import argparse
+import os
+import sys
+import time
+
+GENERATOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "jobs", "metadata-generator")
+sys.path.append(os.path.join(GENERATOR_DIR, ".."))
+sys.path.append(GENERATOR_DIR)
+
+from common.tokens import count_tokens
+from relevance import DEFAULT_THRESHOLD, RelevanceModel, RelevanceScorer, load_relevance_rules
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.tsv")
+
+# 要約・タグ生成1回あたりのプロンプトの定型部分と出力の見込み（main.py の COMPLETION_TOKEN_ALLOWANCE と同程度）
+REQUEST_OVERHEAD_TOKENS = 1400
+
+
+# -- コーパス読み込み --------------
+def load_corpus(path: str) -> list[tuple[bool, str, str, str]]:
+    """(期待値, 出典, タイトル, 本文) の一覧"""
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            label, source, title, content = line.rstrip("\n").split("\t")
+            corpus.append((label == "1", source, title, content))
+    return corpus
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    arg_parser.add_argument("--model", default=None, help="学習済みモデル（relevance_model.json）")
+    arg_parser.add_argument("--repeat", type=int, default=200, help="スループット計測の繰り返し回数")
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(CORPUS_PATH)
+    model = RelevanceModel.load(args.model) if args.model else None
+    scorer = RelevanceScorer(load_relevance_rules(), model)
+
+    # 判定結果
+    missed = []
+    kept = skipped_tokens = total_tokens = true_positive = 0
+    for label, source, title, content in corpus:
+        score = scorer.score(title, content, source)
+        keep = score >= args.threshold
+        tokens = count_tokens(f"{title}\n{content}") + REQUEST_OVERHEAD_TOKENS
+        total_tokens += tokens
+        kept += int(keep)
+        true_positive += int(keep and label)
+        if not keep:
+            skipped_tokens += tokens
+        if keep != label:
+            print(f"  {'見逃し' if label else '誤検出'}: {score:.3f} {title}")
+        if label and not keep:
+            missed.append(title)
+
+    positives = sum(label for label, *_ in corpus)
+    print(f"\nコーパス {len(corpus)}件（半導体 {positives}件）, 閾値 {args.threshold}"
+          + ("（学習済みモデル併用）" if model is not None else ""))
+    print(f"適合率 {true_positive / max(1, kept):.3f}, 再現率 {true_positive / max(1, positives):.3f}, "
+          f"対象外 {1 - kept / len(corpus):.1%}")
+    print(f"LLMトークン（見込み）: {total_tokens} → {total_tokens - skipped_tokens} ({skipped_tokens / total_tokens:.1%}削減)")
+
+    # スループット
+    started_at = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, source, title, content in corpus:
+            scorer.score(title, content, source)
+    elapsed = time.perf_counter() - started_at
+    print(f"判定: {args.repeat * len(corpus) / elapsed:,.0f}件/秒")
+
+    if missed:
+        print(f"\n半導体の記事を対象外にした: {len(missed)}件")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+全文検索（articles.search_tsv）のベンチマーク
+
+合成記事をローカルのPostgreSQL（benchmarks/e2e/docker-compose.yml。init_db.sql の build_search_tsv を使用）の
+専用テーブルに 10万件・100万件と段階的に投入し、フロントエンドと同じ条件の検索を
+部分一致（ILIKE）と search_tsv（GINインデックス）で実行して p50/p95 とヒット件数を表示する。
+検索文書の作成（jobs/common/search_document.py）のスループットも表示する（--no-db でこれのみ）。
+
+    docker compose -f benchmarks/e2e/docker-compose.yml up -d
+    python benchmarks/search/bench_search.py --rows 100000 1000000
+    python benchmarks/search/bench_search.py --no-db
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "..", "jobs"))
+
+from common.search_document import build_search_document, search_tokens
+
+
+WORDS = [
+    "半導体", "ファウンドリ", "メモリ", "ロジック", "露光装置", "ウエハー", "量産", "投資", "工場", "熊本",
+    "北海道", "台湾", "米国", "補助金", "経済産業省", "先端パッケージ", "生成AI", "データセンター", "需要",
+    "供給", "価格", "出荷", "前年同期比", "増加", "減少", "発表", "計画", "開始", "技術", "開発",
+    "TSMC", "Rapidus", "Samsung", "Intel", "NVIDIA", "キオクシア", "東京エレクトロン", "ソニー", "2nm", "3nm",
+    "EUV", "HBM", "DRAM", "NAND", "パワー半導体", "SiC", "GaN", "車載", "スマートフォン", "サーバー",
+    "chips", "foundry", "packaging", "shipments", "investment", "lithography", "memory", "demand",
+]
+PUNCTUATION = ["。", "、", "が", "を", "に", "は", "の", "で", "と", "も", " "]
+QUERIES = ["TSMC", "熊本", "生成AI", "先端パッケージ", "HBM 需要", "GaN 車載", "shipment", "株"]
+
+TABLE = "bench_search_articles"
+DB_PARAMS = {
+    "host": os.environ.get("BENCH_DB_HOST", "127.0.0.1"),
+    "port": os.environ.get("BENCH_DB_PORT", "5433"),
+    "dbname": os.environ.get("BENCH_DB_NAME", "semicon_survey"),
+    "user": os.environ.get("BENCH_DB_USER", "postgres"),
+    "password": os.environ.get("BENCH_DB_PASSWORD", "postgres"),
+}
+
+
+# -- 合成記事 --------------
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(WORDS) + rng.choice(PUNCTUATION) for _ in range(length))
+
+
+def random_article(rng: random.Random, content_words: int) -> tuple[str, str, list[str], str]:
+    """(タイトル, 要約, タグ, 本文)"""
+    return (
+        random_text(rng, rng.randint(5, 10)),
+        random_text(rng, rng.randint(20, 40)),
+        rng.sample(WORDS, rng.randint(2, 6)),
+        random_text(rng, rng.randint(content_words // 2, content_words)),
+    )
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+# -- 検索条件（frontend/src/lib/searchQuery.ts の buildSearchCondition と同じ） --------------
+def tsv_condition(query: str) -> tuple[str, list[str]]:
+    conditions, params = [], []
+    for term in query.split():
+        tokens = search_tokens(term)
+        if not tokens:
+            continue
+        if len(tokens) == 1 and len(tokens[0]) == 1 and not tokens[0].isascii():
+            params.append(f"{tokens[0]}:*")
+            conditions.append("search_tsv @@ to_tsquery('simple', %s)")
+        else:
+            # ストップワードのみの語はタイトルの部分一致
+            phrase = " ".join(tokens)
+            like = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params.extend([phrase, like, phrase])
+            conditions.append("(CASE WHEN numnode(phraseto_tsquery('english', %s)) = 0 THEN title ILIKE %s "
+                              "ELSE search_tsv @@ phraseto_tsquery('english', %s) END)")
+    if not conditions:
+        return "FALSE", []
+    return f"({' AND '.join(conditions)})", params
+
+
+def ilike_condition(query: str) -> tuple[str, list[str]]:
+    """導入前と同じ部分一致（タイトル・要約・本文）"""
+    conditions, params = [], []
+    for term in query.split():
+        conditions.append("(title ILIKE %s OR summary ILIKE %s OR content ILIKE %s)")
+        params.extend([f"%{term}%"] * 3)
+    return " AND ".join(conditions), params
+
+
+# -- テーブル準備・投入 --------------
+def create_table(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            id SERIAL PRIMARY KEY,
+            title TEXT, summary TEXT, tags TEXT[], content TEXT,
+            published_date TIMESTAMP, search_tsv TSVECTOR
+        )
+    """)
+    cursor.execute(f"CREATE INDEX idx_{TABLE}_published_date ON {TABLE}(published_date)")
+    conn.commit()
+    cursor.close()
+
+
+def copy_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\t", " ").replace("\n", " ")
+
+
+def load_rows(conn, rng: random.Random, count: int, content_words: int, chunk_size: int = 10000) -> tuple[float, float]:
+    """記事を投入し、(検索文書の作成秒数, DB投入秒数) を返す"""
+    tokenize_seconds = load_seconds = 0.0
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS bench_search_staging (
+            title TEXT, summary TEXT, tags TEXT[], content TEXT, published_date TIMESTAMP,
+            search_title TEXT, search_summary TEXT, search_content TEXT
+        )
+    """)
+    for start in range(0, count, chunk_size):
+        buffer = io.StringIO()
+        for _ in range(start, min(count, start + chunk_size)):
+            title, summary, tags, content = random_article(rng, content_words)
+            started_at = time.perf_counter()
+            document = build_search_document(title, summary, tags, content)
+            tokenize_seconds += time.perf_counter() - started_at
+            published = (datetime(2025, 1, 1) + timedelta(seconds=rng.randint(0, 365 * 24 * 3600))).isoformat()
+            tags_literal = "{" + ",".join(f'"{tag}"' for tag in tags) + "}"
+            fields = [title, summary, tags_literal, content, published, *document]
+            buffer.write("\t".join(copy_escape(field) for field in fields) + "\n")
+        buffer.seek(0)
+
+        started_at = time.perf_counter()
+        cursor.execute("TRUNCATE bench_search_staging")
+        cursor.copy_from(buffer, "bench_search_staging", columns=(
+            "title", "summary", "tags", "content", "published_date", "search_title", "search_summary", "search_content"
+        ))
+        cursor.execute(f"""
+            INSERT INTO {TABLE} (title, summary, tags, content, published_date, search_tsv)
+            SELECT title, summary, tags, content, published_date,
+                   build_search_tsv(search_title, search_summary, search_content)
+            FROM bench_search_staging
+        """)
+        conn.commit()
+        load_seconds += time.perf_counter() - started_at
+    cursor.close()
+    return tokenize_seconds, load_seconds
+
+
+def rebuild_index(conn) -> float:
+    cursor = conn.cursor()
+    started_at = time.perf_counter()
+    cursor.execute(f"DROP INDEX IF EXISTS idx_{TABLE}_search_tsv")
+    cursor.execute(f"CREATE INDEX idx_{TABLE}_search_tsv ON {TABLE} USING GIN(search_tsv)")
+    cursor.execute(f"ANALYZE {TABLE}")
+    conn.commit()
+    cursor.close()
+    return time.perf_counter() - started_at
+
+
+# -- 検索の計測（フロントエンドと同じく公開日の新しい順に100件） --------------
+def run_queries(conn, repeat: int):
+    cursor = conn.cursor()
+    print(f"  {'クエリ':<16}{'方式':<12}{'p50':>10}{'p95':>10}{'一致件数':>12}")
+    for query in QUERIES:
+        for label, build in (("ILIKE", ilike_condition), ("search_tsv", tsv_condition)):
+            condition, params = build(query)
+            timings = []
+            for _ in range(repeat):
+                started_at = time.perf_counter()
+                cursor.execute(
+                    f"SELECT id, title FROM {TABLE} WHERE {condition} "
+                    f"ORDER BY published_date DESC NULLS LAST LIMIT 100", params
+                )
+                cursor.fetchall()
+                timings.append(time.perf_counter() - started_at)
+            cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE {condition}", params)
+            matches = cursor.fetchone()[0]
+            print(f"  {query:<16}{label:<12}{percentile(timings, 0.5) * 1000:>8.1f}ms"
+                  f"{percentile(timings, 0.95) * 1000:>8.1f}ms{matches:>12,}")
+
+    # インデックスが使われているか確認
+    condition, params = tsv_condition(QUERIES[0])
+    cursor.execute(f"EXPLAIN SELECT id FROM {TABLE} WHERE {condition}", params)
+    plan = "\n".join(row[0] for row in cursor.fetchall())
+    print(f"  GINインデックス使用: {'はい' if f'idx_{TABLE}_search_tsv' in plan else 'いいえ'}")
+    cursor.close()
+    conn.rollback()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000], help="計測する件数（昇順）")
+    arg_parser.add_argument("--content-words", type=int, default=120, help="本文の語数（上限）")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="クエリごとの実行回数")
+    arg_parser.add_argument("--tokenize-sample", type=int, default=20000, help="検索文書作成の計測件数")
+    arg_parser.add_argument("--no-db", action="store_true", help="検索文書作成のみ計測する")
+    arg_parser.add_argument("--keep", action="store_true", help="終了後もテーブルを残す")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    # 検索文書の作成スループット
+    rng = random.Random(args.seed)
+    articles = [random_article(rng, args.content_words) for _ in range(args.tokenize_sample)]
+    started_at = time.perf_counter()
+    token_count = sum(sum(len(text.split()) for text in build_search_document(*article)) for article in articles)
+    elapsed = time.perf_counter() - started_at
+    print(f"検索文書の作成: {len(articles)}件 {elapsed:.2f}秒 ({len(articles) / elapsed:,.0f}件/秒, "
+          f"平均{token_count / len(articles):.0f}トークン)")
+    if args.no_db:
+        return
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    create_table(conn)
+    rng = random.Random(args.seed)
+    loaded = 0
+    try:
+        for target in sorted(args.rows):
+            tokenize_seconds, load_seconds = load_rows(conn, rng, target - loaded, args.content_words)
+            loaded = target
+            index_seconds = rebuild_index(conn)
+            print(f"\n[{loaded:,}件] 追加分の文書作成 {tokenize_seconds:.1f}秒, 投入 {load_seconds:.1f}秒, "
+                  f"GINインデックス作成 {index_seconds:.1f}秒")
+            run_queries(conn, args.repeat)
+    finally:
+        if not args.keep:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            conn.commit()
+            cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
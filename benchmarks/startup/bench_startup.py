@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+両ジョブの起動時間のベンチマーク
+
+python -X importtime で各ジョブの main.py の読み込み時間（最小値）と時間のかかるモジュールを表示し、
+予算（--budget-ms）を超えた場合と、起動時に読み込まない重い依存（openai / langchain）が読み込まれた場合は
+終了コード1で終了する。OPENAI_API_KEY・DB接続情報は渡さない（起動時に不要であることも確認する）。
+--no-work を指定すると、ローカルのPostgreSQL（benchmarks/e2e/docker-compose.yml）に対して処理対象がない状態で
+main.py を実行し、終了までの時間を --no-work-budget-ms と比較する。
+
+    python benchmarks/startup/bench_startup.py --budget-ms 500
+    docker compose -f benchmarks/e2e/docker-compose.yml up -d
+    python benchmarks/startup/bench_startup.py --no-work
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DIR = os.path.join(BENCH_DIR, "..", "..", "jobs")
+JOBS = ["rss-collector", "metadata-generator"]
+
+# 起動時に読み込まない依存（使用時に読み込む）
+FORBIDDEN_MODULES = ("openai", "langchain", "langchain_openai", "langchain_core")
+
+DB_ENV = {
+    "DB_HOST": os.environ.get("BENCH_DB_HOST", "127.0.0.1"),
+    "DB_PORT": os.environ.get("BENCH_DB_PORT", "5433"),
+    "DB_NAME": os.environ.get("BENCH_DB_NAME", "semicon_survey"),
+    "DB_USER": os.environ.get("BENCH_DB_USER", "postgres"),
+    "DB_PASSWORD": os.environ.get("BENCH_DB_PASSWORD", "postgres"),
+}
+
+IMPORT_LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+# -- python -X importtime の解析 --------------
+def clean_env() -> dict:
+    env = {key: value for key, value in os.environ.items()
+           if key not in ("OPENAI_API_KEY", "OPENAI_BASE_URL") and not key.startswith("DB_")}
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def run_importtime(job: str) -> list[tuple[int, int, int, str]]:
+    """(自身の時間µs, 累積µs, 深さ, モジュール名) の一覧（読み込み順）"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=os.path.join(JOBS_DIR, job), env=clean_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{job} の読み込みに失敗しました:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, name))
+    return entries
+
+
+def main_block(entries: list[tuple[int, int, int, str]]) -> list[tuple[int, int, int, str]]:
+    """main とその配下で読み込んだモジュール（子は親より前に出力される）"""
+    end = max(index for index, entry in enumerate(entries) if entry[2] == 0 and entry[3] == "main")
+    start = end
+    while start > 0 and entries[start - 1][2] > 0:
+        start -= 1
+    return entries[start:end + 1]
+
+
+def measure_imports(job: str, repeat: int, top: int) -> tuple[float, list[str], list[tuple[int, str]]]:
+    """(main の読み込み時間ms の最小値, 読み込まれた禁止モジュール, 時間のかかる直下のモジュール)"""
+    best = None
+    for _ in range(repeat):
+        entries = run_importtime(job)
+        block = main_block(entries)
+        total = block[-1][1]
+        if best is None or total < best[0]:
+            best = (total, entries, block)
+
+    total, entries, block = best
+    imported = {entry[3] for entry in entries}
+    forbidden = sorted(name for name in imported if name.split(".")[0] in FORBIDDEN_MODULES)
+    children = sorted(((cumulative, name) for _, cumulative, depth, name in block if depth == 1), reverse=True)
+    return total / 1000, forbidden, children[:top]
+
+
+def interpreter_startup(repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=clean_env(), capture_output=True)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+# -- 処理対象がない状態での実行 --------------
+def run_without_work(job: str) -> tuple[float, bool, str]:
+    """(終了までの秒数, 処理対象なしで終了したか, 出力の末尾)"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = {**clean_env(), **DB_ENV, "STRUCTURED_LOGS": "false"}
+        if job == "rss-collector":
+            # フィードなしの設定（取得予定のフィードがない状態）
+            rss_config_path = os.path.join(work_dir, "rss_feeds.yaml")
+            with open(rss_config_path, "w", encoding="utf-8") as f:
+                f.write("sources: {}\n")
+            env["RSS_FEEDS_PATH"] = rss_config_path
+
+        started_at = time.perf_counter()
+        result = subprocess.run([sys.executable, os.path.join(JOBS_DIR, job, "main.py")], cwd=work_dir, env=env,
+                                capture_output=True, text=True)
+        elapsed = time.perf_counter() - started_at
+
+    output = result.stdout + result.stderr
+    no_work = result.returncode == 0 and ("処理対象の記事がありません" in output or "取得予定のフィード" in output)
+    return elapsed, no_work, output[-1000:]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--jobs", nargs="+", default=JOBS, choices=JOBS)
+    arg_parser.add_argument("--budget-ms", type=float, default=500, help="main.py の読み込み時間の予算（ms）")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="計測回数（最小値を使用）")
+    arg_parser.add_argument("--top", type=int, default=8, help="表示するモジュール数")
+    arg_parser.add_argument("--no-work", action="store_true", help="処理対象がない状態での実行時間も計測する（DB接続が必要）")
+    arg_parser.add_argument("--no-work-budget-ms", type=float, default=1000, help="処理対象がない場合の実行時間の予算（ms）")
+    args = arg_parser.parse_args()
+
+    failures = []
+    print(f"Python起動のみ: {interpreter_startup(args.repeat) * 1000:.0f}ms（参考）")
+
+    for job in args.jobs:
+        total_ms, forbidden, children = measure_imports(job, args.repeat, args.top)
+        status = "OK" if total_ms <= args.budget_ms else "予算超過"
+        print(f"\n[{job}] main.py の読み込み {total_ms:.0f}ms（予算 {args.budget_ms:.0f}ms）: {status}")
+        for cumulative, name in children:
+            print(f"  {cumulative / 1000:>8.1f}ms  {name}")
+        if total_ms > args.budget_ms:
+            failures.append(f"{job}: 読み込み {total_ms:.0f}ms")
+        if forbidden:
+            print(f"  起動時に読み込まれた重い依存: {', '.join(forbidden)}")
+            failures.append(f"{job}: {', '.join(forbidden)} を起動時に読み込み")
+
+        if args.no_work:
+            elapsed, no_work, tail = run_without_work(job)
+            if not no_work:
+                print(f"  処理対象なしの実行: 処理対象があるか失敗したため計測対象外\n{tail}")
+                continue
+            status = "OK" if elapsed * 1000 <= args.no_work_budget_ms else "予算超過"
+            print(f"  処理対象なしの実行: {elapsed * 1000:.0f}ms（予算 {args.no_work_budget_ms:.0f}ms）: {status}")
+            if elapsed * 1000 > args.no_work_budget_ms:
+                failures.append(f"{job}: 処理対象なしの実行 {elapsed * 1000:.0f}ms")
+
+    if failures:
+        print(f"\n予算超過: {'; '.join(failures)}")
+        sys.exit(1)
+    print("\n予算内")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+OpenAI互換APIのスタブサーバ
+
+POST /v1/chat/completions に固定の応答を返す。応答遅延と 429/500 の発生率を指定でき、
+GET /stats でリクエスト数を確認できる。単体起動・ベンチマークからの組み込みの両方に対応。
+Batch API（/v1/files, /v1/batches）も簡易的に実装しており、バッチは --batch-delay 秒後に完了する。
+
+    python benchmarks/stub_openai/stub_openai_server.py --port 8900 --latency 0.2 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=dummy python jobs/metadata-generator/main.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_SUMMARY = "TSMCは熊本の第2工場で2027年に量産を開始する計画を発表した。投資額は約2兆円である。"
+DEFAULT_TAGS = ["半導体", "TSMC", "熊本", "工場", "2027", "ファウンドリ"]
+
+
+# -- サーバ状態 --------------
+class StubState:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, batch_delay: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.batch_delay = batch_delay
+        self.files: dict[str, dict] = {}
+        self.batches: dict[str, dict] = {}
+        self.requests = Counter()
+        self.errors = Counter()
+        self.prompt_chars = 0
+        self.lock = threading.Lock()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "prompt_chars": self.prompt_chars,
+                "batches": {batch_id: batch["status"] for batch_id, batch in self.batches.items()},
+            }
+
+
+# -- 応答本文の生成 --------------
+def build_completion(body: dict) -> dict:
+    messages = body.get("messages", [])
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    response_format = body.get("response_format") or {}
+
+    # 構造化出力（JSON）の要求には要約とタグをまとめて返す
+    if response_format.get("type") in ("json_schema", "json_object"):
+        content = json.dumps({"summary": DEFAULT_SUMMARY, "tags": DEFAULT_TAGS}, ensure_ascii=False)
+    elif "タグ" in prompt:
+        content = ", ".join(DEFAULT_TAGS)
+    elif "yyyy-mm-dd" in prompt:
+        content = "2025-12-16"
+    else:
+        content = DEFAULT_SUMMARY
+
+    prompt_tokens = max(1, len(prompt) // 2)
+    completion_tokens = max(1, len(content) // 2)
+    return {
+        "id": f"chatcmpl-stub-{random.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+# -- Batch API --------------
+def new_id(prefix: str) -> str:
+    return f"{prefix}-stub-{uuid.uuid4().hex[:12]}"
+
+
+def store_file(state: StubState, filename: str, purpose: str, data: bytes) -> dict:
+    file = {
+        "id": new_id("file"),
+        "object": "file",
+        "bytes": len(data),
+        "created_at": int(time.time()),
+        "filename": filename,
+        "purpose": purpose,
+        "status": "processed",
+    }
+    state.files[file["id"]] = {"meta": file, "data": data}
+    return file
+
+
+def parse_multipart(content_type: str, raw: bytes) -> dict[str, tuple[str | None, bytes]]:
+    message = BytesParser(policy=default_policy).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + raw
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+def run_batch(state: StubState, batch: dict):
+    """入力ファイルの各リクエストに応答し、成功分を出力ファイル・失敗分をエラーファイルに書き出す"""
+    input_data = state.files[batch["input_file_id"]]["data"].decode("utf-8")
+    outputs, errors = [], []
+    for line in input_data.splitlines():
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if state.error_rate and random.random() < state.error_rate:
+            errors.append({"id": new_id("batch_req"), "custom_id": request["custom_id"], "response": None,
+                           "error": {"code": "server_error", "message": "stub error"}})
+            continue
+        state.prompt_chars += sum(len(str(m.get("content", ""))) for m in request["body"].get("messages", []))
+        outputs.append({"id": new_id("batch_req"), "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "request_id": new_id("req"),
+                                     "body": build_completion(request["body"])},
+                        "error": None})
+
+    def to_jsonl(rows: list[dict]) -> bytes:
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+    if outputs:
+        batch["output_file_id"] = store_file(state, "batch_output.jsonl", "batch_output", to_jsonl(outputs))["id"]
+    if errors:
+        batch["error_file_id"] = store_file(state, "batch_errors.jsonl", "batch_output", to_jsonl(errors))["id"]
+    batch["status"] = "completed"
+    batch["completed_at"] = int(time.time())
+    batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+
+
+# -- リクエストハンドラ --------------
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            try:
+                return json.loads(raw or b"{}")
+            except ValueError:
+                return {}
+
+        def _send_bytes(self, status: int, data: bytes, content_type: str = "application/octet-stream"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path = self.path.split("?")[0].rstrip("/")
+            parts = path.split("/")
+            with state.lock:
+                state.requests[f"GET {'/'.join(parts[:3])}"] += 1
+
+            if path.endswith("/stats"):
+                self._send_json(200, state.snapshot())
+                return
+
+            # GET /v1/batches/{id}（遅延経過後に完了させる）
+            if len(parts) == 4 and parts[2] == "batches" and parts[3] in state.batches:
+                with state.lock:
+                    batch = state.batches[parts[3]]
+                    if batch["status"] == "in_progress" and time.time() >= batch["created_at"] + state.batch_delay:
+                        run_batch(state, batch)
+                    self._send_json(200, batch)
+                return
+
+            # GET /v1/batches（新しい順。ページングは行わない）
+            if len(parts) == 3 and parts[2] == "batches":
+                with state.lock:
+                    batches = sorted(state.batches.values(), key=lambda batch: batch["created_at"], reverse=True)
+                    self._send_json(200, {"object": "list", "data": batches, "has_more": False})
+                return
+
+            # GET /v1/files/{id}/content
+            if len(parts) == 5 and parts[2] == "files" and parts[4] == "content" and parts[3] in state.files:
+                self._send_bytes(200, state.files[parts[3]]["data"], "application/jsonl")
+                return
+
+            self._send_json(404, {"error": {"message": "not found"}})
+
+        def _handle_file_upload(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            fields = parse_multipart(self.headers.get("Content-Type", ""), self.rfile.read(length))
+            filename, data = fields.get("file", (None, b""))
+            purpose = fields.get("purpose", (None, b"batch"))[1].decode("utf-8")
+            with state.lock:
+                file = store_file(state, filename or "upload.jsonl", purpose, data)
+            self._send_json(200, file)
+
+        def _handle_batch_create(self, body: dict):
+            if body.get("input_file_id") not in state.files:
+                self._send_json(400, {"error": {"message": "input file not found"}})
+                return
+            batch = {
+                "id": new_id("batch"),
+                "object": "batch",
+                "endpoint": body.get("endpoint", "/v1/chat/completions"),
+                "input_file_id": body["input_file_id"],
+                "completion_window": body.get("completion_window", "24h"),
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "output_file_id": None,
+                "error_file_id": None,
+                "metadata": body.get("metadata"),
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            with state.lock:
+                state.batches[batch["id"]] = batch
+            self._send_json(200, batch)
+
+        def do_POST(self):
+            path = self.path.split("?")[0].rstrip("/")
+            with state.lock:
+                state.requests[path] += 1
+
+            if path.endswith("/files"):
+                self._handle_file_upload()
+                return
+
+            body = self._read_json()
+            if path.endswith("/batches"):
+                self._handle_batch_create(body)
+                return
+
+            if not path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            if state.latency:
+                time.sleep(state.latency)
+
+            # 擬似的なレート制限・サーバエラー
+            if state.error_rate and random.random() < state.error_rate:
+                status = random.choice([429, 500])
+                with state.lock:
+                    state.errors[status] += 1
+                self._send_json(status, {"error": {"message": f"stub error {status}", "type": "stub"}},
+                                headers={"Retry-After": "0"})
+                return
+
+            completion = build_completion(body)
+            with state.lock:
+                state.prompt_chars += sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+            self._send_json(200, completion)
+
+    return Handler
+
+
+# -- 起動 --------------
+def start_server(port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 batch_delay: float = 0.0) -> tuple[ThreadingHTTPServer, StubState]:
+    """バックグラウンドスレッドでサーバを起動する。port=0で空きポートを使用"""
+    state = StubState(latency, error_rate, batch_delay)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="OpenAI互換APIのスタブサーバ")
+    arg_parser.add_argument("--port", type=int, default=8900)
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="応答遅延（秒）")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="429/500を返す確率")
+    arg_parser.add_argument("--batch-delay", type=float, default=0.0, help="バッチ完了までの秒数")
+    args = arg_parser.parse_args()
+
+    server, _ = start_server(args.port, args.latency, args.error_rate, args.batch_delay)
+    print(f"スタブサーバ起動: http://127.0.0.1:{server.server_address[1]}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import { notFound } from "next/navigation";
 import Image from "next/image";
 import Link from "next/link";
-import { getArticleById } from "@/repositories/articleRepository";
+import { getArticleById, getDuplicateArticles } from "@/repositories/articleRepository";
 import { PageHeader } from "@/components/PageHeader";
 
 interface Props {
@@ -17,6 +17,8 @@ export default async function ArticlePage(props: Props) {
     notFound();
   }
 
+  const duplicates = await getDuplicateArticles(article);
+
   // Format date helper (local to server component, or could import utils)
   const formattedDate = article.published_date
     ? new Date(article.published_date).toLocaleDateString("ja-JP", {
@@ -116,6 +118,33 @@ export default async function ArticlePage(props: Props) {
                 </p>
               </div>
             )}
+            {!article.content && article.content_archived_at && (
+              <p className="text-sm text-gray-500 dark:text-gray-400 mb-8">
+                本文はアーカイブ済みのため表示していません。全文は元の記事を参照してください。
+              </p>
+            )}
+
+            {/* Duplicates */}
+            {duplicates.length > 0 && (
+              <div className="mb-8">
+                <h3 className="text-lg font-bold mb-2 text-gray-900 dark:text-gray-100">同じ内容の記事</h3>
+                <ul className="space-y-2">
+                  {duplicates.map((duplicate) => (
+                    <li key={duplicate.id} className="text-sm text-gray-700 dark:text-gray-300">
+                      <Link
+                        href={`/articles/${duplicate.id}`}
+                        className="hover:text-blue-600 dark:hover:text-blue-400 transition-colors"
+                      >
+                        <span className="font-semibold text-blue-600 dark:text-blue-400 mr-2">
+                          {duplicate.source}
+                        </span>
+                        {duplicate.title}
+                      </Link>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            )}
 
             {/* Actions */}
             <div className="border-t border-gray-200 dark:border-gray-700 pt-6 mt-8 flex justify-center">
@@ -2,10 +2,12 @@ import { InfiniteScrollList } from "@/components/InfiniteScrollList";
 import { SearchHeader } from "@/components/SearchHeader";
 import { PageHeader } from "@/components/PageHeader";
 import { ErrorMessage } from "@/components/ErrorMessage";
-import { Article } from "@/types/article";
+import { TagList } from "@/components/TagList";
+import { Article, TagCount } from "@/types/article";
 import {
   getArticles,
   getSources,
+  getTagCounts,
 } from "@/repositories/articleRepository";
 
 // 動的レンダリングを強制
@@ -33,15 +35,18 @@ export default async function Home(props: PageProps) {
   // データ取得（初回100件）
   let articles: Article[] = [];
   let sources: string[] = [];
+  let tagCounts: TagCount[] = [];
   let hasError = false;
 
   try {
     const results = await Promise.all([
       getArticles(source, tag, q, date, 100, 0),
       getSources(),
+      getTagCounts(30),
     ]);
     articles = results[0];
     sources = results[1];
+    tagCounts = results[2];
   } catch (error) {
     console.error("Failed to load data:", error);
     hasError = true;
@@ -63,6 +68,9 @@ export default async function Home(props: PageProps) {
             <ErrorMessage />
           ) : (
             <>
+              {/* タグ一覧（記事数の多い順） */}
+              <TagList tags={tagCounts} />
+
               <div className="mb-4 text-sm text-gray-600 dark:text-gray-400">
                 {articles.length}件の記事を表示中
                 {source && ` （出典: ${source}）`}
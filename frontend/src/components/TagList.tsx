@@ -0,0 +1,48 @@
+"use client";
+
+import Link from "next/link";
+import { useSearchParams } from "next/navigation";
+import { useTranslation } from "@/hooks/useTranslation";
+import { TagCount } from "@/types/article";
+
+interface TagListProps {
+  tags: TagCount[];
+}
+
+// -- タグ一覧（記事数の多い順。tag_counts の集計済みの記事数を表示） --------------
+export function TagList({ tags }: TagListProps) {
+  const { t } = useTranslation();
+  const searchParams = useSearchParams();
+  const selectedTag = searchParams.get("tag") || "";
+
+  if (tags.length === 0) {
+    return null;
+  }
+
+  // 他の絞り込み条件は維持し、選択中のタグを押すと解除する
+  const tagHref = (tag: string) => {
+    const params = new URLSearchParams(searchParams.toString());
+    if (tag === selectedTag) params.delete("tag");
+    else params.set("tag", tag);
+    return `/?${params.toString()}`;
+  };
+
+  return (
+    <nav className="mb-6 flex flex-wrap gap-2" aria-label={t("filter.Tags") || "Tags"}>
+      {tags.map(({ tag, article_count }) => (
+        <Link
+          key={tag}
+          href={tagHref(tag)}
+          className={`text-xs px-2 py-1 rounded-full border transition-colors ${
+            tag === selectedTag
+              ? "bg-blue-600 border-blue-600 text-white"
+              : "bg-white/70 dark:bg-slate-800/70 border-gray-200 dark:border-gray-700 text-gray-700 dark:text-gray-300 hover:border-blue-400"
+          }`}
+        >
+          #{tag}
+          <span className="ml-1 opacity-70">{article_count}</span>
+        </Link>
+      ))}
+    </nav>
+  );
+}
@@ -0,0 +1,57 @@
+// 日本語（ひらがな・カタカナ・漢字）の連続と、英数字の連続
+const TOKEN_PATTERN =
+  /([\u3041-\u3096\u309d\u309e\u30a1-\u30fa\u30fc-\u30ff\u3005\u3006\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+)|([0-9a-z]+)/g;
+
+// -- 検索用のトークン列（jobs/common/search_document.py の search_tokens と同じ規則） --------------
+export function searchTokens(text: string): string[] {
+  const normalized = text.normalize("NFKC").toLowerCase();
+  const tokens: string[] = [];
+  for (const [, japanese, word] of normalized.matchAll(TOKEN_PATTERN)) {
+    if (word) {
+      tokens.push(word);
+    } else if (japanese.length === 1) {
+      tokens.push(japanese);
+    } else {
+      for (let i = 0; i < japanese.length - 1; i++) {
+        tokens.push(japanese.slice(i, i + 2));
+      }
+    }
+  }
+  return tokens;
+}
+
+// LIKE のワイルドカードをエスケープ
+function escapeLike(value: string): string {
+  return value.replace(/[\\%_]/g, "\\$&");
+}
+
+// -- 検索条件（空白区切りの語ごとにフレーズ照合し AND で結合） --------------
+export function buildSearchCondition(query: string, params: (string | number)[]): string {
+  const conditions: string[] = [];
+  for (const term of query.split(/\s+/)) {
+    const tokens = searchTokens(term);
+    if (tokens.length === 0) {
+      continue;
+    }
+
+    // 日本語1文字の語はその文字で始まるバイグラムを前方一致で照合
+    if (tokens.length === 1 && tokens[0].length === 1 && !/[0-9a-z]/.test(tokens[0])) {
+      params.push(`${tokens[0]}:*`);
+      conditions.push(`search_tsv @@ to_tsquery('simple', $${params.length})`);
+    } else {
+      // english 設定のストップワードのみの語（"IT" など）は検索文書に含まれないため、タイトルの部分一致で照合
+      params.push(tokens.join(" "));
+      const tsquery = `phraseto_tsquery('english', $${params.length})`;
+      params.push(`%${escapeLike(term)}%`);
+      conditions.push(
+        `(CASE WHEN numnode(${tsquery}) = 0 THEN title ILIKE $${params.length} ELSE search_tsv @@ ${tsquery} END)`
+      );
+    }
+  }
+
+  // 検索できる語がない場合は一致なし
+  if (conditions.length === 0) {
+    return "FALSE";
+  }
+  return `(${conditions.join(" AND ")})`;
+}
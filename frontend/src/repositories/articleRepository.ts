@@ -1,5 +1,56 @@
 import { getPool } from "@/lib/db";
-import { Article } from "@/types/article";
+import { buildSearchCondition } from "@/lib/searchQuery";
+import { Article, DuplicateArticle, TagCount } from "@/types/article";
+
+// タグ辞書の照合キー（jobs/common/tag_normalizer.py の tag_slug と同じ規則）
+const TRIM_CHARS = " \t#＃・,、。「」『』【】\"'";
+const BRACKET_PAIRS: [string, string][] = [["(", ")"], ["[", "]"]];
+const CJK_SPACE_PATTERN = /(?<=[^\x00-\x7f]) (?=\S)|(?<=\S) (?=[^\x00-\x7f])/g;
+const CHEROKEE_SMALL_PATTERN = /[\uab70-\uabbf\u13f8-\u13fd]/g;
+
+function trimChars(text: string): string {
+  let start = 0;
+  let end = text.length;
+  while (start < end && TRIM_CHARS.includes(text[start])) start++;
+  while (end > start && TRIM_CHARS.includes(text[end - 1])) end--;
+  return text.slice(start, end);
+}
+
+function count(text: string, char: string): number {
+  return text.split(char).length - 1;
+}
+
+// 前後の対応しない括弧と、全体を囲む括弧のみ除く
+function stripUnbalancedBrackets(text: string): string {
+  for (const [opening, closing] of BRACKET_PAIRS) {
+    const inner = text.slice(1, -1);
+    if (text.startsWith(opening) && text.endsWith(closing) && !inner.includes(opening) && !inner.includes(closing)) {
+      text = trimChars(inner);
+    }
+    if (text.startsWith(opening) && count(text, opening) > count(text, closing)) {
+      text = trimChars(text.slice(1));
+    }
+    if (text.endsWith(closing) && count(text, closing) > count(text, opening)) {
+      text = trimChars(text.slice(0, -1));
+    }
+  }
+  return text;
+}
+
+// Python の str.casefold() と同じ結果にする（大文字化してから小文字化すると ß・ᾳ などが展開される。
+// ı は大文字化で i に変わるため除き、語末の ς・チェロキー文字は casefold の規則に合わせる）
+function caseFold(text: string): string {
+  return text
+    .replace(/[^ı]+/g, (part) => part.toUpperCase().toLowerCase())
+    .replace(/ß/g, "ss")
+    .replace(/ς/g, "σ")
+    .replace(CHEROKEE_SMALL_PATTERN, (char) => char.toUpperCase());
+}
+
+function tagSlug(tag: string): string {
+  const text = stripUnbalancedBrackets(trimChars(tag.normalize("NFKC").replace(/\s+/g, " ")));
+  return caseFold(text.replace(CJK_SPACE_PATTERN, ""));
+}
 
 // -- 記事一覧取得（ページネーション対応） --------------
 export async function getArticles(
@@ -13,9 +64,9 @@ export async function getArticles(
   try {
     const pool = await getPool();
     let query = `
-      SELECT id, title, url, source, image_url, content, published_date, summary, tags, created_at, updated_at, metadata_generated
+      SELECT id, title, url, source, image_url, content, content_archived_at, published_date, summary, tags, created_at, updated_at, metadata_generated, duplicate_of
       FROM articles
-      WHERE 1=1
+      WHERE duplicate_of IS NULL
     `;
     const params: (string | number)[] = [];
 
@@ -25,14 +76,21 @@ export async function getArticles(
       query += ` AND source = $${params.length}`;
     }
 
+    // タグ辞書の slug（一意インデックス）で一致するタグを引き、article_tags から記事を絞り込む
+    // （表記揺れは slug で吸収する。部分一致はタイトル・タグを対象とする全文検索で行う）
     if (tag) {
-      params.push(`%${tag}%`);
-      query += ` AND EXISTS (SELECT 1 FROM unnest(tags) AS t WHERE t ILIKE $${params.length})`;
+      params.push(tagSlug(tag));
+      query += ` AND id IN (
+        SELECT at.article_id
+        FROM article_tags AS at
+        JOIN tags AS t ON t.id = at.tag_id
+        WHERE t.slug = $${params.length}
+      )`;
     }
 
+    // 全文検索（search_tsv のGINインデックスで照合）
     if (searchQuery) {
-      params.push(`%${searchQuery}%`);
-      query += ` AND (title ILIKE $${params.length} OR EXISTS (SELECT 1 FROM unnest(tags) AS t WHERE t ILIKE $${params.length}))`;
+      query += ` AND ${buildSearchCondition(searchQuery, params)}`;
     }
 
     if (date) {
@@ -62,7 +120,7 @@ export async function getArticles(
 export async function getArticleById(id: string): Promise<Article | null> {
   const pool = await getPool();
   const query = `
-    SELECT id, title, url, source, image_url, content, published_date, summary, tags, created_at, updated_at, metadata_generated
+    SELECT id, title, url, source, image_url, content, content_archived_at, published_date, summary, tags, created_at, updated_at, metadata_generated, duplicate_of
     FROM articles
     WHERE id = $1
   `;
@@ -75,6 +133,26 @@ export async function getArticleById(id: string): Promise<Article | null> {
   return result.rows[0];
 }
 
+// -- 近似重複記事の取得（同じ正規記事を持つ記事。自身は除く） --------------
+export async function getDuplicateArticles(article: Article): Promise<DuplicateArticle[]> {
+  try {
+    const pool = await getPool();
+    const canonicalId = article.duplicate_of ?? article.id;
+    const query = `
+      SELECT id, title, url, source, published_date
+      FROM articles
+      WHERE (id = $1 OR duplicate_of = $1) AND id <> $2
+      ORDER BY published_date ASC NULLS LAST, created_at ASC
+    `;
+    const result = await pool.query(query, [canonicalId, article.id]);
+
+    return result.rows;
+  } catch (error) {
+    console.error("Failed to fetch duplicate articles:", error);
+    return [];
+  }
+}
+
 // -- すべての出典を取得 --------------
 export async function getSources(): Promise<string[]> {
   try {
@@ -94,15 +172,16 @@ export async function getSources(): Promise<string[]> {
   }
 }
 
-// -- すべてのタグを取得 --------------
+// -- すべてのタグを取得（記事のあるタグのみ） --------------
 export async function getTags(): Promise<string[]> {
   try {
     const pool = await getPool();
     const query = `
-      SELECT DISTINCT unnest(tags) as tag
-      FROM articles
-      WHERE tags IS NOT NULL
-      ORDER BY tag
+      SELECT t.name AS tag
+      FROM tags AS t
+      JOIN tag_counts AS c ON c.tag_id = t.id
+      WHERE c.article_count > 0
+      ORDER BY t.name
     `;
     const result = await pool.query(query);
 
@@ -112,3 +191,24 @@ export async function getTags(): Promise<string[]> {
     return [];
   }
 }
+
+// -- タグごとの記事数を取得（記事数の多い順） --------------
+export async function getTagCounts(limit: number = 50): Promise<TagCount[]> {
+  try {
+    const pool = await getPool();
+    const query = `
+      SELECT t.name AS tag, c.article_count
+      FROM tag_counts AS c
+      JOIN tags AS t ON t.id = c.tag_id
+      WHERE c.article_count > 0
+      ORDER BY c.article_count DESC, t.name
+      LIMIT $1
+    `;
+    const result = await pool.query(query, [limit]);
+
+    return result.rows;
+  } catch (error) {
+    console.error("Failed to fetch tag counts:", error);
+    return [];
+  }
+}
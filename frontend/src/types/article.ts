@@ -5,10 +5,21 @@ export interface Article {
   source: string;
   image_url: string | null;
   content: string | null;
+  content_archived_at: string | null;
   published_date: string | null;
   summary: string | null;
   tags: string[] | null;
   created_at: string;
   updated_at: string;
   metadata_generated: boolean;
+  duplicate_of: string | null;
+}
+
+// 近似重複（同じ内容を転載した他の出典の記事）
+export type DuplicateArticle = Pick<Article, "id" | "title" | "url" | "source" | "published_date">;
+
+// タグごとの記事数（tag_counts）
+export interface TagCount {
+  tag: string;
+  article_count: number;
 }
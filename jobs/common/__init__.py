@@ -0,0 +1 @@
+# 両ジョブ（rss-collector / metadata-generator）の共通モジュール
@@ -0,0 +1,118 @@
+import json
+import re
+from bs4 import BeautifulSoup, Tag
+
+
+# 本文として扱う最小文字数
+MIN_BODY_CHARS = 200
+
+# 本文に含まれない要素
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "iframe", "svg", "canvas",
+                    "nav", "header", "footer", "aside", "form", "button", "select"]
+BOILERPLATE_PATTERN = re.compile(
+    r"(^|[-_\s])(nav|navi|menu|breadcrumb|footer|header|sidebar|side|related|recommend|ranking|"
+    r"popular|share|sns|social|comment|banner|ad|ads|advert|promo|pr|pager|pagination|tag-?list)([-_\s]|$)",
+    re.I,
+)
+BLOCK_TAGS = ["p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre", "tr", "dd", "dt", "br", "div", "section"]
+SPACES_PATTERN = re.compile(r"[ \t 　\r\f\v]+")
+
+
+# -- 空白の正規化（行内の連続空白は1つに、空行は除去） --------------
+def normalize_whitespace(text: str) -> str:
+    lines = (SPACES_PATTERN.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+# -- JSON-LD の articleBody --------------
+def _json_ld_article_body(soup: BeautifulSoup) -> str | None:
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text())
+        except ValueError:
+            continue
+
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                body = node.get("articleBody")
+                if isinstance(body, str) and len(body.strip()) >= MIN_BODY_CHARS:
+                    return body
+                stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    return None
+
+
+# -- ブロック単位で改行を保ったテキスト化 --------------
+def _block_text(element: Tag) -> str:
+    for block in element.find_all(BLOCK_TAGS):
+        block.insert_before("\n")
+        block.insert_after("\n")
+    return normalize_whitespace(element.get_text())
+
+
+def _remove_boilerplate(soup: BeautifulSoup):
+    for tag in soup.find_all(BOILERPLATE_TAGS):
+        tag.decompose()
+
+    for tag in soup.find_all(True):
+        if tag.decomposed or tag.attrs is None:
+            continue
+        classes = " ".join(tag.get("class") or [])
+        identifier = f"{classes} {tag.get('id') or ''} {tag.get('role') or ''}"
+        if tag.name not in ("html", "body", "article", "main") and BOILERPLATE_PATTERN.search(identifier):
+            tag.decompose()
+
+
+# -- テキスト密度による本文ブロック推定 --------------
+def _best_density_block(soup: BeautifulSoup) -> Tag | None:
+    scores: dict[int, float] = {}
+    elements: dict[int, Tag] = {}
+
+    for paragraph in soup.find_all(["p", "pre", "blockquote"]):
+        text = paragraph.get_text(strip=True)
+        if len(text) < 20:
+            continue
+        link_chars = sum(len(link.get_text(strip=True)) for link in paragraph.find_all("a"))
+        score = len(text) * (1 - link_chars / len(text))
+
+        # 親に全量、祖父母に半分を加点
+        for parent, weight in ((paragraph.parent, 1.0), (paragraph.parent.parent if paragraph.parent else None, 0.5)):
+            if isinstance(parent, Tag):
+                scores[id(parent)] = scores.get(id(parent), 0.0) + score * weight
+                elements[id(parent)] = parent
+
+    if not scores:
+        return None
+    return elements[max(scores, key=scores.get)]
+
+
+# -- 記事本文抽出 --------------
+def extract_article_text(soup: BeautifulSoup) -> str:
+    """
+    ナビゲーション・フッター・関連記事などを除いた本文を抽出する。
+    JSON-LD の articleBody → <article> / articleBody / <main> → テキスト密度の順に判定する。
+    soup は変更されるため、日付・画像などの抽出後に呼び出すこと。
+    """
+    body = _json_ld_article_body(soup)
+    if body:
+        return normalize_whitespace(body)
+
+    _remove_boilerplate(soup)
+
+    candidates = soup.find_all("article") + soup.find_all(attrs={"itemprop": "articleBody"}) + soup.find_all("main")
+    for candidate in sorted(candidates, key=lambda tag: len(tag.get_text(strip=True)), reverse=True)[:1]:
+        text = _block_text(candidate)
+        if len(text) >= MIN_BODY_CHARS:
+            return text
+
+    block = _best_density_block(soup)
+    if block is not None:
+        text = _block_text(block)
+        if len(text) >= MIN_BODY_CHARS:
+            return text
+
+    root = soup.body or soup
+    return _block_text(root)
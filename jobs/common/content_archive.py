@@ -0,0 +1,38 @@
+import hashlib
+
+import zstandard
+
+
+# 退避した本文の圧縮形式（article_content_archive.codec）
+CODEC = "zstd"
+DEFAULT_LEVEL = 10
+
+
+# -- 圧縮・展開 --------------
+def compress_content(content: str, level: int = DEFAULT_LEVEL) -> bytes:
+    """本文（UTF-8）を zstd で圧縮する。フレームに元のサイズを含める"""
+    return zstandard.ZstdCompressor(level=level).compress(content.encode("utf-8"))
+
+
+def decompress_content(data: bytes | memoryview) -> str:
+    return zstandard.ZstdDecompressor().decompress(bytes(data)).decode("utf-8")
+
+
+def content_md5(content: str) -> str:
+    """PostgreSQL の md5(content) と同じ値（退避中に本文が更新されていないかの確認用）"""
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+# -- 本文の読み込み（articles.content が退避済みなら展開） --------------
+# articles を a として参照するクエリに結合する
+ARCHIVE_JOIN = "LEFT JOIN article_content_archive AS archive ON archive.article_id = a.id"
+CONTENT_COLUMNS = "a.content, archive.content_zstd"
+
+
+def rehydrate_content(content: str | None, content_zstd: bytes | memoryview | None) -> str | None:
+    """CONTENT_COLUMNS の2列から本文を返す（articles.content を優先）"""
+    if content:
+        return content
+    if content_zstd is not None:
+        return decompress_content(content_zstd)
+    return content
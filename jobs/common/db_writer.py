@@ -0,0 +1,156 @@
+import time
+from dataclasses import dataclass
+from typing import Callable
+from psycopg2.extras import execute_values
+from common.instrumentation import stage
+
+
+# -- 書き込み結果 --------------
+@dataclass
+class WriteStats:
+    submitted: int = 0
+    written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    flushes: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"送信{self.submitted}件, 書き込み{self.written}件, スキップ{self.skipped}件, "
+            f"失敗{self.failed}件 ({self.flushes}回のフラッシュ)"
+        )
+
+
+# -- バッファ付き一括書き込み --------------
+class BatchWriter:
+    """
+    行をバッファに貯め、execute_valuesの複数行SQLで1トランザクションずつ書き込む。
+    queryは `VALUES %s` を含み、書き込まれた行を RETURNING で返すこと。
+    一括書き込みが失敗した場合は1行ずつ（セーブポイント付きで）書き込み直し、失敗した行を failed_rows に残す。
+    on_written はコミット後に RETURNING の結果（書き込まれた行）を受け取る。
+    """
+
+    def __init__(self, conn, query: str, template: str | None = None,
+                 batch_size: int = 100, flush_interval: float = 5.0, label: str = "DB書き込み",
+                 on_written: Callable[[list[tuple]], None] | None = None):
+        self.conn = conn
+        self.query = query
+        self.template = template
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.label = label
+        self.on_written = on_written
+        self.stats = WriteStats()
+        self.failed_rows: list[tuple] = []
+        self._buffer: list[tuple] = []
+        self._last_flush_at = time.monotonic()
+
+    def add(self, row: tuple):
+        self._buffer.append(row)
+        self.stats.submitted += 1
+
+        # 件数または経過時間でフラッシュ
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush_at >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        self._last_flush_at = time.monotonic()
+        if not self._buffer:
+            return 0
+
+        rows, self._buffer = self._buffer, []
+        try:
+            with stage("db.flush"):
+                cursor = self.conn.cursor()
+                returned = execute_values(
+                    cursor, self.query, rows,
+                    template=self.template, page_size=len(rows), fetch=True
+                )
+                self.conn.commit()
+                cursor.close()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"  {self.label}エラー: {len(rows)}件を1行ずつ再試行: {e}")
+            returned, failed = self._write_rows(rows)
+            self.failed_rows.extend(failed)
+            self.stats.failed += len(failed)
+            rows = [row for row in rows if row not in failed]
+
+        if self.on_written is not None and returned:
+            self.on_written(returned)
+        written = len(returned)
+        self.stats.written += written
+        self.stats.skipped += len(rows) - written
+        self.stats.flushes += 1
+        print(f"  {self.label}: {written}/{len(rows)}件")
+        return written
+
+    def _write_rows(self, rows: list[tuple]) -> tuple[list[tuple], list[tuple]]:
+        """1行ずつ書き込む（失敗した行のみセーブポイントまで戻す）。(RETURNING の結果, 失敗した行)"""
+        returned, failed = [], []
+        try:
+            with stage("db.flush_rows"):
+                cursor = self.conn.cursor()
+                for row in rows:
+                    cursor.execute("SAVEPOINT batch_writer_row")
+                    try:
+                        returned.extend(execute_values(cursor, self.query, [row], template=self.template, fetch=True))
+                        cursor.execute("RELEASE SAVEPOINT batch_writer_row")
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT batch_writer_row")
+                        failed.append(row)
+                        print(f"  {self.label}エラー: {e}")
+                self.conn.commit()
+                cursor.close()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"  {self.label}エラー: {len(rows)}件: {e}")
+            return [], rows
+        return returned, failed
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# -- 記事の新規登録（URL重複はスキップ。メタデータ生成前でも検索できるようタイトル・本文の検索文書を作成） --------------
+ARTICLE_INSERT_QUERY = """
+    INSERT INTO articles (title, url, source, image_url, published_date, content, search_tsv)
+    SELECT v.title, v.url, v.source, v.image_url, v.published_date, v.content,
+           build_search_tsv(v.search_title, '', v.search_content)
+    FROM (VALUES %s) AS v(title, url, source, image_url, published_date, content, search_title, search_content)
+    ON CONFLICT (url) DO NOTHING
+    RETURNING url
+"""
+
+
+def article_insert_writer(conn, batch_size: int = 100, flush_interval: float = 5.0) -> BatchWriter:
+    return BatchWriter(conn, ARTICLE_INSERT_QUERY, template="(%s, %s, %s, %s, %s::timestamp, %s, %s, %s)",
+                       batch_size=batch_size, flush_interval=flush_interval, label="記事保存")
+
+
+# -- 記事メタデータの更新（本文を退避済みの記事は、展開した本文を articles.content に書き戻さない） --------------
+ARTICLE_METADATA_UPDATE_QUERY = """
+    UPDATE articles AS a
+    SET content = CASE WHEN a.content_archived_at IS NULL THEN COALESCE(v.content, a.content) ELSE a.content END,
+        summary = v.summary, tags = v.tags,
+        search_tsv = build_search_tsv(v.search_title, v.search_summary, v.search_content),
+        metadata_generated = TRUE, claimed_at = NULL, claimed_by = NULL,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (VALUES %s) AS v(id, content, summary, tags, search_title, search_summary, search_content)
+    WHERE a.id = v.id
+    RETURNING a.id
+"""
+
+
+def article_metadata_writer(conn, batch_size: int = 20, flush_interval: float = 5.0,
+                            on_written: Callable[[list[tuple]], None] | None = None) -> BatchWriter:
+    return BatchWriter(conn, ARTICLE_METADATA_UPDATE_QUERY, template="(%s::uuid, %s, %s, %s::text[], %s, %s, %s)",
+                       batch_size=batch_size, flush_interval=flush_interval, label="メタデータ更新",
+                       on_written=on_written)
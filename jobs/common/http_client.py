@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Mapping
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+
+# -- 既定値 --------------
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; semicon-survey-bot/1.0)"
+DEFAULT_TIMEOUT = (5.0, 15.0)                # (接続, 読み込み) 秒
+DEFAULT_MAX_BYTES = 3 * 1024 * 1024          # 展開後の本文の上限（超過分は切り捨て）
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 64 * 1024
+
+
+class UnsupportedContentType(requests.exceptions.RequestException):
+    """許可していない Content-Type（PDF・画像など）のため本文を読まずに打ち切った"""
+
+
+# -- 1リクエストの計測結果（フックに渡す） --------------
+@dataclass
+class RequestTiming:
+    method: str
+    url: str
+    host: str
+    status_code: int | None
+    elapsed: float                  # 全体（秒）
+    time_to_headers: float          # レスポンスヘッダ受信まで（秒）
+    bytes_received: int = 0         # 展開後の本文バイト数
+    wire_bytes: int = 0             # 転送バイト数（圧縮時は圧縮後）
+    truncated: bool = False
+    error: str | None = None
+
+
+# -- 取得結果 --------------
+@dataclass
+class HttpResponse:
+    url: str                        # リダイレクト後のURL
+    status_code: int
+    headers: Mapping[str, str]       # 大文字小文字を区別しない
+    content: bytes
+    encoding: str | None
+    truncated: bool
+    timing: RequestTiming
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+# -- 集計 --------------
+@dataclass
+class HttpStats:
+    requests: int = 0
+    errors: int = 0
+    truncated: int = 0
+    skipped_content_types: Counter = field(default_factory=Counter)
+    bytes_received: int = 0
+    wire_bytes: int = 0
+    elapsed: list[float] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, timing: RequestTiming):
+        with self._lock:
+            self.requests += 1
+            self.errors += timing.error is not None
+            self.truncated += timing.truncated
+            self.bytes_received += timing.bytes_received
+            self.wire_bytes += timing.wire_bytes
+            self.elapsed.append(timing.elapsed)
+
+    def record_skip(self, content_type: str):
+        with self._lock:
+            self.skipped_content_types[content_type or "unknown"] += 1
+
+    def percentile(self, ratio: float) -> float:
+        with self._lock:
+            ordered = sorted(self.elapsed)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] if ordered else 0.0
+
+    def summary(self) -> str:
+        skipped = sum(self.skipped_content_types.values())
+        return (
+            f"HTTP: {self.requests}回 (エラー{self.errors}件, 上限切り捨て{self.truncated}件, "
+            f"Content-Type除外{skipped}件), 受信{self.bytes_received / 1024:.1f}KB "
+            f"(転送{self.wire_bytes / 1024:.1f}KB), p50 {self.percentile(0.5):.2f}秒, p95 {self.percentile(0.95):.2f}秒"
+        )
+
+
+# -- 共有HTTPクライアント --------------
+class HttpClient:
+    """
+    Session とホスト単位のコネクションプールを共有し、keep-alive で接続を再利用する。
+    429/5xx・接続エラーは指数バックオフで再試行し、gzip/br を展開しながら max_bytes まで読み込む。
+    Content-Type が許可リストにない場合は本文を読まずに UnsupportedContentType を送出する。
+    """
+
+    def __init__(self, pool_connections: int = 32, pool_maxsize: int = 16, max_retries: int = 2,
+                 backoff_factor: float = 0.5, timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_bytes: int = DEFAULT_MAX_BYTES, user_agent: str = DEFAULT_USER_AGENT,
+                 hooks: list[Callable[[RequestTiming], None]] | None = None):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.stats = HttpStats()
+        self.hooks = list(hooks or [])
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                   max_retries=retry, pool_block=False)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.session.headers.update({"User-Agent": user_agent, "Accept-Encoding": ACCEPT_ENCODING})
+
+    def add_hook(self, hook: Callable[[RequestTiming], None]):
+        self.hooks.append(hook)
+
+    def _emit(self, timing: RequestTiming):
+        self.stats.record(timing)
+        for hook in self.hooks:
+            try:
+                hook(timing)
+            except Exception as e:
+                print(f"  HTTPフックエラー: {e}")
+
+    def get(self, url: str, headers: dict | None = None, timeout: float | tuple[float, float] | None = None,
+            max_bytes: int | None = None, allowed_content_types: tuple[str, ...] | None = HTML_CONTENT_TYPES,
+            raise_for_status: bool = True) -> HttpResponse:
+        """
+        allowed_content_types=None で Content-Type を判定しない。
+        raise_for_status=True の場合、4xx/5xx（再試行後）は requests.HTTPError を送出する。
+        """
+        max_bytes = max_bytes or self.max_bytes
+        timing = RequestTiming(method="GET", url=url, host=urlsplit(url).hostname or "",
+                               status_code=None, elapsed=0.0, time_to_headers=0.0)
+        started_at = time.perf_counter()
+        response = None
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout or self.timeout, stream=True)
+            timing.time_to_headers = time.perf_counter() - started_at
+            timing.status_code = response.status_code
+            if raise_for_status:
+                response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if allowed_content_types is not None and content_type and content_type not in allowed_content_types:
+                self.stats.record_skip(content_type)
+                raise UnsupportedContentType(f"対象外のContent-Type: {content_type}", response=response)
+
+            # 展開後のサイズで上限まで読み込む
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= max_bytes:
+                    timing.truncated = received > max_bytes or bool(next(response.iter_content(1), b""))
+                    break
+            content = b"".join(chunks)[:max_bytes]
+
+            timing.bytes_received = len(content)
+            timing.wire_bytes = response.raw.tell() if response.raw is not None else len(content)
+            return HttpResponse(
+                url=response.url,
+                status_code=response.status_code,
+                headers=response.headers,
+                content=content,
+                encoding=response.encoding,
+                truncated=timing.truncated,
+                timing=timing,
+            )
+        except requests.exceptions.RequestException as e:
+            timing.error = type(e).__name__
+            raise
+        finally:
+            if response is not None:
+                response.close()
+            timing.elapsed = time.perf_counter() - started_at
+            self._emit(timing)
+
+    def close(self):
+        self.session.close()
+
+
+# -- プロセス共通のクライアント --------------
+_default_client: HttpClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client(**options) -> HttpClient:
+    """初回呼び出し時の options でクライアントを作成し、以降は同じクライアントを返す"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(**options)
+        return _default_client
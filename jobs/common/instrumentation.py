@@ -0,0 +1,293 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import psycopg2.extensions
+
+
+# -- 設定（環境変数） --------------
+STRUCTURED_LOGS = os.environ.get("STRUCTURED_LOGS", "true").lower() == "true"
+RUN_REPORT_PATH = os.environ.get("RUN_REPORT_PATH")          # 未指定時は /tmp/<ジョブ名>-run-report.json
+PROFILER = os.environ.get("PROFILER", "").lower()             # cprofile / pyinstrument
+PROFILE_OUTPUT = os.environ.get("PROFILE_OUTPUT")
+
+# 100万トークンあたりの料金（USD, 入力・出力）。Batch APIは半額
+LLM_PRICES_PER_1M_TOKENS = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+BATCH_PRICE_RATIO = 0.5
+
+# ヒストグラムで保持するサンプル数の上限（超えたらリザーバサンプリング）
+MAX_SAMPLES = 10000
+
+
+# -- 構造化ログ（Cloud Logging がJSON行を解析する） --------------
+def log_event(message: str, severity: str = "INFO", **fields):
+    if not STRUCTURED_LOGS:
+        return
+    entry = {"severity": severity, "message": message, "job": metrics.job, **fields}
+    print(json.dumps(entry, ensure_ascii=False, default=str), flush=True)
+
+
+def llm_price(model: str) -> tuple[float, float]:
+    """日付付きのモデル名（gpt-4o-mini-2024-07-18 など）は最も長く一致する料金を使う。不明なモデルは0"""
+    matches = [name for name in LLM_PRICES_PER_1M_TOKENS if model == name or model.startswith(name + "-")]
+    return LLM_PRICES_PER_1M_TOKENS[max(matches, key=len)] if matches else (0.0, 0.0)
+
+
+# -- ヒストグラム --------------
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: list[float] = []
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = value
+
+    def percentile(self, ratio: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 4),
+            "mean_seconds": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50_seconds": round(self.percentile(0.5), 4),
+            "p95_seconds": round(self.percentile(0.95), 4),
+            "p99_seconds": round(self.percentile(0.99), 4),
+            "max_seconds": round(self.max, 4),
+        }
+
+
+# -- 実行単位の計測 --------------
+class RunMetrics:
+    """
+    工程ごとの所要時間（ヒストグラム）、カウンタ（受信バイト数・DB往復回数など）、
+    LLMのトークン数と料金を集計する。ワーカースレッドから同時に記録できる。
+    """
+
+    def __init__(self, job: str = ""):
+        self._lock = threading.Lock()
+        self.reset(job)
+
+    def reset(self, job: str):
+        with self._lock:
+            self.job = job
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self.stages: dict[str, Histogram] = {}
+            self.counters: Counter = Counter()
+            self.llm_usage: dict[str, Counter] = {}
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int | float = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    @contextmanager
+    def stage(self, name: str, log: bool = False):
+        """with ブロックの所要時間を name の工程として記録する（log=True で終了時に構造化ログを出力）"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self.observe(name, elapsed)
+            if log:
+                log_event(f"stage {name}", stage=name, elapsed_seconds=round(elapsed, 3))
+
+    def record_http(self, timing):
+        """HttpClient のフック（common.http_client.RequestTiming を受け取る）"""
+        self.observe("http.request", timing.elapsed)
+        with self._lock:
+            self.counters["http.requests"] += 1
+            self.counters["http.bytes"] += timing.bytes_received
+            self.counters["http.wire_bytes"] += timing.wire_bytes
+            if timing.error:
+                self.counters["http.errors"] += 1
+            if timing.truncated:
+                self.counters["http.truncated"] += 1
+
+    def record_llm_usage(self, model: str, prompt_tokens: int, completion_tokens: int, batch: bool = False):
+        input_price, output_price = llm_price(model)
+        cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+        if batch:
+            cost *= BATCH_PRICE_RATIO
+        with self._lock:
+            usage = self.llm_usage.setdefault(model, Counter())
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens or 0
+            usage["completion_tokens"] += completion_tokens or 0
+            usage["cost_usd"] += cost
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = {name: histogram.to_dict() for name, histogram in sorted(self.stages.items())}
+            counters = dict(sorted(self.counters.items()))
+            llm = {
+                model: {**usage, "cost_usd": round(usage["cost_usd"], 6)}
+                for model, usage in self.llm_usage.items()
+            }
+        return {
+            "job": self.job,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "elapsed_seconds": round(time.perf_counter() - self._started, 3),
+            "stages": stages,
+            "counters": counters,
+            "llm": llm,
+            "llm_cost_usd": round(sum(usage["cost_usd"] for usage in llm.values()), 6),
+        }
+
+    def summary_lines(self) -> list[str]:
+        report = self.to_dict()
+        lines = [f"実行時間: {report['elapsed_seconds']:.1f}秒"]
+        for name, stage in report["stages"].items():
+            lines.append(
+                f"  {name}: {stage['count']}回, 合計{stage['total_seconds']:.2f}秒, "
+                f"p50 {stage['p50_seconds'] * 1000:.0f}ms, p95 {stage['p95_seconds'] * 1000:.0f}ms"
+            )
+        counters = report["counters"]
+        if counters.get("http.requests"):
+            lines.append(f"  HTTP受信: {counters['http.bytes'] / 1024:.1f}KB (転送{counters['http.wire_bytes'] / 1024:.1f}KB)")
+        if counters.get("db.round_trips"):
+            lines.append(f"  DB往復: {counters['db.round_trips']}回")
+        for model, usage in report["llm"].items():
+            lines.append(
+                f"  LLM {model}: {usage['requests']}回, 入力{usage['prompt_tokens']}トークン, "
+                f"出力{usage['completion_tokens']}トークン, ${usage['cost_usd']:.4f}"
+            )
+        return lines
+
+
+# プロセス共通の計測（start_run でジョブ名を設定）
+metrics = RunMetrics()
+
+
+def stage(name: str, log: bool = False):
+    return metrics.stage(name, log)
+
+
+# -- DB往復回数の計測（psycopg2.connect の connection_factory に指定） --------------
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    def execute(self, query, vars=None):
+        metrics.increment("db.round_trips")
+        with metrics.stage("db.execute"):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        # executemany は1行ごとにサーバと往復する
+        vars_list = list(vars_list)
+        metrics.increment("db.round_trips", len(vars_list))
+        with metrics.stage("db.execute"):
+            return super().executemany(query, vars_list)
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = InstrumentedCursor
+
+    def commit(self):
+        metrics.increment("db.round_trips")
+        with metrics.stage("db.commit"):
+            return super().commit()
+
+    def rollback(self):
+        metrics.increment("db.round_trips")
+        return super().rollback()
+
+
+# -- プロファイラ（PROFILER=cprofile / pyinstrument。メインスレッドのみ計測） --------------
+class _Profiler:
+    def __init__(self, kind: str, output: str):
+        self.kind = kind
+        self.output = output
+        self._profiler = None
+
+    def start(self):
+        if self.kind == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.kind == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("pyinstrument が未インストールのためプロファイルを無効化します", file=sys.stderr)
+                return
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    def stop(self):
+        if self._profiler is None:
+            return
+        if self.kind == "cprofile":
+            self._profiler.disable()
+            self._profiler.dump_stats(self.output)
+        else:
+            self._profiler.stop()
+            with open(self.output, "w", encoding="utf-8") as f:
+                f.write(self._profiler.output_html())
+        print(f"プロファイル出力: {self.output}")
+
+
+_profiler: _Profiler | None = None
+
+
+# -- 実行の開始・終了 --------------
+def start_run(job: str):
+    """計測をリセットし、PROFILER 指定時はプロファイルを開始する"""
+    global _profiler
+    metrics.reset(job)
+    log_event("run started")
+
+    if PROFILER in ("cprofile", "pyinstrument"):
+        extension = "prof" if PROFILER == "cprofile" else "html"
+        _profiler = _Profiler(PROFILER, PROFILE_OUTPUT or f"/tmp/{job}.{extension}")
+        _profiler.start()
+
+
+def finish_run(**fields) -> dict:
+    """集計を表示し、構造化ログとサマリーファイル（JSON）に出力する"""
+    if _profiler is not None:
+        _profiler.stop()
+
+    report = {**metrics.to_dict(), **fields}
+    print("\n" + "\n".join(metrics.summary_lines()))
+    log_event("run summary", **{key: value for key, value in report.items() if key != "job"})
+
+    path = RUN_REPORT_PATH or f"/tmp/{metrics.job or 'job'}-run-report.json"
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"実行レポート: {path}")
+    except OSError as e:
+        print(f"実行レポート出力エラー: {e}")
+    return report
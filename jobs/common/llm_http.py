@@ -0,0 +1,89 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# -- 既定値 --------------
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_TIMEOUT = (5.0, 120.0)              # (接続, 読み込み) 秒
+
+
+# -- エラー（llm_pool.is_retryable が openai パッケージと同じ名前・status_code で判定する） --------------
+class APIStatusError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+# -- Chat Completions API の直接呼び出し --------------
+class ChatCompletionClient:
+    """
+    OpenAI互換の Chat Completions API を requests で直接呼ぶ（openai / langchain を読み込まない）。
+    再試行は行わない（呼び出し側の call_with_retry で行う）。スレッド間で共有できる。
+    """
+
+    def __init__(self, api_key: str | None, base_url: str | None = None, pool_maxsize: int = 16,
+                 timeout: float | tuple[float, float] = DEFAULT_TIMEOUT):
+        self.url = (base_url or DEFAULT_BASE_URL).rstrip("/") + "/chat/completions"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=pool_maxsize))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=pool_maxsize))
+        self.session.headers.update({"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+
+    def create(self, **body) -> dict:
+        """リクエスト本文（model, messages など）を送り、レスポンスのJSONを返す"""
+        try:
+            response = self.session.post(self.url, json=body, timeout=self.timeout)
+        except requests.exceptions.Timeout as e:
+            raise APITimeoutError(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise APIConnectionError(str(e)) from e
+
+        if response.status_code >= 400:
+            try:
+                message = response.json()["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                message = response.text[:200]
+            raise APIStatusError(f"Error code: {response.status_code} - {message}", response.status_code)
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+def completion_content(response: dict) -> str | None:
+    """1件目の選択肢の本文（拒否・空の場合は None）"""
+    try:
+        return response["choices"][0]["message"].get("content")
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def completion_usage(response: dict) -> tuple[int, int]:
+    """(入力トークン数, 出力トークン数)"""
+    usage = response.get("usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+# -- プロセス共通のクライアント（初回の呼び出し時に作成） --------------
+_default_client: ChatCompletionClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_chat_client(**options) -> ChatCompletionClient:
+    """初回呼び出し時の options でクライアントを作成し、以降は同じクライアントを返す"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ChatCompletionClient(**options)
+        return _default_client
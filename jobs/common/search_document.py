@@ -0,0 +1,46 @@
+import re
+import unicodedata
+
+
+# 本文は先頭のみ索引する（tsvector の位置情報の上限 16383 に収める）
+MAX_CONTENT_CHARS = 10000
+
+# 日本語（ひらがな・カタカナ・漢字）の連続と、英数字の連続
+_TOKEN_PATTERN = re.compile(
+    r"([\u3041-\u3096\u309d\u309e\u30a1-\u30fa\u30fc-\u30ff\u3005\u3006\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+)|([0-9a-z]+)"
+)
+
+
+# -- トークン化 --------------
+def search_tokens(text: str | None) -> list[str]:
+    """
+    検索用のトークン列。日本語は文字バイグラム（1文字のみの連続はその文字）、英数字は単語のまま
+    （語幹処理はPostgreSQLの english 設定で行う）。
+    frontend/src/lib/searchQuery.ts の searchTokens と同じ規則で分割する。
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = []
+    for japanese, word in _TOKEN_PATTERN.findall(text):
+        if word:
+            tokens.append(word)
+        elif len(japanese) == 1:
+            tokens.append(japanese)
+        else:
+            tokens.extend(japanese[i:i + 2] for i in range(len(japanese) - 1))
+    return tokens
+
+
+def search_text(text: str | None) -> str:
+    return " ".join(search_tokens(text))
+
+
+# -- 検索文書（重み A: タイトル・タグ, B: 要約, C: 本文） --------------
+def build_search_document(title: str | None, summary: str | None, tags: list[str] | None,
+                          content: str | None) -> tuple[str, str, str]:
+    """build_search_tsv(a, b, c)（init_db.sql）に渡す重みごとのトークン列"""
+    title_and_tags = " ".join([title or "", *(tags or [])])
+    return (
+        search_text(title_and_tags),
+        search_text(summary),
+        search_text((content or "")[:MAX_CONTENT_CHARS]),
+    )
@@ -0,0 +1,147 @@
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+import yaml
+from psycopg2.extras import execute_values
+
+
+DEFAULT_TAG_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tag_aliases.yaml")
+MAX_TAG_LENGTH = 50
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_CJK_SPACE_PATTERN = re.compile(r"(?<=[^\x00-\x7f]) (?=\S)|(?<=\S) (?=[^\x00-\x7f])")
+_ASCII_NAME_PATTERN = re.compile(r"^[0-9A-Za-z][0-9A-Za-z .&\-]*$")
+_TRIM_CHARS = " \t#＃・,、。「」『』【】\"'"
+_BRACKET_PAIRS = (("(", ")"), ("[", "]"))
+
+
+# -- 文字の統一（全角・半角・空白） --------------
+def fold_text(text: str) -> str:
+    """NFKCで全角英数・半角カナを統一し、前後の記号と空白を整える（日本語に隣接する空白は除く）"""
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _strip_unbalanced_brackets(_WHITESPACE_PATTERN.sub(" ", text).strip(_TRIM_CHARS))
+    return _CJK_SPACE_PATTERN.sub("", text)
+
+
+def _strip_unbalanced_brackets(text: str) -> str:
+    """前後の対応しない括弧と、全体を囲む括弧のみ除く（"(株)東芝"・"Arm (Holdings)" の括弧は残す）"""
+    for opening, closing in _BRACKET_PAIRS:
+        inner = text[1:-1]
+        if text.startswith(opening) and text.endswith(closing) and opening not in inner and closing not in inner:
+            text = inner.strip(_TRIM_CHARS)
+        if text.startswith(opening) and text.count(opening) > text.count(closing):
+            text = text[1:].strip(_TRIM_CHARS)
+        if text.endswith(closing) and text.count(closing) > text.count(opening):
+            text = text[:-1].strip(_TRIM_CHARS)
+    return text
+
+
+def tag_slug(tag: str) -> str:
+    """タグ辞書のキー（大文字小文字を区別しない）"""
+    return fold_text(tag).casefold()
+
+
+# -- 正規化ルール --------------
+@dataclass
+class TagRules:
+    aliases: dict[str, str] = field(default_factory=dict)        # 別表記のslug -> 正規のタグ
+    company_suffixes: tuple[str, ...] = ()
+    company_prefixes: tuple[str, ...] = ()
+    drop: frozenset[str] = frozenset()                            # 付けないタグのslug
+
+
+def load_tag_rules(path: str = DEFAULT_TAG_ALIASES_PATH) -> TagRules:
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    aliases = {}
+    for canonical, variants in (config.get("aliases") or {}).items():
+        canonical = fold_text(str(canonical))
+        for variant in [canonical, *(variants or [])]:
+            aliases[tag_slug(str(variant))] = canonical
+    return TagRules(
+        aliases=aliases,
+        company_suffixes=tuple(unicodedata.normalize("NFKC", s) for s in config.get("company_suffixes") or []),
+        company_prefixes=tuple(unicodedata.normalize("NFKC", s) for s in config.get("company_prefixes") or []),
+        drop=frozenset(tag_slug(str(tag)) for tag in config.get("drop") or []),
+    )
+
+
+# -- タグ正規化 --------------
+class TagNormalizer:
+    def __init__(self, rules: TagRules | None = None):
+        self.rules = rules or load_tag_rules()
+
+    def _strip_company(self, tag: str) -> str:
+        # 「商社」「本社」などを崩さないよう、英数字の社名のみ対象にする
+        for suffix in self.rules.company_suffixes:
+            stem = tag[:-len(suffix)].strip() if tag.endswith(suffix) else ""
+            if stem and _ASCII_NAME_PATTERN.match(stem):
+                return stem
+        for prefix in self.rules.company_prefixes:
+            stem = tag[len(prefix):].strip() if tag.startswith(prefix) else ""
+            if stem and _ASCII_NAME_PATTERN.match(stem):
+                return stem
+        return tag
+
+    def normalize_tag(self, tag: str) -> str | None:
+        """表示用の正規化タグ。付けないタグは None"""
+        folded = fold_text(str(tag))
+        if not folded or len(folded) > MAX_TAG_LENGTH:
+            return None
+        alias = self.rules.aliases.get(folded.casefold())
+        if alias is None:
+            folded = self._strip_company(folded)
+            alias = self.rules.aliases.get(folded.casefold(), folded)
+        if alias.casefold() in self.rules.drop:
+            return None
+        return alias
+
+    def normalize(self, tags: list[str] | None) -> list[str]:
+        """正規化して大文字小文字を区別せずに重複を除く（順序は維持）"""
+        normalized = {}
+        for tag in tags or []:
+            name = self.normalize_tag(tag)
+            if name is not None:
+                normalized.setdefault(name.casefold(), name)
+        return list(normalized.values())
+
+
+# -- タグ辞書（tags テーブル） --------------
+class TagDictionary:
+    """
+    slug ごとに最初に登録された表記を表示名とし、記事の tags にはその表示名を書き込む。
+    article_tags / tag_counts は articles.tags の変更時にトリガーで更新される。
+    DB操作はメインスレッドからのみ行う。
+    """
+
+    def __init__(self, conn, normalizer: TagNormalizer | None = None):
+        self.conn = conn
+        self.normalizer = normalizer or TagNormalizer()
+        self.names: dict[str, str] = {}          # slug -> 表示名
+
+    def resolve(self, tags: list[str] | None) -> list[str]:
+        """正規化したタグを辞書に登録し、辞書の表示名の一覧を返す"""
+        normalized = self.normalizer.normalize(tags)
+        missing = {tag_slug(name): name for name in normalized if tag_slug(name) not in self.names}
+        if missing:
+            cursor = self.conn.cursor()
+            # 新しいタグを登録し、既存のタグも含めて表示名を取得（同時実行時は先に登録した表記を使う）
+            rows = execute_values(cursor, """
+                WITH input(slug, name) AS (VALUES %s),
+                inserted AS (
+                    INSERT INTO tags (slug, name)
+                    SELECT slug, name FROM input
+                    ON CONFLICT DO NOTHING
+                    RETURNING slug, name
+                )
+                SELECT slug, name FROM inserted
+                UNION ALL
+                SELECT t.slug, t.name FROM tags AS t JOIN input AS i ON i.slug = t.slug
+            """, list(missing.items()), fetch=True)
+            self.conn.commit()
+            cursor.close()
+            self.names.update(dict(rows))
+        return list(dict.fromkeys(self.names.get(tag_slug(name), name) for name in normalized))
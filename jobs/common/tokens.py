@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# gpt-4o / gpt-4o-mini のエンコーディング
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # エンコーディングファイルを取得できない環境では概算にフォールバック
+        print(f"トークナイザ読み込みエラー（概算を使用）: {type(e).__name__}")
+        return None
+
+
+# -- トークン数の概算（ASCIIは4文字/トークン、それ以外は1文字/トークン） --------------
+def estimate_tokens(text: str) -> int:
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+# -- トークン数 --------------
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# -- トークン上限での切り詰め --------------
+def truncate_to_token_budget(text: str, max_tokens: int, encoding_name: str = DEFAULT_ENCODING) -> str:
+    if max_tokens <= 0:
+        return text
+
+    encoding = _get_encoding(encoding_name)
+    if encoding is not None:
+        token_ids = encoding.encode(text, disallowed_special=())
+        if len(token_ids) <= max_tokens:
+            return text
+        return encoding.decode(token_ids[:max_tokens])
+
+    # 概算の場合は二分探索で上限内に収まる文字数を求める
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass, replace
+from fnmatch import fnmatchcase
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+
+# 既定で除去するトラッキング用パラメータ（ワイルドカード可、大文字小文字は区別しない）
+# ページや出力形式の切り替えにも使われうる汎用的な名前（ref / feed / amp など）は、ソースごとの url_rules で指定する
+DEFAULT_STRIP_PARAMS = (
+    "utm_*", "fbclid", "gclid", "dclid", "yclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid",
+)
+
+# AMP版のパス（/article/amp, /article.amp.html）
+AMP_PATH_PATTERN = re.compile(r"/amp/?$", re.I)
+AMP_SUFFIX_PATTERN = re.compile(r"\.amp(\.html?)$", re.I)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+# -- 正規化ルール --------------
+@dataclass(frozen=True)
+class UrlRules:
+    strip_params: tuple[str, ...] = DEFAULT_STRIP_PARAMS
+    keep_params: tuple[str, ...] | None = None     # 指定時はこのパラメータのみ残す
+    unwrap_params: tuple[str, ...] = ()            # リダイレクトラッパーの転送先URLを持つパラメータ
+    force_https: bool = False                      # https のみのサイトのソースで指定する
+    strip_www: bool = False
+    strip_trailing_slash: bool = True
+    strip_amp: bool = False                        # AMP版のパスを持つサイトのソースで指定する
+
+
+DEFAULT_URL_RULES = UrlRules()
+
+
+def build_url_rules(config: dict | None, base: UrlRules = DEFAULT_URL_RULES) -> UrlRules:
+    """
+    rss_feeds.yaml の url_rules からルールを作る。
+    strip_params は base に追加され、それ以外の項目は上書きされる。
+    """
+    if not config:
+        return base
+
+    rules = base
+    if config.get("strip_params"):
+        rules = replace(rules, strip_params=rules.strip_params + tuple(p.lower() for p in config["strip_params"]))
+    if config.get("keep_params") is not None:
+        rules = replace(rules, keep_params=tuple(p.lower() for p in config["keep_params"]))
+    if config.get("unwrap_params"):
+        rules = replace(rules, unwrap_params=tuple(config["unwrap_params"]))
+    for key in ("force_https", "strip_www", "strip_trailing_slash", "strip_amp"):
+        if key in config:
+            rules = replace(rules, **{key: bool(config[key])})
+    return rules
+
+
+def _is_stripped(name: str, rules: UrlRules) -> bool:
+    name = name.lower()
+    if rules.keep_params is not None:
+        return name not in rules.keep_params
+    return any(fnmatchcase(name, pattern) for pattern in rules.strip_params)
+
+
+# -- URL正規化 --------------
+def canonicalize_url(url: str, rules: UrlRules = DEFAULT_URL_RULES) -> str:
+    """
+    重複判定・保存用にURLを正規化する。
+    スキーム・ホストの小文字化、既定ポート・フラグメント・トラッキングパラメータの除去、
+    末尾スラッシュの統一、パラメータの並べ替え（ルールの指定があれば https化・AMP版の統一も）を行う。
+    解析できないURLはそのまま返す。
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    # リダイレクトラッパー（?url=https://... など）は転送先を正規化
+    for name, value in query:
+        if name in rules.unwrap_params:
+            if value.startswith(("http://", "https://")) and value != url:
+                return canonicalize_url(value, rules)
+
+    scheme = parts.scheme.lower()
+    if rules.force_https:
+        scheme = "https"
+
+    host = parts.hostname.lower()
+    if rules.strip_www and host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or port == DEFAULT_PORTS.get(parts.scheme.lower()) else f"{host}:{port}"
+
+    path = parts.path or "/"
+    if rules.strip_amp:
+        path = AMP_SUFFIX_PATTERN.sub(r"\1", AMP_PATH_PATTERN.sub("", path)) or "/"
+    if rules.strip_trailing_slash and len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    kept = sorted((name, value) for name, value in query if not _is_stripped(name, rules))
+    return urlunsplit((scheme, netloc, path, urlencode(kept), ""))
+
+
+# -- ページ内の <link rel="canonical"> --------------
+def resolve_canonical_link(page_url: str, href: str | None) -> str | None:
+    """
+    rel=canonical を絶対URLにして返す。
+    別サイトやトップページを指すなど、記事URLとして不適切なものは採用しない。
+    """
+    if not href:
+        return None
+    candidate = urljoin(page_url, href.strip())
+    page_parts, candidate_parts = urlsplit(page_url), urlsplit(candidate)
+    if candidate_parts.scheme not in DEFAULT_PORTS or not candidate_parts.hostname:
+        return None
+
+    def site(hostname: str | None) -> str:
+        hostname = (hostname or "").lower()
+        return hostname[4:] if hostname.startswith("www.") else hostname
+
+    if site(candidate_parts.hostname) != site(page_parts.hostname):
+        return None
+    if candidate_parts.path in ("", "/"):
+        return None
+    return candidate
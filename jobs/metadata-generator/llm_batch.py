@@ -0,0 +1,206 @@
+import json
+import uuid
+
+from common.instrumentation import metrics
+from metadata_prompt import LLM_MODEL, PROMPT_VERSION, build_completion_body, parse_metadata
+from work_queue import BATCH_CLAIM_PREFIX
+
+
+# -- Batch API設定 --------------
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# 結果の反映に進める終了状態（expired / cancelled も完了分の出力ファイルがあれば反映する）
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# APIへの投入前に記録する行の状態とIDの接頭辞（投入後にバッチIDへ付け替える）
+SUBMITTING_STATUS = "submitting"
+SUBMISSION_ID_PREFIX = "submitting:"
+# 投入中の行をこの時間を過ぎても付け替えられていなければ中断したとみなす
+SUBMISSION_TIMEOUT_MINUTES = 30
+# 中断した投入のバッチを探す際に確認する直近のバッチ数
+SUBMISSION_LOOKUP_LIMIT = 1000
+
+
+# -- リクエストJSONLの作成 --------------
+def build_batch_request(article_id: str, article_text: str) -> dict:
+    """同期モードと同じプロンプト・構造化出力で1記事分のリクエストを作る。custom_idは記事ID"""
+    return {
+        "custom_id": str(article_id),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": build_completion_body(article_text),
+    }
+
+
+def to_jsonl(rows: list[dict]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+# -- 投入 --------------
+def submit_batch(client, requests: list[dict], submission_id: str | None = None):
+    """submission_id は metadata に含め、記録前に中断した場合にバッチを探せるようにする"""
+    input_file = client.files.create(file=("metadata_batch.jsonl", to_jsonl(requests)), purpose="batch")
+    metadata = {"job": "metadata-generator", "prompt_version": PROMPT_VERSION}
+    if submission_id:
+        metadata["submission_id"] = submission_id
+    return client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+        metadata=metadata,
+    )
+
+
+def find_submitted_batch(client, submission_id: str):
+    """記録前に中断した投入のバッチを metadata の投入IDで探す（見つからなければ None）"""
+    for index, batch in enumerate(client.batches.list(limit=100)):
+        if index >= SUBMISSION_LOOKUP_LIMIT:
+            break
+        if (batch.metadata or {}).get("submission_id") == submission_id:
+            return batch
+    return None
+
+
+# -- 結果の解析 --------------
+def parse_batch_output(text: str) -> dict[str, tuple[str | None, list[str]]]:
+    """出力JSONLから custom_id ごとの要約とタグを取り出す（失敗行は含めない）"""
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                continue
+            content = response["body"]["choices"][0]["message"].get("content")
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+
+        usage = response["body"].get("usage") or {}
+        metrics.record_llm_usage(response["body"].get("model") or LLM_MODEL, usage.get("prompt_tokens", 0),
+                                 usage.get("completion_tokens", 0), batch=True)
+
+        summary, tags = parse_metadata(content)
+        if summary:
+            results[row["custom_id"]] = (summary, tags)
+    return results
+
+
+def download_batch_results(client, batch) -> dict[str, tuple[str | None, list[str]]]:
+    if not batch.output_file_id:
+        return {}
+    return parse_batch_output(client.files.content(batch.output_file_id).text)
+
+
+# -- バッチ管理テーブル（llm_batches） --------------
+def load_open_batches(conn) -> list[dict]:
+    """未反映のバッチ。投入中の行は stale（中断したとみなせる）かどうかも返す"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT batch_id, prompt_version, request_count, status,
+               created_at < CURRENT_TIMESTAMP - make_interval(mins => %s) AS stale
+        FROM llm_batches
+        WHERE applied_at IS NULL
+        ORDER BY created_at
+    """, (SUBMISSION_TIMEOUT_MINUTES,))
+    batches = [{"batch_id": row[0], "prompt_version": row[1], "request_count": row[2], "status": row[3],
+                "stale": row[4]} for row in cursor.fetchall()]
+    cursor.close()
+    return batches
+
+
+def reserve_batch(conn, article_ids: list[str]) -> str:
+    """
+    APIへの投入前に投入中の行を記録し、対象記事の確保者を投入IDに付け替える（投入IDを返す）。
+    投入後に記録できなかった場合も、記事のリースが切れて二重に生成されないようにする。
+    """
+    submission_id = SUBMISSION_ID_PREFIX + uuid.uuid4().hex
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO llm_batches (batch_id, status, prompt_version, request_count)
+            VALUES (%s, %s, %s, %s)
+        """, (submission_id, SUBMITTING_STATUS, PROMPT_VERSION, len(article_ids)))
+        cursor.execute("""
+            UPDATE articles
+            SET claimed_at = CURRENT_TIMESTAMP, claimed_by = %s
+            WHERE id = ANY(%s::uuid[])
+        """, (BATCH_CLAIM_PREFIX + submission_id, article_ids))
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+    return submission_id
+
+
+def record_batch(conn, submission_id: str, batch):
+    """投入中の行と対象記事の確保者を、投入したバッチのIDに付け替える"""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE llm_batches
+            SET batch_id = %s, input_file_id = %s, status = %s
+            WHERE batch_id = %s
+        """, (batch.id, batch.input_file_id, batch.status, submission_id))
+        cursor.execute("""
+            UPDATE articles
+            SET claimed_at = CURRENT_TIMESTAMP, claimed_by = %s
+            WHERE claimed_by = %s
+        """, (BATCH_CLAIM_PREFIX + batch.id, BATCH_CLAIM_PREFIX + submission_id))
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def abandon_submission(conn, submission_id: str) -> int:
+    """投入されなかった行を削除し、対象記事を未処理に戻す"""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM llm_batches WHERE batch_id = %s", (submission_id,))
+        cursor.execute("""
+            UPDATE articles
+            SET claimed_at = NULL, claimed_by = NULL
+            WHERE claimed_by = %s AND metadata_generated = FALSE
+        """, (BATCH_CLAIM_PREFIX + submission_id,))
+        released = cursor.rowcount
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+    return released
+
+
+def update_batch_status(conn, batch, applied_count: int | None = None):
+    """状態を更新する。applied_count を渡した場合は反映済みにする"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE llm_batches
+        SET status = %s,
+            output_file_id = %s,
+            error_file_id = %s,
+            applied_count = COALESCE(%s, applied_count),
+            applied_at = CASE WHEN %s IS NULL THEN applied_at ELSE CURRENT_TIMESTAMP END
+        WHERE batch_id = %s
+    """, (batch.status, batch.output_file_id, batch.error_file_id, applied_count, applied_count, batch.id))
+    conn.commit()
+    cursor.close()
+
+
+def release_batch_articles(conn, batch_id: str) -> int:
+    """結果が得られなかった記事の確保を解除し、次回以降の処理対象に戻す"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE articles
+        SET claimed_at = NULL, claimed_by = NULL
+        WHERE claimed_by = %s AND metadata_generated = FALSE
+    """, (BATCH_CLAIM_PREFIX + batch_id,))
+    released = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return released
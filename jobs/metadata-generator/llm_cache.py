@@ -0,0 +1,124 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+
+
+# -- 本文の正規化ハッシュ --------------
+def content_hash(text: str) -> str:
+    """全角半角・大文字小文字・空白の違いを吸収した本文のハッシュ"""
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def cache_key(text: str, prompt_version: str) -> str:
+    return hashlib.sha256(f"{prompt_version}:{content_hash(text)}".encode("utf-8")).hexdigest()
+
+
+# -- キャッシュ統計 --------------
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evicted: int = 0
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        hit_ratio = self.hits / lookups if lookups else 0.0
+        return (
+            f"LLMキャッシュ: ヒット{self.hits}件, ミス{self.misses}件 (ヒット率{hit_ratio:.1%}), "
+            f"保存{self.stores}件, 削除{self.evicted}件"
+        )
+
+
+# -- LLM結果キャッシュ（Postgres） --------------
+class LLMResultCache:
+    """
+    正規化した本文ハッシュとプロンプトバージョンをキーに要約・タグを保持する。
+    ワーカースレッドから呼ばれるため、専用の autocommit 接続をロックで直列化して使う。
+    """
+
+    def __init__(self, conn, prompt_version: str, ttl_days: int = 90, max_entries: int = 50000):
+        self.conn = conn
+        self.conn.autocommit = True
+        self.prompt_version = prompt_version
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> tuple[str, list[str]] | None:
+        key = cache_key(text, self.prompt_version)
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute("""
+                    UPDATE llm_cache
+                    SET hit_count = hit_count + 1, last_hit_at = CURRENT_TIMESTAMP
+                    WHERE cache_key = %s
+                      AND prompt_version = %s
+                      AND created_at > CURRENT_TIMESTAMP - make_interval(days => %s)
+                    RETURNING summary, tags
+                """, (key, self.prompt_version, self.ttl_days))
+                row = cursor.fetchone()
+                cursor.close()
+                if row:
+                    self.stats.hits += 1
+                    return row[0], list(row[1] or [])
+                self.stats.misses += 1
+        except Exception as e:
+            print(f"  LLMキャッシュ参照エラー: {e}")
+        return None
+
+    def put(self, text: str, summary: str, tags: list[str]):
+        key = cache_key(text, self.prompt_version)
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute("""
+                    INSERT INTO llm_cache (cache_key, prompt_version, summary, tags)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (cache_key) DO UPDATE SET
+                        summary = EXCLUDED.summary,
+                        tags = EXCLUDED.tags,
+                        created_at = CURRENT_TIMESTAMP,
+                        last_hit_at = CURRENT_TIMESTAMP
+                """, (key, self.prompt_version, summary, tags))
+                cursor.close()
+                self.stats.stores += 1
+        except Exception as e:
+            print(f"  LLMキャッシュ保存エラー: {e}")
+
+    # -- 古いプロンプト・TTL切れ・上限超過（LRU）のエントリを削除 --------------
+    def evict(self) -> int:
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute("""
+                    DELETE FROM llm_cache
+                    WHERE prompt_version <> %s
+                       OR created_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+                """, (self.prompt_version, self.ttl_days))
+                evicted = cursor.rowcount
+                cursor.execute("""
+                    DELETE FROM llm_cache
+                    WHERE cache_key IN (
+                        SELECT cache_key FROM llm_cache
+                        ORDER BY last_hit_at DESC
+                        OFFSET %s
+                    )
+                """, (self.max_entries,))
+                evicted += cursor.rowcount
+                cursor.close()
+        except Exception as e:
+            print(f"LLMキャッシュ削除エラー: {e}")
+            return 0
+
+        self.stats.evicted += evicted
+        return evicted
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,200 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# リトライ対象のHTTPステータス
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+# -- トークンバケット --------------
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def acquire(self, amount: float = 1.0):
+        # 容量を超える要求は容量分だけ待つ（永久待ちを防ぐ）
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.refill_per_second
+            self._sleep(wait)
+
+
+# -- リクエスト数・トークン数のレート制限 --------------
+class RateLimiter:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+
+    def acquire(self, requests: int = 1, tokens: int = 0):
+        self.requests.acquire(requests)
+        if tokens:
+            self.tokens.acquire(tokens)
+
+
+# -- リトライ --------------
+def is_retryable(error: Exception) -> bool:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None and getattr(error, "response", None) is not None:
+        status_code = getattr(error.response, "status_code", None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+
+    # 接続エラー・タイムアウト
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "ConnectionError", "Timeout")
+
+
+@dataclass
+class RetryStats:
+    attempts: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, attempt: bool = False, retry: bool = False, gave_up: bool = False):
+        with self._lock:
+            self.attempts += int(attempt)
+            self.retries += int(retry)
+            self.gave_up += int(gave_up)
+
+
+def call_with_retry(fn: Callable[[], R], max_retries: int = 5, base_delay: float = 1.0,
+                    max_delay: float = 30.0, stats: RetryStats | None = None) -> R:
+    stats = stats or RetryStats()
+    for attempt in range(max_retries + 1):
+        stats.record(attempt=True)
+        try:
+            return fn()
+        except Exception as e:
+            if not is_retryable(e) or attempt >= max_retries:
+                if is_retryable(e):
+                    stats.record(gave_up=True)
+                raise
+            # Full jitter の指数バックオフ
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            stats.record(retry=True)
+            print(f"  LLMリトライ {attempt + 1}/{max_retries}（{delay:.1f}秒後）: {e}")
+            time.sleep(delay)
+
+
+# -- ワーカープール --------------
+def run_pool(fn: Callable[[T], R], items: Iterable[T], workers: int,
+             max_pending: int | None = None) -> Iterator[tuple[T, R | None]]:
+    """
+    itemsを並列処理し、完了順に (item, 結果) を返す。例外時の結果は None。
+    itemsは必要な分だけ読み進める（同時に保持するのは最大 max_pending 件）。
+    """
+    workers = max(1, workers)
+    max_pending = max_pending or workers * 2
+    iterator = iter(items)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def fill():
+            while len(pending) < max_pending:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                pending[executor.submit(fn, item)] = item
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result()
+                except Exception as e:
+                    print(f"  ワーカーエラー: {e}")
+                    yield item, None
+            fill()
+
+
+# -- 実行ごとのトークン数・費用の予算 --------------
+class BudgetExceeded(Exception):
+    pass
+
+
+class RunBudget:
+    """
+    1回の実行でLLMに送るトークン数（入力＋出力）と費用（USD）の上限（0は無制限）。
+    呼び出し前に見込み分を確保し、応答後に実際の使用量で精算する。一度でも確保できなければ以降は確保しない
+    （優先度の高い記事から順に処理し、予算に達した時点で実行を止めるため）。
+    """
+
+    def __init__(self, max_tokens: int = 0, max_cost_usd: float = 0.0,
+                 input_price: float = 0.0, output_price: float = 0.0):
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.input_price = input_price          # 100万トークンあたりのUSD
+        self.output_price = output_price
+        self.tokens = 0
+        self.cost_usd = 0.0
+        self.reserved = 0
+        self.rejected = 0
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tokens > 0 or self.max_cost_usd > 0
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input_price + output_tokens * self.output_price) / 1_000_000
+
+    def reserve(self, input_tokens: int, output_tokens: int) -> bool:
+        with self._lock:
+            if self.exhausted:
+                self.rejected += 1
+                return False
+            tokens = self.tokens + input_tokens + output_tokens
+            cost_usd = self.cost_usd + self.cost(input_tokens, output_tokens)
+            if (self.max_tokens and tokens > self.max_tokens) or (self.max_cost_usd and cost_usd > self.max_cost_usd):
+                self.exhausted = True
+                self.rejected += 1
+                return False
+            self.tokens, self.cost_usd = tokens, cost_usd
+            self.reserved += 1
+            return True
+
+    def settle(self, reserved: tuple[int, int], used: tuple[int, int]):
+        """見込み (入力, 出力) を実際の使用量に置き換える（使用量が不明の場合は見込みのまま）"""
+        if not any(used):
+            return
+        with self._lock:
+            self.tokens += sum(used) - sum(reserved)
+            self.cost_usd += self.cost(*used) - self.cost(*reserved)
+
+    def summary(self) -> str:
+        limits = ", ".join(filter(None, [
+            f"上限 {self.max_tokens}トークン" if self.max_tokens else "",
+            f"上限 ${self.max_cost_usd:.2f}" if self.max_cost_usd else "",
+        ])) or "上限なし"
+        status = "（予算に到達）" if self.exhausted else ""
+        return (f"LLM予算: {self.tokens}トークン, ${self.cost_usd:.4f} ({limits}), "
+                f"{self.reserved}件実行, {self.rejected}件見送り{status}")
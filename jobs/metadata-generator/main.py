@@ -1,12 +1,34 @@
+import argparse
 import os
 import sys
-import requests
+import threading
+import time
+from functools import lru_cache
+from typing import Iterable
 import psycopg2
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain, SequentialChain
-from langchain_openai import ChatOpenAI
+
+# 共通モジュール（jobs/common）を参照
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from common.db_writer import BatchWriter, article_metadata_writer
+from common.http_client import get_http_client
+from common.instrumentation import (BATCH_PRICE_RATIO, InstrumentedConnection, finish_run, llm_price, metrics, stage,
+                                    start_run)
+from common.llm_http import completion_content, completion_usage, get_chat_client
+from common.search_document import build_search_document
+from common.tag_normalizer import TagDictionary, TagNormalizer, load_tag_rules
+from common.tokens import count_tokens, truncate_to_token_budget
+from metadata_prompt import (LLM_MODEL, LLM_TEMPERATURE, METADATA_PROMPT_TEMPLATE, METADATA_RESPONSE_FORMAT, PROMPT_VERSION,
+                             build_completion_body, build_prompt, parse_metadata)
+from llm_batch import (SUBMITTING_STATUS, TERMINAL_STATUSES, abandon_submission, build_batch_request,
+                       download_batch_results, find_submitted_batch, load_open_batches, record_batch,
+                       release_batch_articles, reserve_batch, submit_batch, update_batch_status)
+from llm_cache import LLMResultCache
+from near_duplicate import NearDuplicateIndex
+from llm_pool import BudgetExceeded, RateLimiter, RetryStats, RunBudget, call_with_retry, run_pool
+from relevance import load_relevance_scorer, score_pending_articles
+from work_queue import count_pending_articles, get_worker_id, iter_claimed_batches, load_articles, release_articles
 
 
 # -- 環境変数読み込み --------------
@@ -18,6 +40,50 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", "20"))
+DB_FLUSH_INTERVAL = float(os.environ.get("DB_FLUSH_INTERVAL", "5.0"))
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL")
+LLM_CLIENT = os.environ.get("LLM_CLIENT", "http").lower()
+LLM_WORKERS = int(os.environ.get("LLM_WORKERS", "4"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+OPENAI_RPM = int(os.environ.get("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.environ.get("OPENAI_TPM", "200000"))
+CLAIM_BATCH_SIZE = int(os.environ.get("CLAIM_BATCH_SIZE", "20"))
+METADATA_LEASE_MINUTES = int(os.environ.get("METADATA_LEASE_MINUTES", "30"))
+LLM_INPUT_TOKEN_BUDGET = int(os.environ.get("LLM_INPUT_TOKEN_BUDGET", "3000"))
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_DAYS = int(os.environ.get("LLM_CACHE_TTL_DAYS", "90"))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "50000"))
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "5000"))
+BATCH_POLL_INTERVAL = float(os.environ.get("BATCH_POLL_INTERVAL", "60"))
+NEAR_DUPLICATE_ENABLED = os.environ.get("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+TAG_ALIASES_PATH = os.environ.get("TAG_ALIASES_PATH")
+RELEVANCE_ENABLED = os.environ.get("RELEVANCE_ENABLED", "true").lower() == "true"
+RELEVANCE_THRESHOLD = float(os.environ.get("RELEVANCE_THRESHOLD", "0.3"))
+RELEVANCE_RULES_PATH = os.environ.get("RELEVANCE_RULES_PATH")
+RELEVANCE_MODEL_PATH = os.environ.get("RELEVANCE_MODEL_PATH")
+RUN_TOKEN_BUDGET = int(os.environ.get("RUN_TOKEN_BUDGET", "0"))
+RUN_COST_BUDGET_USD = float(os.environ.get("RUN_COST_BUDGET_USD", "0"))
+
+# プロセス共通のレート制限とリトライ統計
+rate_limiter = RateLimiter(OPENAI_RPM, OPENAI_TPM)
+retry_stats = RetryStats()
+
+# LLM結果キャッシュ（main() で初期化。無効時は None）
+llm_cache: LLMResultCache | None = None
+
+# 近似重複インデックス（main() で初期化。無効時は None）
+duplicate_index: NearDuplicateIndex | None = None
+
+# タグ辞書（main() で初期化）
+tag_dictionary: TagDictionary | None = None
+
+# 実行ごとのトークン数・費用の予算（main() で初期化。既定は無制限）
+run_budget = RunBudget()
+
+# 要約・タグ生成の出力分として見込むトークン数
+COMPLETION_TOKEN_ALLOWANCE = 800
 
 
 # -- PostgreSQL接続 --------------
@@ -27,191 +93,466 @@ def get_db_connection():
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASSWORD
+        password=DB_PASSWORD,
+        connection_factory=InstrumentedConnection
     )
 
 
-# -- メタデータ未生成の記事取得 --------------
-def get_articles_without_metadata(conn) -> list[dict]:
-    cursor = conn.cursor()
-    query = """
-        SELECT id, title, url, content
-        FROM articles
-        WHERE metadata_generated = FALSE
-        ORDER BY created_at DESC
-    """
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    cursor.close()
-
-    articles = []
-    for row in rows:
-        articles.append({
-            "id": row[0],
-            "title": row[1],
-            "url": row[2],
-            "content": row[3]
-        })
-
-    return articles
-
-
-# -- 記事本文抽出 --------------
+# -- 記事本文抽出（収集時に保存された本文がない場合のみ。HTML解析は必要になった時に読み込む） --------------
 def get_article_text(url: str) -> str | None:
-    try:
-        response = requests.get(url, verify=True, timeout=15)
-        soup = BeautifulSoup(response.content, "html.parser")
-        article_text = soup.get_text()
-
-        # 不要文字の削除
-        characters_to_remove = ["\n", "\t", "\r", " "]
-        for char in characters_to_remove:
-            article_text = article_text.replace(char, "")
+    from bs4 import BeautifulSoup
+    from common.article_text import extract_article_text
 
-        return article_text.strip()
+    try:
+        with stage("page.download"):
+            response = get_http_client(pool_maxsize=LLM_WORKERS, hooks=[metrics.record_http]).get(url)
+        with stage("page.article_text"):
+            soup = BeautifulSoup(response.content, "html.parser")
+            return extract_article_text(soup)
 
     except Exception as e:
         print(f"  本文抽出エラー: {e}")
         return None
 
 
-# -- 要約とタグ生成 --------------
+# -- 要約・タグ生成チェーン（LLM_CLIENT=langchain の場合のみ。プロセスで1回だけ構築） --------------
+_metadata_chain = None
+_metadata_chain_lock = threading.Lock()
+
+
+def get_metadata_chain():
+    global _metadata_chain
+    with _metadata_chain_lock:
+        if _metadata_chain is None:
+            # langchain は読み込みに時間がかかるため使用時に読み込む
+            from langchain.prompts import PromptTemplate
+            from langchain_openai import ChatOpenAI
+
+            llm = ChatOpenAI(
+                model_name=LLM_MODEL,
+                openai_api_key=OPENAI_API_KEY,
+                openai_api_base=OPENAI_BASE_URL,
+                temperature=LLM_TEMPERATURE,
+                max_retries=0
+            )
+            prompt = PromptTemplate(input_variables=["article_text"], template=METADATA_PROMPT_TEMPLATE)
+            structured_llm = llm.with_structured_output(METADATA_RESPONSE_FORMAT, method="json_schema", include_raw=True)
+            _metadata_chain = prompt | structured_llm
+        return _metadata_chain
+
+
+# -- LLM呼び出しの見込みトークン数（入力, 出力。プロンプトの定型部分を含む） --------------
+@lru_cache(maxsize=1)
+def prompt_overhead_tokens() -> int:
+    return count_tokens(build_prompt(""))
+
+
+def estimate_llm_tokens(article_text: str) -> tuple[int, int]:
+    return count_tokens(article_text) + prompt_overhead_tokens(), COMPLETION_TOKEN_ALLOWANCE
+
+
+# -- LLM呼び出し（構造化出力, 入力トークン数, 出力トークン数） --------------
+def invoke_langchain(article_text: str) -> tuple[object, int, int]:
+    output = get_metadata_chain().invoke({"article_text": article_text})
+    usage = getattr(output.get("raw"), "usage_metadata", None) or {}
+    # 構造化出力が解析できない場合は本文をJSONとして再解析
+    parsed = output.get("parsed")
+    if parsed is None and output.get("raw") is not None:
+        parsed = output["raw"].content
+    return parsed, usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+
+def invoke_http(article_text: str) -> tuple[object, int, int]:
+    client = get_chat_client(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, pool_maxsize=LLM_WORKERS)
+    response = client.create(**build_completion_body(article_text))
+    return completion_content(response), *completion_usage(response)
+
+
+# -- 要約とタグ生成（1リクエストで要約とタグをJSONで取得。予算を超える場合は BudgetExceeded） --------------
 def generate_summary_and_tags(article_text: str) -> tuple[str | None, list[str]]:
+    # 同一・転載記事は過去の生成結果を再利用
+    if llm_cache is not None:
+        cached = llm_cache.get(article_text)
+        if cached is not None:
+            print(f"  LLMキャッシュヒット")
+            metrics.increment("llm.cache_hits")
+            return cached
+
+    # 実行ごとの予算から見込み分を確保
+    estimate = estimate_llm_tokens(article_text)
+    if not run_budget.reserve(*estimate):
+        raise BudgetExceeded(f"LLM予算に到達（見込み {sum(estimate)}トークン）")
+
     try:
-        # LLM設定
-        llm = ChatOpenAI(
-            model_name="gpt-4o-mini",
-            openai_api_key=OPENAI_API_KEY,
-            temperature=0.5
-        )
-
-        # 要約生成プロンプト
-        prompt_1 = PromptTemplate(
-            input_variables=["article_text"],
-            template="次の文章を200字程度で要約して。言語は記事本文と同じで。語尾は断定形で: {article_text}",
-        )
-        chain_1 = LLMChain(llm=llm, prompt=prompt_1, output_key="article_summary")
-
-        # タグ生成プロンプト
-        prompt_2 = PromptTemplate(
-            input_variables=["article_summary"],
-            template="""
-            次の記事の要約から、トピックを表すタグを生成して：
-            {article_summary}.
-            登場する企業や組織、業界、分類を表すような5～30個の単語をカンマ区切りで。網羅的に。
-            最小単位に区切って生成すること。検索性を最大化し、かつ粒度を統一するためのタグを抽出して。
-            半導体関連の記事は「半導体」というタグを必ず含めて。
-            製品名、サービス名、企業名などの固有名詞も含めて。日本企業は日本語、外国企業はアルファベットで。
-
-            1. 基本実体 (Entities): 記事に登場する固有名詞（企業名、製品名、イベント名、人名）。
-            2. 構成要素への分解 (Decomposition): 複合語やイベント名を最小単位に分解する。
-            - 年号が含まれる場合は分離する。
-            - アルファベットの頭文字（略称）が一般的な場合は追加する。
-            3. 階層・カテゴリ (Hierarchy & Category): その単語が属する上位概念や業界名を追加する。（テクノロジー、自動車、メーカー、食品、など）
-            4. 正規化・ブランド名 (Normalization): 正式名称から「株式会社」や「自動車」などの法人格・業種接尾辞を取り除き、一般的な「ブランド名」にする。
-            - 例: トヨタ自動車 → トヨタ
-            - 例: 2025年 → 2025
-
-            # Rules & Constraints
-            - 最小単位: 複合語はできるだけ単語単位に分解したタグも併記する。
-            - 網羅性: 検索されそうな関連ワードは積極的に含める。
-            - 年号: 「XXXX年」は「XXXX」と4桁の数字のみにする。
-            - 企業名: 子会社の場合は「子会社名」「親会社/ブランド名」「業界/技術分野」など、関連するタグも含める。
-            """,
-        )
-        chain_2 = LLMChain(llm=llm, prompt=prompt_2, output_key="article_tags")
-
-        # SequentialChain構成
-        overall_chain = SequentialChain(
-            chains=[chain_1, chain_2],
-            input_variables=["article_text"],
-            output_variables=["article_summary", "article_tags"],
-            verbose=True,
-        )
-
-        # 実行
-        output = overall_chain({"article_text": article_text})
+        invoke = invoke_langchain if LLM_CLIENT == "langchain" else invoke_http
 
-        # 結果抽出
-        article_summary = output["article_summary"]
-        article_tags_str = output["article_tags"]
+        # 実行（レート制限、429/5xxはジッター付きバックオフで再試行）
+        def run_llm():
+            rate_limiter.acquire(requests=1, tokens=sum(estimate))
+            return invoke(article_text)
 
-        # タグをリストに変換
-        tags_list = [tag.strip() for tag in article_tags_str.split(",") if tag.strip()]
+        with stage("llm.generate"):
+            parsed, input_tokens, output_tokens = call_with_retry(run_llm, max_retries=LLM_MAX_RETRIES, stats=retry_stats)
+        run_budget.settle(estimate, (input_tokens, output_tokens))
+        if input_tokens or output_tokens:
+            metrics.record_llm_usage(LLM_MODEL, input_tokens, output_tokens)
 
-        return article_summary, tags_list
+        # 結果抽出
+        summary, tags = parse_metadata(parsed)
+
+        if summary and llm_cache is not None:
+            llm_cache.put(article_text, summary, tags)
+        return summary, tags
 
     except Exception as e:
         print(f"  要約・タグ生成エラー: {e}")
         return None, []
 
 
-# -- メタデータをデータベースに保存 --------------
-def update_article_metadata(conn, article_id: str, content: str, summary: str, tags: list[str]):
-    try:
-        cursor = conn.cursor()
-        query = """
-            UPDATE articles
-            SET content = %s, summary = %s, tags = %s, metadata_generated = TRUE, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """
-        cursor.execute(query, (content, summary, tags, article_id))
-        conn.commit()
-        cursor.close()
-        print(f"  更新成功")
-    except Exception as e:
-        conn.rollback()
-        print(f"  更新エラー: {e}")
+# -- メタデータをデータベースに保存（タグを正規化し、検索文書とともにバッファに追加して一括更新） --------------
+def update_article_metadata(writer: BatchWriter, article: dict, content: str | None, summary: str, tags: list[str]):
+    if tag_dictionary is not None:
+        with stage("tags.normalize"):
+            tags = tag_dictionary.resolve(tags)
+    with stage("search.document"):
+        document = build_search_document(article.get("title"), summary, tags, content or article.get("content"))
+    writer.add((article["id"], content, summary, tags, *document))
+
+
+# -- LLM入力の準備（本文とトークン上限で切り詰めたLLM入力を返す） --------------
+def prepare_llm_input(article: dict) -> tuple[str, str] | None:
+    print(f"\n処理中: {article['title'][:50]}...")
+
+    # 本文抽出（RSS Collectorが保存した本文を優先し、なければ記事ページを取得）
+    article_text = article.get("content")
+    if not article_text:
+        print(f"  保存済み本文なし: 記事ページを取得")
+        article_text = get_article_text(article["url"])
+    if not article_text:
+        print(f"  本文取得失敗: スキップ")
+        return None
+
+    # LLM入力はトークン上限で切り詰め
+    return article_text, truncate_to_token_budget(article_text, LLM_INPUT_TOKEN_BUDGET)
+
+
+# -- 関連度の判定（LLM呼び出し前に閾値未満の記事を対象外にし、判定後の未処理記事数を返す） --------------
+def score_relevance(conn, pending_count: int) -> int:
+    if not RELEVANCE_ENABLED:
+        return pending_count
+
+    scorer = load_relevance_scorer(RELEVANCE_RULES_PATH, RELEVANCE_MODEL_PATH)
+    with stage("relevance", log=True):
+        stats = score_pending_articles(conn, scorer, RELEVANCE_THRESHOLD, METADATA_LEASE_MINUTES)
+    metrics.increment("relevance.skipped", stats.skipped)
+    print(stats.summary() + ("（学習済みモデル使用）" if scorer.model is not None else ""))
+    if not stats.skipped:
+        return pending_count
+    return count_pending_articles(conn, METADATA_LEASE_MINUTES)
+
+
+# -- 確保した記事のストリーミング（バッチごとに近似重複を判定。予算に到達したら残りのリースを解除して終了） --------------
+def iter_articles(conn, max_articles: int | None = None) -> Iterable[dict]:
+    worker_id = get_worker_id()
+    for batch in iter_claimed_batches(conn, worker_id, CLAIM_BATCH_SIZE, METADATA_LEASE_MINUTES, max_articles):
+        if duplicate_index is not None:
+            duplicate_index.annotate_batch(batch)
+        for index, article in enumerate(batch):
+            if run_budget.exhausted:
+                released = release_articles(conn, worker_id, [remaining["id"] for remaining in batch[index:]])
+                print(f"\nLLM予算に到達: 確保済みの{released}件を未処理に戻して終了")
+                return
+            yield article
+
+
+# -- 記事1件のメタデータ生成 --------------
+def generate_article_metadata(article: dict) -> tuple[str, str, list[str]] | None:
+    # 近似重複の記事は正規記事の要約・タグを複製
+    if article.get("canonical_metadata"):
+        print(f"\n近似重複: {article['title'][:50]}... (正規記事 {article['duplicate_of']})")
+        summary, tags = article["canonical_metadata"]
+        return article["content"], summary, tags
+
+    prepared = prepare_llm_input(article)
+    if prepared is None:
+        return None
+
+    # 要約とタグ生成
+    article_text, llm_input = prepared
+    summary, tags = generate_summary_and_tags(llm_input)
+    if not summary:
+        print(f"  要約生成失敗: スキップ")
+        return None
+
+    return article_text, summary, tags
 
 
-# -- 記事処理 --------------
-def process_articles(conn, articles: list[dict]):
+# -- 記事処理（ワーカープールで並列生成し、メインスレッドでDB更新） --------------
+def process_articles(conn, articles: Iterable[dict], workers: int = LLM_WORKERS) -> int:
     processed_count = 0
+    over_budget = []
+
+    # 記事ごとの所要時間を計測（予算に到達した記事は処理せずに未処理に戻す）
+    def timed_generate(article: dict) -> tuple[str, str, list[str]] | None:
+        with stage("article"):
+            try:
+                return generate_article_metadata(article)
+            except BudgetExceeded:
+                over_budget.append(article["id"])
+                return None
+
+    # 正規記事のメタデータは書き込みのコミット後に近似重複インデックスへ記録する（失敗した記事の要約・タグを複製しない）
+    unwritten_metadata: dict[str, tuple[str, list[str]]] = {}
+
+    def record_written(rows: list[tuple]):
+        for (article_id,) in rows:
+            metadata = unwritten_metadata.pop(str(article_id), None)
+            if metadata is not None:
+                duplicate_index.record_metadata(str(article_id), *metadata)
+
+    on_written = record_written if duplicate_index is not None else None
+    with stage("generate_metadata", log=True), \
+            article_metadata_writer(conn, DB_BATCH_SIZE, DB_FLUSH_INTERVAL, on_written) as writer:
+        for article, result in run_pool(timed_generate, articles, workers):
+            if result is None:
+                continue
+
+            # データベース更新
+            article_text, summary, tags = result
+            if duplicate_index is not None:
+                unwritten_metadata[str(article["id"])] = (summary, tags)
+            update_article_metadata(writer, article, article_text, summary, tags)
+            processed_count += 1
+
+    released = release_articles(conn, get_worker_id(), over_budget)
+    print(f"\n\n処理完了: {processed_count}件の記事を処理（並列数{workers}）")
+    if run_budget.enabled:
+        print(run_budget.summary() + (f", 予算超過の{released}件を未処理に戻す" if released else ""))
+    print(f"DB更新: {writer.stats.summary()}")
+    print(f"LLM: {retry_stats.attempts}回実行, {retry_stats.retries}回リトライ, {retry_stats.gave_up}件リトライ上限")
+    if llm_cache is not None:
+        print(llm_cache.stats.summary())
+    if duplicate_index is not None:
+        print(duplicate_index.stats.summary())
+    return processed_count
+
+
+# -- Batch API: バッチの状態確認と結果反映（終了していなければ False） --------------
+def apply_batch(conn, client, record: dict) -> bool:
+    batch = client.batches.retrieve(record["batch_id"])
+    counts = batch.request_counts
+    progress = f"{counts.completed}/{counts.total}件完了, {counts.failed}件失敗" if counts else ""
+    print(f"バッチ {batch.id}: {batch.status} {progress}")
+    if batch.status not in TERMINAL_STATUSES:
+        update_batch_status(conn, batch)
+        return False
+
+    results = download_batch_results(client, batch)
+
+    # 検索文書の作成とLLMキャッシュへの保存に使うタイトル・本文
+    articles = load_articles(conn, list(results))
+    cache_enabled = llm_cache is not None and record["prompt_version"] == PROMPT_VERSION
+
+    with article_metadata_writer(conn, DB_BATCH_SIZE, DB_FLUSH_INTERVAL) as writer:
+        for article_id, (summary, tags) in results.items():
+            article = articles.get(article_id, {"id": article_id})
+            # 本文は収集時に保存済みのものを維持
+            update_article_metadata(writer, article, None, summary, tags)
+            # 現在と同じプロンプトで生成した結果はLLMキャッシュにも保存
+            if cache_enabled and article.get("content"):
+                llm_input = truncate_to_token_budget(article["content"], LLM_INPUT_TOKEN_BUDGET)
+                llm_cache.put(llm_input, summary, tags)
+
+    released = release_batch_articles(conn, batch.id)
+    update_batch_status(conn, batch, applied_count=writer.stats.written)
+    print(f"バッチ {batch.id}: {writer.stats.written}件反映, {released}件を未処理に戻す")
+    return True
+
+
+# -- Batch API: 投入中のまま残った行の後始末 --------------
+def resolve_submission(conn, client, record: dict) -> dict | None:
+    """中断した投入をバッチに付け替える。他の実行が投入中の行・投入されなかった行は None"""
+    if not record["stale"]:
+        return None
 
-    for article in articles:
-        print(f"\n処理中: {article['title'][:50]}...")
+    batch = find_submitted_batch(client, record["batch_id"])
+    if batch is None:
+        released = abandon_submission(conn, record["batch_id"])
+        print(f"投入されなかったバッチ {record['batch_id']}: {released}件を未処理に戻す")
+        return None
 
-        # 本文抽出
-        article_text = get_article_text(article["url"])
-        if not article_text:
-            print(f"  本文取得失敗: スキップ")
-            continue
+    record_batch(conn, record["batch_id"], batch)
+    print(f"記録前に中断したバッチ {batch.id} を記録")
+    return {**record, "batch_id": batch.id, "status": batch.status}
+
+
+# -- Batch API: 未処理記事をJSONLにまとめて投入 --------------
+def submit_pending_articles(conn, client, max_requests: int) -> int:
+    articles = iter_articles(conn, max_requests)
+    batch_requests = []
+    article_ids = []
+    over_budget = []
+
+    # 本文の準備（保存済み本文がない記事の取得）はワーカープールで並列化し、DB操作はメインスレッドで行う
+    with article_metadata_writer(conn, DB_BATCH_SIZE, DB_FLUSH_INTERVAL) as writer:
+        for article, prepared in run_pool(prepare_llm_input, articles, LLM_WORKERS):
+            if prepared is None:
+                continue
+
+            # 近似重複の記事は正規記事の要約・タグを複製
+            if article.get("canonical_metadata"):
+                summary, tags = article["canonical_metadata"]
+                update_article_metadata(writer, article, article["content"], summary, tags)
+                continue
+
+            # キャッシュ済みの記事は投入せずに反映
+            article_text, llm_input = prepared
+            cached = llm_cache.get(llm_input) if llm_cache is not None else None
+            if cached is not None:
+                summary, tags = cached
+                update_article_metadata(writer, article, article_text, summary, tags)
+                continue
+
+            # 実行ごとの予算に到達した記事は投入せずに未処理に戻す
+            if not run_budget.reserve(*estimate_llm_tokens(llm_input)):
+                over_budget.append(article["id"])
+                continue
+
+            batch_requests.append(build_batch_request(article["id"], llm_input))
+            article_ids.append(str(article["id"]))
+
+    released = release_articles(conn, get_worker_id(), over_budget)
+    if run_budget.enabled:
+        print(run_budget.summary() + (f", 予算超過の{released}件を未処理に戻す" if released else ""))
+
+    if not batch_requests:
+        print("投入対象の記事がありません")
+        return 0
+
+    # 投入前に記録して記事を確保しておき、投入後にバッチIDへ付け替える
+    # （投入・付け替えに失敗した場合は投入中の行が残り、次回実行時にバッチを探して記録し直す）
+    submission_id = reserve_batch(conn, article_ids)
+    batch = submit_batch(client, batch_requests, submission_id)
+    record_batch(conn, submission_id, batch)
+    print(f"\nバッチ投入: {batch.id} ({len(batch_requests)}件)")
+    return len(batch_requests)
+
+
+# -- Batch APIモード（前回までのバッチを反映し、新しいバッチを投入） --------------
+def run_batch_mode(conn, wait: bool = False):
+    open_batches = load_open_batches(conn)
+    pending_count = count_pending_articles(conn, METADATA_LEASE_MINUTES)
+    print(f"メタデータ未生成の記事: {pending_count}件, 未反映のバッチ: {len(open_batches)}件")
+    if not open_batches and pending_count == 0:
+        print("処理対象の記事・バッチがありません")
+        return
+
+    # openai パッケージは Batch API を使う場合のみ読み込む
+    from openai import OpenAI
+    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=LLM_MAX_RETRIES)
+
+    # 前回までに投入したバッチの状態確認と結果反映（失敗分は未処理に戻るため再集計）
+    for record in open_batches:
+        if record["status"] == SUBMITTING_STATUS:
+            record = resolve_submission(conn, client, record)
+            if record is None:
+                continue
+        apply_batch(conn, client, record)
+    if open_batches:
+        pending_count = count_pending_articles(conn, METADATA_LEASE_MINUTES)
+
+    # 未処理記事の関連度判定と投入
+    if pending_count > 0:
+        pending_count = score_relevance(conn, pending_count)
+    if pending_count > 0:
+        submit_pending_articles(conn, client, BATCH_MAX_REQUESTS)
+
+    # --wait 指定時は全バッチの終了までポーリング（指定しない場合は次回実行時に反映）
+    open_batches = [record for record in load_open_batches(conn) if record["status"] != SUBMITTING_STATUS]
+    while wait and open_batches:
+        print(f"{len(open_batches)}件のバッチの完了待ち（{BATCH_POLL_INTERVAL:.0f}秒間隔）")
+        time.sleep(BATCH_POLL_INTERVAL)
+        open_batches = [record for record in open_batches if not apply_batch(conn, client, record)]
+
+    if llm_cache is not None:
+        print(llm_cache.stats.summary())
+    if duplicate_index is not None:
+        print(duplicate_index.stats.summary())
+
+
+# -- LLM結果キャッシュの初期化（専用接続。古いプロンプト・期限切れのエントリを先に削除） --------------
+def init_llm_cache() -> LLMResultCache | None:
+    if not LLM_CACHE_ENABLED:
+        return None
 
-        # 要約とタグ生成
-        summary, tags = generate_summary_and_tags(article_text)
-        if not summary:
-            print(f"  要約生成失敗: スキップ")
-            continue
+    cache = LLMResultCache(get_db_connection(), PROMPT_VERSION, LLM_CACHE_TTL_DAYS, LLM_CACHE_MAX_ENTRIES)
+    evicted = cache.evict()
+    print(f"LLMキャッシュ: プロンプトバージョン {PROMPT_VERSION}, {evicted}件削除")
+    return cache
 
-        # データベース更新
-        update_article_metadata(conn, article["id"], article_text, summary, tags)
-        processed_count += 1
 
-    print(f"\n\n処理完了: {processed_count}件の記事を処理")
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="記事の要約・タグ生成")
+    arg_parser.add_argument("--batch", action="store_true",
+                            help="OpenAI Batch APIで生成する（前回までのバッチの反映と新規投入）")
+    arg_parser.add_argument("--wait", action="store_true",
+                            help="--batch 指定時、投入したバッチの完了まで待って反映する")
+    return arg_parser.parse_args()
+
+
+# -- 実行ごとの予算（費用は使用するモデルの単価から計算。Batch APIは割引後の単価） --------------
+def init_run_budget(batch: bool) -> RunBudget:
+    input_price, output_price = llm_price(LLM_MODEL)
+    if batch:
+        input_price, output_price = input_price * BATCH_PRICE_RATIO, output_price * BATCH_PRICE_RATIO
+    return RunBudget(RUN_TOKEN_BUDGET, RUN_COST_BUDGET_USD, input_price, output_price)
 
 
 # -- メイン処理 --------------
 def main():
-    print("Metadata Generator 開始")
+    global llm_cache, duplicate_index, tag_dictionary, run_budget
+    args = parse_args()
+    print("Metadata Generator 開始" + ("（Batch APIモード）" if args.batch else ""))
+    start_run("metadata-generator")
 
     # DB接続
     conn = get_db_connection()
     print("データベース接続成功")
 
-    # メタデータ未生成の記事取得
-    articles = get_articles_without_metadata(conn)
-    print(f"メタデータ未生成の記事: {len(articles)}件")
-
-    if len(articles) == 0:
-        print("処理対象の記事がありません")
-        conn.close()
-        return
-
-    # 記事処理
-    process_articles(conn, articles)
+    if NEAR_DUPLICATE_ENABLED:
+        duplicate_index = NearDuplicateIndex(conn, NEAR_DUPLICATE_THRESHOLD)
+    rules = load_tag_rules(TAG_ALIASES_PATH) if TAG_ALIASES_PATH else None
+    tag_dictionary = TagDictionary(conn, TagNormalizer(rules))
+
+    report = {"mode": "batch" if args.batch else "sync"}
+    run_budget = init_run_budget(args.batch)
+    if args.batch:
+        llm_cache = init_llm_cache()
+        run_batch_mode(conn, args.wait)
+    else:
+        # メタデータ未生成の記事数を確認
+        pending_count = count_pending_articles(conn, METADATA_LEASE_MINUTES)
+        print(f"メタデータ未生成の記事: {pending_count}件")
+
+        # 関連度の低い記事は要約・タグを生成しない
+        if pending_count > 0:
+            pending_count = score_relevance(conn, pending_count)
+
+        if pending_count == 0:
+            print("処理対象の記事がありません")
+            conn.close()
+            finish_run(**report, articles=0)
+            return
+
+        # 記事処理（SKIP LOCKEDで確保した記事を順次処理。複数タスク・プロセスで並列実行可能）
+        llm_cache = init_llm_cache()
+        report["articles"] = process_articles(conn, iter_articles(conn))
 
     # DB接続クローズ
+    if llm_cache is not None:
+        llm_cache.close()
     conn.close()
+    finish_run(**report)
     print("\nMetadata Generator 完了")
 
 
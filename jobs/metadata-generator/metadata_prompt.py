@@ -0,0 +1,133 @@
+import hashlib
+import json
+import re
+
+
+# -- モデル設定 --------------
+LLM_MODEL = "gpt-4o-mini"
+LLM_TEMPERATURE = 0.5
+
+
+# -- 要約・タグ生成プロンプト（1リクエストでJSONとして返す） --------------
+METADATA_PROMPT_TEMPLATE = """
+次の記事本文から、要約とトピックを表すタグを生成して、JSONで返して。
+
+# summary
+- 200字程度で要約する。言語は記事本文と同じで。語尾は断定形で。
+
+# tags
+登場する企業や組織、業界、分類を表すような5～30個の単語を配列で。網羅的に。
+最小単位に区切って生成すること。検索性を最大化し、かつ粒度を統一するためのタグを抽出して。
+半導体関連の記事は「半導体」というタグを必ず含めて。
+製品名、サービス名、企業名などの固有名詞も含めて。日本企業は日本語、外国企業はアルファベットで。
+
+1. 基本実体 (Entities): 記事に登場する固有名詞（企業名、製品名、イベント名、人名）。
+2. 構成要素への分解 (Decomposition): 複合語やイベント名を最小単位に分解する。
+- 年号が含まれる場合は分離する。
+- アルファベットの頭文字（略称）が一般的な場合は追加する。
+3. 階層・カテゴリ (Hierarchy & Category): その単語が属する上位概念や業界名を追加する。（テクノロジー、自動車、メーカー、食品、など）
+4. 正規化・ブランド名 (Normalization): 正式名称から「株式会社」や「自動車」などの法人格・業種接尾辞を取り除き、一般的な「ブランド名」にする。
+- 例: トヨタ自動車 → トヨタ
+- 例: 2025年 → 2025
+
+# Rules & Constraints
+- 最小単位: 複合語はできるだけ単語単位に分解したタグも併記する。
+- 網羅性: 検索されそうな関連ワードは積極的に含める。
+- 年号: 「XXXX年」は「XXXX」と4桁の数字のみにする。
+- 企業名: 子会社の場合は「子会社名」「親会社/ブランド名」「業界/技術分野」など、関連するタグも含める。
+
+# 記事本文
+{article_text}
+"""
+
+# 構造化出力（OpenAI json_schema, strict）
+METADATA_RESPONSE_FORMAT = {
+    "name": "article_metadata",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string", "description": "記事の要約（200字程度）"},
+            "tags": {"type": "array", "items": {"type": "string"}, "description": "トピックを表すタグ（5～30個）"},
+        },
+        "required": ["summary", "tags"],
+        "additionalProperties": False,
+    },
+}
+
+
+# プロンプト・スキーマ・モデルのバージョン（変更するとLLM結果キャッシュが無効になる）
+PROMPT_VERSION = hashlib.sha256(
+    json.dumps([METADATA_PROMPT_TEMPLATE, METADATA_RESPONSE_FORMAT, LLM_MODEL, LLM_TEMPERATURE],
+               ensure_ascii=False, sort_keys=True).encode("utf-8")
+).hexdigest()[:16]
+
+
+def build_prompt(article_text: str) -> str:
+    return METADATA_PROMPT_TEMPLATE.format(article_text=article_text)
+
+
+def build_completion_body(article_text: str) -> dict:
+    """Chat Completions API のリクエスト本文（同期モードの直接呼び出しと Batch API で共通）"""
+    return {
+        "model": LLM_MODEL,
+        "temperature": LLM_TEMPERATURE,
+        "messages": [{"role": "user", "content": build_prompt(article_text)}],
+        "response_format": {"type": "json_schema", "json_schema": METADATA_RESPONSE_FORMAT},
+    }
+
+
+# -- タグの正規化 --------------
+TAG_SEPARATOR_PATTERN = re.compile(r"[,、，;；\n]+")
+# 番号付きリストの番号（"1. " など。"2.5D"・"1.4nm" を壊さないよう半角の区切りの後は空白を必須にする）
+TAG_PREFIX_PATTERN = re.compile(r"^\s*(?:[-*・#]+\s*|\d+(?:[.)]\s+|[．）]\s*))")
+MAX_TAG_LENGTH = 50
+
+
+def parse_tags(value) -> list[str]:
+    """配列・区切り文字列のどちらでも受け付け、重複と空要素を除いたタグ一覧を返す"""
+    if value is None:
+        return []
+
+    if isinstance(value, str):
+        stripped = value.strip()
+        # JSON配列の文字列
+        if stripped.startswith("["):
+            try:
+                return parse_tags(json.loads(stripped))
+            except ValueError:
+                pass
+        items = TAG_SEPARATOR_PATTERN.split(stripped)
+    else:
+        items = []
+        for item in value:
+            # 配列要素内に区切り文字が含まれる場合も分割
+            items.extend(TAG_SEPARATOR_PATTERN.split(str(item)))
+
+    tags = []
+    seen = set()
+    for item in items:
+        tag = TAG_PREFIX_PATTERN.sub("", item).strip().strip("\"'「」『』[]").strip()
+        if not tag or len(tag) > MAX_TAG_LENGTH:
+            continue
+        if tag in seen:
+            continue
+        seen.add(tag)
+        tags.append(tag)
+    return tags
+
+
+# -- 応答の検証 --------------
+def parse_metadata(value) -> tuple[str | None, list[str]]:
+    """構造化出力（dict または JSON文字列）から要約とタグを取り出す"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None, []
+    if not isinstance(value, dict):
+        return None, []
+
+    summary = value.get("summary")
+    summary = summary.strip() if isinstance(summary, str) and summary.strip() else None
+    return summary, parse_tags(value.get("tags"))
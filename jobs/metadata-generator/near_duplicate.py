@@ -0,0 +1,250 @@
+import re
+import struct
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from psycopg2.extras import execute_values
+
+
+# -- MinHash設定（変更すると保存済みシグネチャと互換性がなくなる） --------------
+NUM_BINS_BITS = 7
+NUM_BINS = 1 << NUM_BINS_BITS          # シグネチャ長 128
+BANDS = 16                             # LSHのバンド数（1バンド8行。類似度0.7前後から候補になる）
+ROWS_PER_BAND = NUM_BINS // BANDS
+SHINGLE_CHARS = 5                      # 文字5-gram（日本語は単語区切りがないため文字単位）
+MAX_SIGNATURE_CHARS = 4000             # 先頭のみで判定（転載記事は冒頭がほぼ一致する）
+MIN_SIGNATURE_CHARS = 100              # これより短い本文は判定しない
+
+DEFAULT_THRESHOLD = 0.8
+
+_VALUE_BITS = 32 - NUM_BINS_BITS
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_EMPTY = 1 << 32
+_MIX = 0x9E3779B1
+_SIGNATURE_FORMAT = f"<{NUM_BINS}Q"
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+# -- シグネチャ（One Permutation Hashing + ローテーションによる空ビン補完） --------------
+def minhash_signature(text: str | None) -> list[int] | None:
+    """
+    本文の文字5-gramから MinHash シグネチャを作る。
+    シングルごとにハッシュを1回だけ計算し、上位ビットでビン、下位ビットを値として各ビンの最小値を取る。
+    """
+    if not text:
+        return None
+    normalized = _WHITESPACE_PATTERN.sub("", unicodedata.normalize("NFKC", text).casefold())[:MAX_SIGNATURE_CHARS]
+    if len(normalized) < MIN_SIGNATURE_CHARS:
+        return None
+
+    # UTF-32は1文字4バイト固定のため、バイト列のスライスで文字n-gramを取り出せる
+    data = normalized.encode("utf-32-le")
+    width = SHINGLE_CHARS * 4
+    mins = [_EMPTY] * NUM_BINS
+    crc32 = zlib.crc32
+    for offset in range(0, len(data) - width + 4, 4):
+        h = (crc32(data[offset:offset + width]) * _MIX) & 0xFFFFFFFF
+        index = h >> _VALUE_BITS
+        value = h & _VALUE_MASK
+        if value < mins[index]:
+            mins[index] = value
+
+    # 空のビンは次の空でないビンの値で補完（距離を加えて区別）
+    filled = [i for i in range(NUM_BINS) if mins[i] != _EMPTY]
+    if len(filled) < NUM_BINS:
+        signature = list(mins)
+        for i in range(NUM_BINS):
+            if mins[i] != _EMPTY:
+                continue
+            for distance in range(1, NUM_BINS):
+                source = mins[(i + distance) % NUM_BINS]
+                if source != _EMPTY:
+                    signature[i] = source + (distance << _VALUE_BITS)
+                    break
+        return signature
+    return mins
+
+
+def similarity(signature_a: list[int], signature_b: list[int]) -> float:
+    """推定Jaccard類似度（一致するビンの割合）"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_BINS
+
+
+def band_keys(signature: list[int]) -> list[tuple[int, int]]:
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        keys.append((band, zlib.crc32(struct.pack(f"<{ROWS_PER_BAND}Q", *rows))))
+    return keys
+
+
+def pack_signature(signature: list[int]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data: bytes) -> list[int]:
+    return list(struct.unpack(_SIGNATURE_FORMAT, bytes(data)))
+
+
+# -- LSHインデックス（メモリ上） --------------
+class MinHashLSH:
+    def __init__(self):
+        self.buckets: dict[tuple[int, int], list[str]] = {}
+        self.signatures: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.signatures
+
+    def add(self, key: str, signature: list[int]):
+        if key in self.signatures:
+            return
+        self.signatures[key] = signature
+        for band_key in band_keys(signature):
+            self.buckets.setdefault(band_key, []).append(key)
+
+    def query(self, signature: list[int], threshold: float = DEFAULT_THRESHOLD) -> tuple[str, float] | None:
+        """バンドが1つ以上一致する候補のうち、類似度が閾値以上で最も高いものを返す"""
+        candidates = set()
+        for band_key in band_keys(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            score = similarity(signature, self.signatures[key])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+
+# -- 判定結果 --------------
+@dataclass
+class DuplicateStats:
+    checked: int = 0
+    indexed: int = 0
+    duplicates: int = 0
+    copied: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"近似重複: {self.checked}件判定, {self.duplicates}件重複 "
+            f"(要約・タグ複製{self.copied}件), {self.indexed}件を正規記事として登録"
+        )
+
+
+# -- 近似重複インデックス（DB永続化） --------------
+class NearDuplicateIndex:
+    """
+    正規記事（重複元）のシグネチャとLSHバンドを article_minhash / article_lsh_bands に保持する。
+    確保したバッチ単位で候補をDBから読み込み、重複記事には duplicate_of を記録する。
+    DB操作はメインスレッドからのみ行う。
+    """
+
+    def __init__(self, conn, threshold: float = DEFAULT_THRESHOLD):
+        self.conn = conn
+        self.threshold = threshold
+        self.lsh = MinHashLSH()
+        self.metadata: dict[str, tuple[str, list[str]]] = {}
+        self.stats = DuplicateStats()
+
+    def _load_candidates(self, signatures: list[list[int]]):
+        keys = {band_key for signature in signatures for band_key in band_keys(signature)}
+        if not keys:
+            return
+
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT m.article_id, m.signature, a.summary, a.tags, a.metadata_generated
+            FROM unnest(%s::smallint[], %s::bigint[]) AS q(band, bucket)
+            JOIN article_lsh_bands AS b ON b.band = q.band AND b.bucket = q.bucket
+            JOIN article_minhash AS m ON m.article_id = b.article_id
+            JOIN articles AS a ON a.id = m.article_id
+        """, ([band for band, _ in keys], [bucket for _, bucket in keys]))
+        for article_id, signature, summary, tags, metadata_generated in cursor.fetchall():
+            article_id = str(article_id)
+            self.lsh.add(article_id, unpack_signature(signature))
+            if metadata_generated and summary:
+                self.metadata[article_id] = (summary, list(tags or []))
+        cursor.close()
+
+    def annotate_batch(self, articles: list[dict]):
+        """
+        本文のある記事を判定し、重複記事には article["duplicate_of"] を、
+        正規記事のメタデータ生成済みなら article["canonical_metadata"]（要約・タグ）を設定する。
+        判定結果はDBへの書き込みをコミットしてから記事とメモリ上のインデックスに反映する。
+        """
+        signatures = {}
+        for article in articles:
+            signature = minhash_signature(article.get("content"))
+            if signature is not None:
+                signatures[str(article["id"])] = signature
+        if not signatures:
+            return
+
+        try:
+            self._load_candidates(list(signatures.values()))
+
+            # 同じバッチ内の正規記事はコミットまで別のインデックスに保持する
+            batch_lsh = MinHashLSH()
+            duplicates, minhash_rows, band_rows, duplicate_rows = [], [], [], []
+            for article in articles:
+                article_id = str(article["id"])
+                signature = signatures.get(article_id)
+                if signature is None:
+                    continue
+
+                matches = [match for match in (self.lsh.query(signature, self.threshold),
+                                               batch_lsh.query(signature, self.threshold)) if match is not None]
+                match = max(matches, key=lambda match: match[1]) if matches else None
+                if match is not None and match[0] != article_id:
+                    canonical_id, _ = match
+                    duplicates.append((article, canonical_id))
+                    duplicate_rows.append((article_id, canonical_id))
+                    continue
+
+                # 重複元が見つからなければ正規記事として登録
+                batch_lsh.add(article_id, signature)
+                minhash_rows.append((article_id, pack_signature(signature)))
+                band_rows.extend((band, bucket, article_id) for band, bucket in band_keys(signature))
+
+            cursor = self.conn.cursor()
+            if minhash_rows:
+                execute_values(cursor, """
+                    INSERT INTO article_minhash (article_id, signature) VALUES %s
+                    ON CONFLICT (article_id) DO NOTHING
+                """, minhash_rows, template="(%s::uuid, %s)")
+                execute_values(cursor, """
+                    INSERT INTO article_lsh_bands (band, bucket, article_id) VALUES %s
+                    ON CONFLICT DO NOTHING
+                """, band_rows, template="(%s, %s, %s::uuid)", page_size=1000)
+            if duplicate_rows:
+                execute_values(cursor, """
+                    UPDATE articles AS a
+                    SET duplicate_of = v.duplicate_of
+                    FROM (VALUES %s) AS v(id, duplicate_of)
+                    WHERE a.id = v.id
+                """, duplicate_rows, template="(%s::uuid, %s::uuid)")
+            self.conn.commit()
+            cursor.close()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"近似重複判定エラー: {e}")
+            return
+
+        for article_id, signature in batch_lsh.signatures.items():
+            self.lsh.add(article_id, signature)
+        for article, canonical_id in duplicates:
+            article["duplicate_of"] = canonical_id
+            if canonical_id in self.metadata:
+                article["canonical_metadata"] = self.metadata[canonical_id]
+                self.stats.copied += 1
+        self.stats.checked += len(minhash_rows) + len(duplicates)
+        self.stats.indexed += len(minhash_rows)
+        self.stats.duplicates += len(duplicates)
+
+    def record_metadata(self, article_id: str, summary: str, tags: list[str]):
+        """DBに書き込んだ正規記事のメタデータを記録し、同じ実行内の重複記事に複製できるようにする"""
+        if str(article_id) in self.lsh:
+            self.metadata[str(article_id)] = (summary, tags)
@@ -0,0 +1,209 @@
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+
+import yaml
+from psycopg2.extras import execute_values
+
+from common.search_document import build_search_document, search_tokens
+from work_queue import LEASE_EXPIRED_CONDITION, PENDING_CONDITION
+
+
+DEFAULT_RELEVANCE_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relevance_keywords.yaml")
+DEFAULT_RELEVANCE_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relevance_model.json")
+DEFAULT_THRESHOLD = 0.3
+MAX_KEYWORD_COUNT = 3           # 同じキーワードを数える上限
+TITLE_WEIGHT = 2.0              # タイトルに含まれるキーワードの重みの倍率
+SCORED_CONTENT_CHARS = 3000     # 判定に使う本文の先頭の文字数
+
+
+def fold(text: str | None) -> str:
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+# -- キーワード辞書 --------------
+@dataclass
+class RelevanceRules:
+    keywords: dict[str, float] = field(default_factory=dict)        # 正規化したキーワード -> 重み（負は減点）
+    trusted_sources: frozenset[str] = frozenset()
+
+
+def load_relevance_rules(path: str = DEFAULT_RELEVANCE_RULES_PATH) -> RelevanceRules:
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    keywords = {fold(str(keyword)): float(weight) for keyword, weight in (config.get("keywords") or {}).items()}
+    for keyword, weight in (config.get("negative") or {}).items():
+        keywords[fold(str(keyword))] = -abs(float(weight))
+    return RelevanceRules(keywords=keywords, trusted_sources=frozenset(config.get("trusted_sources") or []))
+
+
+def compile_keywords(keywords: dict[str, float]) -> re.Pattern | None:
+    """長いキーワードを優先する1つの正規表現（英数字のキーワードは単語単位で照合）"""
+    alternatives = []
+    for keyword in sorted(keywords, key=len, reverse=True):
+        escaped = re.escape(keyword)
+        alternatives.append(rf"(?<![0-9a-z]){escaped}(?![0-9a-z])" if keyword.isascii() else escaped)
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+# -- 学習済みモデル（TF-IDF + ロジスティック回帰。scripts/train_relevance で作成） --------------
+@dataclass
+class RelevanceModel:
+    idf: dict[str, float]
+    weights: dict[str, float]
+    bias: float
+    metadata: dict = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "RelevanceModel":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(idf=data["idf"], weights=data["weights"], bias=data["bias"], metadata=data.get("metadata", {}))
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"idf": self.idf, "weights": self.weights, "bias": self.bias, "metadata": self.metadata},
+                      f, ensure_ascii=False)
+
+    def vectorize(self, tokens: list[str]) -> dict[str, float]:
+        """L2正規化した TF-IDF ベクトル（語彙にない語は除く）"""
+        vector = {token: count * self.idf[token] for token, count in Counter(tokens).items() if token in self.idf}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {token: value / norm for token, value in vector.items()} if norm else {}
+
+    def predict(self, text: str) -> float:
+        vector = self.vectorize(search_tokens(text))
+        z = self.bias + sum(self.weights.get(token, 0.0) * value for token, value in vector.items())
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def model_text(title: str | None, content: str | None) -> str:
+    """モデルの入力（学習時と同じ）"""
+    return f"{title or ''}\n{(content or '')[:SCORED_CONTENT_CHARS]}"
+
+
+# -- 関連度 --------------
+class RelevanceScorer:
+    """
+    キーワード辞書による関連度（0〜1）。学習済みモデルがある場合は、モデルの確率との大きい方を使う
+    （どちらかで関連ありと判定されれば処理する）。
+    """
+
+    def __init__(self, rules: RelevanceRules | None = None, model: RelevanceModel | None = None):
+        self.rules = rules or load_relevance_rules()
+        self.model = model
+        self._pattern = compile_keywords(self.rules.keywords)
+
+    def keyword_weight(self, text: str | None) -> float:
+        if self._pattern is None:
+            return 0.0
+        counts = Counter(match.group(0) for match in self._pattern.finditer(fold(text)))
+        return sum(self.rules.keywords[keyword] * min(count, MAX_KEYWORD_COUNT) for keyword, count in counts.items())
+
+    def keyword_score(self, title: str | None, content: str | None) -> float:
+        weight = self.keyword_weight(title) * TITLE_WEIGHT + self.keyword_weight((content or "")[:SCORED_CONTENT_CHARS])
+        return 1 - math.exp(-max(0.0, weight))
+
+    def score(self, title: str | None, content: str | None, source: str | None = None) -> float:
+        if source in self.rules.trusted_sources:
+            return 1.0
+        score = self.keyword_score(title, content)
+        if self.model is not None:
+            score = max(score, self.model.predict(model_text(title, content)))
+        return score
+
+
+def load_relevance_scorer(rules_path: str | None = None, model_path: str | None = None) -> RelevanceScorer:
+    """model_path 未指定時は既定の場所にモデルがあれば使う"""
+    rules = load_relevance_rules(rules_path or DEFAULT_RELEVANCE_RULES_PATH)
+    model_path = model_path or (DEFAULT_RELEVANCE_MODEL_PATH if os.path.exists(DEFAULT_RELEVANCE_MODEL_PATH) else None)
+    model = RelevanceModel.load(model_path) if model_path else None
+    return RelevanceScorer(rules, model)
+
+
+# -- 判定統計 --------------
+@dataclass
+class RelevanceStats:
+    scored: int = 0
+    skipped: int = 0
+    no_content: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        skip_ratio = self.skipped / self.scored if self.scored else 0.0
+        return (
+            f"関連度判定: {self.scored}件判定, {self.skipped}件を要約・タグ生成の対象外に ({skip_ratio:.1%}), "
+            f"本文なし{self.no_content}件, {self.seconds:.2f}秒"
+        )
+
+
+# -- 未処理記事の判定（関連度を保存し、閾値未満の記事は metadata_skipped_at を設定して対象外にする） --------------
+UNSCORED_QUERY = f"""
+    SELECT id, title, source, content, claimed_at
+    FROM articles
+    WHERE {PENDING_CONDITION}
+      AND relevance_score IS NULL
+      AND {LEASE_EXPIRED_CONDITION}
+      AND (%(after_id)s::uuid IS NULL OR id > %(after_id)s::uuid)
+    ORDER BY id
+    LIMIT %(limit)s
+"""
+
+# 読み込み後に他のワーカーが確保した記事は更新しない。対象外の記事も検索できるよう、タイトル・本文から検索文書を作成する
+# （metadata_generated は LLM で要約・タグを生成した記事のみ TRUE にする）
+SAVE_SCORES_QUERY = """
+    UPDATE articles AS a
+    SET relevance_score = v.score,
+        metadata_skipped_at = CASE WHEN v.skip THEN CURRENT_TIMESTAMP END,
+        search_tsv = CASE WHEN v.skip THEN build_search_tsv(v.search_title, '', v.search_content) ELSE a.search_tsv END
+    FROM (VALUES %s) AS v(id, claimed_at, score, skip, search_title, search_content)
+    WHERE a.id = v.id
+      AND a.metadata_generated = FALSE
+      AND a.metadata_skipped_at IS NULL
+      AND a.claimed_at IS NOT DISTINCT FROM v.claimed_at
+"""
+
+
+def score_pending_articles(conn, scorer: RelevanceScorer, threshold: float = DEFAULT_THRESHOLD,
+                           lease_minutes: int = 30, batch_size: int = 500) -> RelevanceStats:
+    """関連度が未判定の未処理記事を判定する。本文のない記事はタイトルのみで判定し、対象外にはしない"""
+    stats = RelevanceStats()
+    started_at = time.perf_counter()
+    after_id = None
+    while True:
+        cursor = conn.cursor()
+        cursor.execute(UNSCORED_QUERY, {"after_id": after_id, "limit": batch_size, "lease_minutes": lease_minutes})
+        rows = cursor.fetchall()
+        if not rows:
+            cursor.close()
+            break
+        after_id = str(rows[-1][0])
+
+        values = []
+        for article_id, title, source, content, claimed_at in rows:
+            score = scorer.score(title, content, source)
+            skip = bool(content) and score < threshold
+            search_title, _, search_content = build_search_document(title, None, None, content) if skip else ("", "", "")
+            values.append((str(article_id), claimed_at, score, skip, search_title, search_content))
+            stats.scored += 1
+            stats.skipped += int(skip)
+            stats.no_content += int(not content)
+
+        try:
+            execute_values(cursor, SAVE_SCORES_QUERY, values,
+                           template="(%s::uuid, %s::timestamp, %s::real, %s, %s, %s)", page_size=len(values))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    stats.seconds = time.perf_counter() - started_at
+    return stats
@@ -0,0 +1,179 @@
+import os
+import socket
+from typing import Iterator
+
+from common.content_archive import ARCHIVE_JOIN, CONTENT_COLUMNS, rehydrate_content
+
+
+# -- ワーカーID（Cloud Run Jobのタスク番号を含める） --------------
+def get_worker_id() -> str:
+    execution = os.environ.get("CLOUD_RUN_EXECUTION") or socket.gethostname()
+    task_index = os.environ.get("CLOUD_RUN_TASK_INDEX", "0")
+    return f"{execution}-{task_index}-{os.getpid()}"
+
+
+# -- リース期限（Batch APIに投入した記事は完了期限まで確保し続ける） --------------
+BATCH_CLAIM_PREFIX = "batch:"
+BATCH_LEASE_MINUTES = 26 * 60
+
+LEASE_EXPIRED_CONDITION = (
+    "(claimed_at IS NULL OR claimed_at < CURRENT_TIMESTAMP - make_interval(mins => "
+    f"CASE WHEN claimed_by LIKE '{BATCH_CLAIM_PREFIX}%%' THEN {BATCH_LEASE_MINUTES} ELSE %(lease_minutes)s END))"
+)
+
+
+# 未処理記事（関連度判定で対象外にした記事は metadata_generated = FALSE のまま metadata_skipped_at を設定する）
+PENDING_CONDITION = "metadata_generated = FALSE AND metadata_skipped_at IS NULL"
+
+
+# -- 未処理記事数 --------------
+def count_pending_articles(conn, lease_minutes: int) -> int:
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT COUNT(*)
+        FROM articles
+        WHERE {PENDING_CONDITION}
+          AND {LEASE_EXPIRED_CONDITION}
+    """, {"lease_minutes": lease_minutes})
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+# -- 記事の取得権（リース）を確保（関連度の段階が高い順、同じ段階では新しい順） --------------
+RELEVANCE_TIER = "relevance_tier(relevance_score)"
+
+CLAIM_QUERY = f"""
+    WITH candidates AS (
+        SELECT id
+        FROM articles
+        WHERE {PENDING_CONDITION}
+          AND {LEASE_EXPIRED_CONDITION}
+          {{keyset_condition}}
+        ORDER BY {RELEVANCE_TIER} DESC, created_at DESC, id DESC
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE articles AS a
+    SET claimed_at = CURRENT_TIMESTAMP, claimed_by = %(worker_id)s
+    FROM candidates
+    WHERE a.id = candidates.id
+    RETURNING a.id, a.title, a.url, a.created_at, {RELEVANCE_TIER.replace("relevance_score", "a.relevance_score")}
+"""
+
+
+def claim_articles(conn, worker_id: str, limit: int, lease_minutes: int,
+                   after: tuple | None = None) -> list[dict]:
+    # (関連度の段階, created_at, id) のキーセットで前回の続きから取得
+    keyset_condition = (
+        f"AND ({RELEVANCE_TIER}, created_at, id) < (%(after_tier)s, %(after_created_at)s, %(after_id)s::uuid)"
+        if after else ""
+    )
+    params = {"lease_minutes": lease_minutes, "limit": limit, "worker_id": worker_id}
+    if after:
+        params["after_tier"], params["after_created_at"], params["after_id"] = after
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(CLAIM_QUERY.format(keyset_condition=keyset_condition), params)
+        rows = cursor.fetchall()
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+    rows.sort(key=lambda row: (row[4], row[3], str(row[0])), reverse=True)
+    return [{"id": row[0], "title": row[1], "url": row[2], "created_at": row[3], "relevance_tier": row[4]}
+            for row in rows]
+
+
+# -- 確保した記事のリースを解除（予算超過などで処理しなかった記事を次回の実行に回す） --------------
+def release_articles(conn, worker_id: str, article_ids: list) -> int:
+    if not article_ids:
+        return 0
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE articles
+            SET claimed_at = NULL, claimed_by = NULL
+            WHERE id = ANY(%s::uuid[]) AND claimed_by = %s AND metadata_generated = FALSE
+        """, ([str(article_id) for article_id in article_ids], worker_id))
+        released = cursor.rowcount
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+    return released
+
+
+# -- 収集時に保存された本文をバッチ単位で取得（退避済みの本文は展開） --------------
+def load_article_contents(conn, article_ids: list) -> dict[str, str]:
+    if not article_ids:
+        return {}
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT a.id, {CONTENT_COLUMNS}
+        FROM articles AS a
+        {ARCHIVE_JOIN}
+        WHERE a.id = ANY(%s::uuid[]) AND (a.content <> '' OR archive.content_zstd IS NOT NULL)
+    """, ([str(article_id) for article_id in article_ids],))
+    contents = {str(row[0]): rehydrate_content(row[1], row[2]) for row in cursor.fetchall()}
+    cursor.close()
+    return contents
+
+
+# -- 記事のタイトル・本文を取得（Batch APIの結果反映時に検索文書を作成するため） --------------
+def load_articles(conn, article_ids: list) -> dict[str, dict]:
+    if not article_ids:
+        return {}
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT a.id, a.title, {CONTENT_COLUMNS}
+        FROM articles AS a
+        {ARCHIVE_JOIN}
+        WHERE a.id = ANY(%s::uuid[])
+    """, ([str(article_id) for article_id in article_ids],))
+    articles = {
+        str(row[0]): {"id": str(row[0]), "title": row[1], "content": rehydrate_content(row[2], row[3])}
+        for row in cursor.fetchall()
+    }
+    cursor.close()
+    return articles
+
+
+# -- 未処理記事をバッチ単位でストリーミング --------------
+def iter_claimed_batches(conn, worker_id: str, batch_size: int = 20,
+                         lease_minutes: int = 30, max_articles: int | None = None) -> Iterator[list[dict]]:
+    after = None
+    claimed_count = 0
+    while True:
+        # 上限件数を超えて確保しない
+        limit = batch_size if max_articles is None else min(batch_size, max_articles - claimed_count)
+        if limit <= 0:
+            return
+
+        batch = claim_articles(conn, worker_id, limit, lease_minutes, after)
+        if not batch:
+            return
+        claimed_count += len(batch)
+
+        # 本文は確保したバッチ分だけ読み込む
+        contents = load_article_contents(conn, [article["id"] for article in batch])
+        print(f"\n{len(batch)}件の記事を確保 (worker: {worker_id}, 保存済み本文{len(contents)}件)")
+        for article in batch:
+            article["content"] = contents.get(str(article["id"]))
+        yield batch
+
+        last = batch[-1]
+        after = (last["relevance_tier"], last["created_at"], str(last["id"]))
+
+
+def iter_claimed_articles(conn, worker_id: str, batch_size: int = 20,
+                          lease_minutes: int = 30, max_articles: int | None = None) -> Iterator[dict]:
+    for batch in iter_claimed_batches(conn, worker_id, batch_size, lease_minutes, max_articles):
+        yield from batch
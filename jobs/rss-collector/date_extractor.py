@@ -0,0 +1,277 @@
+import json
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from bs4 import BeautifulSoup
+from dateutil import parser as dateparser
+
+
+# -- 日付パターン --------------
+ISO_DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})-(\d{1,2})-(\d{1,2})(?!\d)")
+JA_DATE_PATTERN = re.compile(r"(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日")
+JA_ERA_PATTERN = re.compile(r"令和\s*(\d{1,2}|元)\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日")
+SLASH_DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})[/.](\d{1,2})[/.](\d{1,2})(?!\d)")
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+EN_MDY_PATTERN = re.compile(r"\b([A-Za-z]{3})[a-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b")
+EN_DMY_PATTERN = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+([A-Za-z]{3})[a-z]*\.?,?\s+(\d{4})\b")
+
+# 日付候補として参照する<meta>のproperty/name（優先順）
+META_DATE_KEYS = (
+    "article:published_time",
+    "og:published_time",
+    "datePublished",
+    "pubdate",
+    "publishdate",
+    "date",
+    "article:modified_time",
+)
+
+
+# -- 日付候補抽出（構造化データ → テキストの順） --------------
+def extract_date_candidates(soup: BeautifulSoup) -> list[str]:
+    candidates = []
+
+    # JSON-LD の datePublished
+    for script in soup.find_all("script", type="application/ld+json"):
+        published = _find_json_ld_date(script.string or script.get_text())
+        if published:
+            candidates.append(published)
+            break
+
+    # <meta>タグから取得
+    metas = {}
+    for tag in soup.find_all("meta"):
+        key = tag.get("property") or tag.get("name") or tag.get("itemprop")
+        if key and tag.get("content") and key not in metas:
+            metas[key] = tag.get("content")
+    for key in META_DATE_KEYS:
+        if key in metas:
+            candidates.append(metas[key])
+            break
+
+    # <time datetime> 属性、なければ<time>要素のテキスト
+    date_element = soup.find("time")
+    if date_element:
+        if date_element.get("datetime"):
+            candidates.append(date_element["datetime"])
+        text = date_element.get_text().strip()
+        if text:
+            candidates.append(text)
+
+    # 特定のクラス名やIDから取得
+    possible_date_elements = soup.find_all(attrs={"class": re.compile(r"date|time|datetime|published|the-date|cal", re.I)})
+    for element in possible_date_elements:
+        text = element.get_text().strip()
+        if text:
+            candidates.append(text)
+            break
+
+    return list(dict.fromkeys(candidates))
+
+
+def _find_json_ld_date(raw_json: str | None) -> str | None:
+    if not raw_json:
+        return None
+    try:
+        data = json.loads(raw_json)
+    except ValueError:
+        return None
+
+    # @graph や配列の入れ子を走査
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            value = node.get("datePublished")
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+            stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    return None
+
+
+# -- 日付文字列のローカルパース --------------
+def _to_iso(year: int, month: int, day: int) -> str | None:
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def _era_date(match: re.Match) -> str | None:
+    era_year = 1 if match.group(1) == "元" else int(match.group(1))
+    return _to_iso(2018 + era_year, int(match.group(2)), int(match.group(3)))
+
+
+def _en_date(year: str, month_name: str, day: str) -> str | None:
+    month = MONTHS.get(month_name.lower())
+    return _to_iso(int(year), month, int(day)) if month else None
+
+
+# (パターン, 方式, 一致から 'YYYY-MM-DD' への変換)（優先順）
+LOCAL_DATE_RULES = (
+    (ISO_DATE_PATTERN, "iso", lambda match: _to_iso(*map(int, match.groups()))),
+    (JA_DATE_PATTERN, "ja", lambda match: _to_iso(*map(int, match.groups()))),
+    (JA_ERA_PATTERN, "ja_era", _era_date),
+    (SLASH_DATE_PATTERN, "slash", lambda match: _to_iso(*map(int, match.groups()))),
+    (EN_MDY_PATTERN, "en", lambda match: _en_date(match.group(3), match.group(1), match.group(2))),
+    (EN_DMY_PATTERN, "en", lambda match: _en_date(match.group(3), match.group(2), match.group(1))),
+)
+
+
+def parse_date_string(raw: str) -> tuple[str | None, str]:
+    """日付文字列を 'YYYY-MM-DD' に変換し、(結果, 使用した方式) を返す"""
+    text = raw.strip()
+    if not text:
+        return None, "empty"
+
+    # 各方式で、存在する日付になる最初の一致を使う（電話番号などの一致は次の候補・方式に進む）
+    for pattern, method, to_date in LOCAL_DATE_RULES:
+        for match in pattern.finditer(text):
+            parsed = to_date(match)
+            if parsed:
+                return parsed, method
+
+    # dateutilでパース（年を含む文字列のみ。年なしは当年補完で誤判定するため）
+    if re.search(r"\d{4}", text):
+        try:
+            parsed_date = dateparser.parse(text, fuzzy=True)
+            if parsed_date:
+                return parsed_date.strftime("%Y-%m-%d"), "dateutil"
+        except (ValueError, OverflowError):
+            pass
+
+    return None, "unresolved"
+
+
+# -- 日付解決の統計 --------------
+@dataclass
+class DateParseStats:
+    methods: Counter = field(default_factory=Counter)
+    cache_hits: int = 0
+    llm_calls: int = 0
+    llm_errors: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, method: str):
+        with self._lock:
+            self.methods[method] += 1
+
+    def summary(self) -> str:
+        local = sum(count for method, count in self.methods.items() if method not in ("none", "llm", "cache"))
+        return (
+            f"日付解決: ローカル{local}件 {dict(self.methods)}, "
+            f"キャッシュヒット{self.cache_hits}件, LLM呼び出し{self.llm_calls}件（失敗{self.llm_errors}件）"
+        )
+
+
+# -- LLMフォールバック結果の永続キャッシュ --------------
+class DateCache:
+    """
+    ローカルで解決できなかった日付文字列のLLM変換結果を生文字列キーで保持する。
+    LLMが日付を返さなかった結果（None）も保存し、同じ文字列でLLMを再度呼ばない（呼び出しの失敗は保存しない）。
+    """
+
+    def __init__(self, entries: dict[str, str | None] | None = None):
+        self._entries = dict(entries or {})
+        self._pending: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+        self.in_flight: dict[str, threading.Event] = {}     # LLMで変換中の文字列（lock で保護）
+
+    @classmethod
+    def load(cls, conn) -> "DateCache":
+        cursor = conn.cursor()
+        cursor.execute("SELECT raw_text, parsed_date FROM date_parse_cache")
+        entries = {raw: parsed.isoformat() if parsed else None for raw, parsed in cursor.fetchall()}
+        cursor.close()
+        return cls(entries)
+
+    def __contains__(self, raw: str) -> bool:
+        return raw in self._entries
+
+    def get(self, raw: str) -> str | None:
+        return self._entries.get(raw)
+
+    def put(self, raw: str, parsed: str | None):
+        self._entries[raw] = parsed
+        self._pending[raw] = parsed
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def save(self, conn):
+        if not self._pending:
+            return
+        try:
+            cursor = conn.cursor()
+            for raw, parsed in self._pending.items():
+                cursor.execute("""
+                    INSERT INTO date_parse_cache (raw_text, parsed_date)
+                    VALUES (%s, %s)
+                    ON CONFLICT (raw_text) DO NOTHING
+                """, (raw, parsed))
+            conn.commit()
+            cursor.close()
+            self._pending.clear()
+        except Exception as e:
+            conn.rollback()
+            print(f"日付キャッシュ保存エラー: {e}")
+
+
+# -- 日付解決（ローカル → キャッシュ → LLM） --------------
+def resolve_date(candidates: list[str], cache: DateCache, stats: DateParseStats, llm_parse) -> str | None:
+    if not candidates:
+        stats.record("none")
+        return None
+
+    # 候補を優先順にローカルでパース
+    for raw in candidates:
+        parsed, method = parse_date_string(raw)
+        if parsed:
+            stats.record(method)
+            return parsed
+
+    # ローカルで解決できない場合、同じ文字列につきLLMは最大1回（変換中の文字列は結果を待つ）
+    raw = candidates[0].strip()
+    with cache.lock:
+        in_flight = cache.in_flight.get(raw)
+        if raw in cache or in_flight is not None:
+            stats.cache_hits += 1
+            stats.record("cache")
+            if in_flight is None:
+                return cache.get(raw)
+        else:
+            stats.llm_calls += 1
+            stats.record("llm")
+            cache.in_flight[raw] = threading.Event()
+    if in_flight is not None:
+        in_flight.wait()
+        with cache.lock:
+            return cache.get(raw)
+
+    # LLM呼び出しはロックの外で行う（他のワーカーの日付解決を止めない）
+    # 通信・APIのエラーはキャッシュせず、以降の記事・次回の実行で再試行する
+    parsed = None
+    answered = False
+    try:
+        parsed = llm_parse(raw)
+        answered = True
+        if parsed and not (ISO_DATE_PATTERN.fullmatch(parsed) and _to_iso(*map(int, parsed.split("-")))):
+            parsed = None
+    except Exception:
+        pass
+    finally:
+        with cache.lock:
+            if answered:
+                cache.put(raw, parsed)
+            else:
+                stats.llm_errors += 1
+            cache.in_flight.pop(raw).set()
+    return parsed
@@ -0,0 +1,177 @@
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+from feed_state import FeedState
+
+
+# -- フィードごとの取得間隔の設定 --------------
+@dataclass(frozen=True)
+class SchedulePolicy:
+    min_interval_seconds: float = 600.0          # 最短の取得間隔
+    max_interval_seconds: float = 6 * 3600.0     # 最長の取得間隔
+    initial_interval_seconds: float = 3600.0     # 履歴がない場合の取得間隔
+    target_new_entries: float = 5.0              # 1回の取得で見込む未確認エントリ数
+    max_fill_ratio: float = 0.5                  # フィードの掲載件数に対して未確認エントリが占める割合の上限
+    smoothing: float = 0.3                       # 公開ペースの指数移動平均の重み
+    quiet_growth: float = 1.5                    # 新着がない場合の間隔の伸び率
+    error_backoff: float = 2.0                   # 取得失敗時の間隔の伸び率
+
+
+def build_schedule_policy(schedule_config: dict | None, base: SchedulePolicy | None = None) -> SchedulePolicy:
+    """rss_feeds.yaml の schedule（全体・ソースごと）から生成"""
+    base = base or SchedulePolicy()
+    config = schedule_config or {}
+    return SchedulePolicy(
+        min_interval_seconds=float(config.get("min_interval_minutes", base.min_interval_seconds / 60)) * 60,
+        max_interval_seconds=float(config.get("max_interval_minutes", base.max_interval_seconds / 60)) * 60,
+        initial_interval_seconds=float(config.get("initial_interval_minutes", base.initial_interval_seconds / 60)) * 60,
+        target_new_entries=float(config.get("target_new_entries", base.target_new_entries)),
+        max_fill_ratio=float(config.get("max_fill_ratio", base.max_fill_ratio)),
+        smoothing=float(config.get("smoothing", base.smoothing)),
+        quiet_growth=float(config.get("quiet_growth", base.quiet_growth)),
+        error_backoff=float(config.get("error_backoff", base.error_backoff)),
+    )
+
+
+def _clamp(value: float, policy: SchedulePolicy) -> float:
+    return min(policy.max_interval_seconds, max(policy.min_interval_seconds, value))
+
+
+# -- 取得結果から公開ペースを学習し、次回の取得時刻を決める --------------
+def update_schedule(state: FeedState, policy: SchedulePolicy, now: float):
+    """
+    state.update() の後に呼ぶ。公開ペース（件/時）は前回取得からの未確認エントリ数の指数移動平均。
+    次回の間隔は「target_new_entries 件たまる時間」と「掲載件数の max_fill_ratio が埋まる時間」の短い方を
+    最短・最長の間隔に収めたもの。取得失敗時と新着がない場合は前回の間隔から上限まで伸ばす。
+    """
+    previous_interval = state.poll_interval_seconds or policy.initial_interval_seconds
+    elapsed = now - state.last_fetched_at if state.last_fetched_at is not None else None
+    state.last_fetched_at = now
+
+    if state.last_status is None or state.last_status >= 400:
+        state.consecutive_errors += 1
+        interval = _clamp(previous_interval * policy.error_backoff, policy)
+    else:
+        state.consecutive_errors = 0
+        new_entries = state.last_new_entry_count
+        # 初回（全エントリが未確認）は公開ペースの学習に使わない
+        if elapsed is not None and elapsed > 0:
+            observed_rate = new_entries / (elapsed / 3600)
+            # 掲載件数がすべて未確認なら取りこぼしがあるため、観測値は実際の下限
+            overflowed = state.last_entry_count > 0 and new_entries >= state.last_entry_count
+            if state.publish_rate is None or overflowed:
+                state.publish_rate = max(observed_rate, state.publish_rate or 0.0)
+            else:
+                state.publish_rate = policy.smoothing * observed_rate + (1 - policy.smoothing) * state.publish_rate
+
+        rate = state.publish_rate
+        if rate is None:
+            interval = _clamp(policy.initial_interval_seconds, policy)
+        elif new_entries == 0 and rate * previous_interval / 3600 < policy.target_new_entries:
+            interval = _clamp(previous_interval * policy.quiet_growth, policy)
+        elif rate <= 0:
+            interval = policy.max_interval_seconds
+        else:
+            interval = policy.target_new_entries / rate * 3600
+            if state.last_entry_count > 0:
+                interval = min(interval, state.last_entry_count * policy.max_fill_ratio / rate * 3600)
+            interval = _clamp(interval, policy)
+
+    state.poll_interval_seconds = interval
+    state.next_poll_at = now + interval
+
+
+def is_due(state: FeedState, now: float) -> bool:
+    return state.next_poll_at is None or state.next_poll_at <= now
+
+
+# -- 取得予定の優先度付きキュー（次回取得時刻の早い順） --------------
+class FeedQueue:
+    def __init__(self):
+        self._heap: list[tuple[float, str]] = []
+        self._due_at: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def push(self, feed_url: str, due_at: float):
+        # 再登録時は古いエントリを取り出し時に読み捨てる
+        self._due_at[feed_url] = due_at
+        heapq.heappush(self._heap, (due_at, feed_url))
+
+    def _discard_stale(self):
+        while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due_at(self) -> float | None:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[str]:
+        due = []
+        self._discard_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, feed_url = heapq.heappop(self._heap)
+            del self._due_at[feed_url]
+            due.append(feed_url)
+            self._discard_stale()
+        return due
+
+
+# -- 時計（シミュレーションでは仮想時計に差し替える） --------------
+class Clock(Protocol):
+    def now(self) -> float: ...
+
+    def sleep(self, seconds: float): ...
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+# -- 常駐モード（取得予定の早いフィードから順に、予定時刻まで待って取得） --------------
+def run_scheduler(queue: FeedQueue, poll: Callable[[list[str], float], dict[str, float]], clock: Clock,
+                  stop_at: float | None = None, max_sleep_seconds: float = 60.0,
+                  should_stop: Callable[[], bool] = lambda: False,
+                  retry_delay_seconds: float = 600.0, max_retry_delay_seconds: float = 3600.0) -> int:
+    """
+    poll(取得するフィードURL, 現在時刻) は取得したフィードの次回取得時刻を返す。
+    poll が例外を送出した場合（DB切断など）も終了せず、取得予定だったフィードを retry_delay_seconds 後
+    （連続失敗ごとに倍、max_retry_delay_seconds まで）に再登録する。結果にないフィードも同じ時刻に再登録する。
+    stop_at（時刻）を過ぎるか should_stop() が真になったら終了する。取得サイクル数を返す。
+    """
+    cycles = 0
+    consecutive_errors = 0
+    while not should_stop():
+        now = clock.now()
+        if stop_at is not None and now >= stop_at:
+            break
+
+        due = queue.pop_due(now)
+        if due:
+            try:
+                next_due = poll(due, now)
+                consecutive_errors = 0
+            except Exception as e:
+                consecutive_errors += 1
+                next_due = {}
+                print(f"取得サイクルのエラー（{consecutive_errors}回連続）: {e!r}")
+            retry_delay = min(max_retry_delay_seconds, retry_delay_seconds * 2 ** max(0, consecutive_errors - 1))
+            for feed_url in due:
+                queue.push(feed_url, next_due.get(feed_url, now + retry_delay))
+            cycles += 1
+            continue
+
+        # 次の予定時刻まで待つ（停止要求を確認するため最大 max_sleep_seconds 単位）
+        next_due_at = queue.next_due_at()
+        if next_due_at is None:
+            break
+        wake_at = next_due_at if stop_at is None else min(next_due_at, stop_at)
+        clock.sleep(min(max_sleep_seconds, max(0.0, wake_at - now)))
+    return cycles
@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+
+
+# 1フィードあたり保持する既読エントリIDの上限
+MAX_SEEN_ENTRY_IDS = 1000
+
+
+# -- フィード取得状態 --------------
+@dataclass
+class FeedState:
+    feed_url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    seen_entry_ids: list[str] = field(default_factory=list)
+    last_status: int | None = None
+    last_entry_count: int = 0
+    last_new_entry_count: int = 0
+    fetch_count: int = 0
+    not_modified_count: int = 0
+    # 取得スケジュール（feed_scheduler.py。時刻はUNIX時間）
+    last_fetched_at: float | None = None
+    publish_rate: float | None = None             # 公開ペース（件/時）
+    poll_interval_seconds: float | None = None
+    next_poll_at: float | None = None
+    consecutive_errors: int = 0
+
+    # 取得結果を反映
+    def update(self, status: int | None, etag: str | None, last_modified: str | None,
+               entry_ids: list[str], new_entry_count: int):
+        self.fetch_count += 1
+        self.last_status = status
+
+        if status == 304:
+            self.not_modified_count += 1
+            self.last_new_entry_count = 0
+            return
+
+        # 取得失敗時は前回のキャッシュ情報を維持
+        if status is None or status >= 400:
+            return
+
+        self.etag = etag
+        self.last_modified = last_modified
+        self.last_entry_count = len(entry_ids)
+        self.last_new_entry_count = new_entry_count
+        self.seen_entry_ids = list(dict.fromkeys(entry_ids))[:MAX_SEEN_ENTRY_IDS]
+
+    def forget(self, entry_ids: set[str]):
+        self.seen_entry_ids = [entry_id for entry_id in self.seen_entry_ids if entry_id not in entry_ids]
+
+
+# -- フィード状態の一括取得 --------------
+def load_feed_states(conn, feed_urls: list[str]) -> dict[str, FeedState]:
+    states = {url: FeedState(feed_url=url) for url in feed_urls}
+    if not feed_urls:
+        return states
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT feed_url, etag, last_modified, seen_entry_ids, last_status,
+               last_entry_count, last_new_entry_count, fetch_count, not_modified_count,
+               EXTRACT(EPOCH FROM last_fetched_at)::float8, publish_rate, poll_interval_seconds,
+               EXTRACT(EPOCH FROM next_poll_at)::float8, consecutive_errors
+        FROM feed_state
+        WHERE feed_url = ANY(%s)
+    """, (feed_urls,))
+    for row in cursor.fetchall():
+        states[row[0]] = FeedState(
+            feed_url=row[0],
+            etag=row[1],
+            last_modified=row[2],
+            seen_entry_ids=list(row[3] or []),
+            last_status=row[4],
+            last_entry_count=row[5] or 0,
+            last_new_entry_count=row[6] or 0,
+            fetch_count=row[7] or 0,
+            not_modified_count=row[8] or 0,
+            last_fetched_at=row[9],
+            publish_rate=row[10],
+            poll_interval_seconds=row[11],
+            next_poll_at=row[12],
+            consecutive_errors=row[13] or 0,
+        )
+    cursor.close()
+
+    return states
+
+
+# -- フィード状態の保存（時刻はUTCで保存） --------------
+def save_feed_states(conn, states: list[FeedState]):
+    try:
+        cursor = conn.cursor()
+        for state in states:
+            cursor.execute("""
+                INSERT INTO feed_state (
+                    feed_url, etag, last_modified, seen_entry_ids, last_status, last_fetched_at,
+                    last_entry_count, last_new_entry_count, fetch_count, not_modified_count,
+                    publish_rate, poll_interval_seconds, next_poll_at, consecutive_errors
+                )
+                VALUES (
+                    %s, %s, %s, %s, %s, COALESCE(to_timestamp(%s::float8) AT TIME ZONE 'UTC', CURRENT_TIMESTAMP),
+                    %s, %s, %s, %s, %s, %s, to_timestamp(%s::float8) AT TIME ZONE 'UTC', %s
+                )
+                ON CONFLICT (feed_url) DO UPDATE SET
+                    etag = EXCLUDED.etag,
+                    last_modified = EXCLUDED.last_modified,
+                    seen_entry_ids = EXCLUDED.seen_entry_ids,
+                    last_status = EXCLUDED.last_status,
+                    last_fetched_at = EXCLUDED.last_fetched_at,
+                    last_entry_count = EXCLUDED.last_entry_count,
+                    last_new_entry_count = EXCLUDED.last_new_entry_count,
+                    fetch_count = EXCLUDED.fetch_count,
+                    not_modified_count = EXCLUDED.not_modified_count,
+                    publish_rate = EXCLUDED.publish_rate,
+                    poll_interval_seconds = EXCLUDED.poll_interval_seconds,
+                    next_poll_at = EXCLUDED.next_poll_at,
+                    consecutive_errors = EXCLUDED.consecutive_errors
+            """, (
+                state.feed_url,
+                state.etag,
+                state.last_modified,
+                state.seen_entry_ids,
+                state.last_status,
+                state.last_fetched_at,
+                state.last_entry_count,
+                state.last_new_entry_count,
+                state.fetch_count,
+                state.not_modified_count,
+                state.publish_rate,
+                state.poll_interval_seconds,
+                state.next_poll_at,
+                state.consecutive_errors,
+            ))
+        conn.commit()
+        cursor.close()
+    except Exception as e:
+        conn.rollback()
+        print(f"フィード状態保存エラー: {e}")
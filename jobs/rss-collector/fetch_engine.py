@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, TypeVar
+from urllib.parse import urlparse
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# -- ホスト単位の取得設定 --------------
+@dataclass(frozen=True)
+class HostPolicy:
+    max_connections: int = 2
+    min_delay_seconds: float = 0.5
+
+
+# -- ホスト単位の同時接続数・リクエスト間隔の状態（FetchEngine の条件変数で保護） --------------
+class HostLimiter:
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.active = 0
+        self.next_request_at = 0.0
+
+    def ready(self, now: float) -> bool:
+        return self.active < max(1, self.policy.max_connections) and now >= self.next_request_at
+
+    def start(self, now: float):
+        # 前回リクエスト開始から min_delay_seconds 以上空ける
+        self.active += 1
+        self.next_request_at = now + self.policy.min_delay_seconds
+
+    def finish(self):
+        self.active -= 1
+
+
+# -- 並列取得エンジン --------------
+class FetchEngine:
+    """
+    ホストごとの待ち行列から、接続数・間隔の条件を満たしたホストの項目のみワーカーに渡す。
+    ワーカーは待機しないため、1つのホストの待ち時間が他のホストの取得を止めない。
+    """
+
+    def __init__(self, max_workers: int = 16, default_policy: HostPolicy | None = None):
+        self.max_workers = max(1, max_workers)
+        self.default_policy = default_policy or HostPolicy()
+        self._limiters: dict[str, HostLimiter] = {}
+        self._condition = threading.Condition()
+
+    def limiter_for(self, url: str, policy: HostPolicy | None = None) -> tuple[str, HostLimiter]:
+        host = urlparse(url).netloc.lower()
+        with self._condition:
+            # ホストごとの設定は最初に登録されたものを使用
+            if host not in self._limiters:
+                self._limiters[host] = HostLimiter(policy or self.default_policy)
+            return host, self._limiters[host]
+
+    def map_ordered(
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        url_of: Callable[[T], str],
+        policy_of: Callable[[T], HostPolicy | None] = lambda item: None,
+    ) -> Iterator[tuple[T, R]]:
+        """全件を並列実行し、結果は入力順に返す"""
+        items = list(items)
+        queues: dict[str, deque[int]] = {}
+        limiters: dict[str, HostLimiter] = {}
+        for index, item in enumerate(items):
+            host, limiter = self.limiter_for(url_of(item), policy_of(item))
+            queues.setdefault(host, deque()).append(index)
+            limiters[host] = limiter
+
+        futures: list[Future | None] = [None] * len(items)
+        submitted = [threading.Event() for _ in items]
+        state = {"running": 0, "stopped": False}
+
+        def on_done(limiter: HostLimiter):
+            def callback(_future: Future):
+                with self._condition:
+                    limiter.finish()
+                    state["running"] -= 1
+                    self._condition.notify_all()
+            return callback
+
+        def dispatch(executor: ThreadPoolExecutor):
+            with self._condition:
+                while queues and not state["stopped"]:
+                    now = time.monotonic()
+                    wake_at = None
+                    for host in list(queues):
+                        queue, limiter = queues[host], limiters[host]
+                        while queue and state["running"] < self.max_workers and limiter.ready(now):
+                            index = queue.popleft()
+                            limiter.start(now)
+                            state["running"] += 1
+                            future = executor.submit(fn, items[index])
+                            futures[index] = future
+                            future.add_done_callback(on_done(limiter))
+                            submitted[index].set()
+                        if not queue:
+                            del queues[host]
+                        elif limiter.next_request_at > now and (wake_at is None or limiter.next_request_at < wake_at):
+                            wake_at = limiter.next_request_at
+                    # 完了通知（接続数・ワーカー数の空き）または次に間隔が空くホストの時刻まで待つ
+                    if queues:
+                        self._condition.wait(None if wake_at is None else max(0.0, wake_at - now))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            dispatcher = threading.Thread(target=dispatch, args=(executor,), daemon=True)
+            dispatcher.start()
+            try:
+                for index, item in enumerate(items):
+                    submitted[index].wait()
+                    yield item, futures[index].result()
+            finally:
+                with self._condition:
+                    state["stopped"] = True
+                    self._condition.notify_all()
+                dispatcher.join()
+
+
+# -- YAML設定から生成 --------------
+def build_fetch_engine(fetch_config: dict, max_workers: int | None = None) -> FetchEngine:
+    default_policy = HostPolicy(
+        max_connections=int(fetch_config.get("per_host_connections", HostPolicy.max_connections)),
+        min_delay_seconds=float(fetch_config.get("min_delay_seconds", HostPolicy.min_delay_seconds)),
+    )
+    return FetchEngine(
+        max_workers=max_workers or int(fetch_config.get("max_workers", 16)),
+        default_policy=default_policy,
+    )
+
+
+def source_policy(engine: FetchEngine, source_config: dict) -> HostPolicy:
+    fetch_config = source_config.get("fetch") or {}
+    return HostPolicy(
+        max_connections=int(fetch_config.get("per_host_connections", engine.default_policy.max_connections)),
+        min_delay_seconds=float(fetch_config.get("min_delay_seconds", engine.default_policy.min_delay_seconds)),
+    )
@@ -1,16 +1,29 @@
+import argparse
 import os
-import re
+import signal
 import sys
+import time
 import yaml
-import feedparser
-import requests
 import psycopg2
-from bs4 import BeautifulSoup
 from datetime import datetime
-from dateutil import parser as dateparser
 from dotenv import load_dotenv
 from urllib.parse import urlparse
-from openai import OpenAI
+
+# 共通モジュール（jobs/common）を参照
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from common.db_writer import BatchWriter, article_insert_writer
+from common.http_client import HttpClient
+from common.instrumentation import InstrumentedConnection, finish_run, metrics, stage, start_run
+from common.llm_http import completion_content, completion_usage, get_chat_client
+from common.search_document import build_search_document
+from common.url_canonical import DEFAULT_URL_RULES, UrlRules, build_url_rules, canonicalize_url
+from date_extractor import DateCache, DateParseStats, resolve_date
+from feed_scheduler import (FeedQueue, SchedulePolicy, SystemClock, build_schedule_policy, is_due, run_scheduler,
+                            update_schedule)
+from feed_state import FeedState, load_feed_states, save_feed_states
+from fetch_engine import FetchEngine, build_fetch_engine, source_policy
+from page_fetcher import FetchStats, PageResult, fetch_feed, fetch_page
 
 
 # -- 環境変数読み込み --------------
@@ -22,15 +35,23 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL")
+FETCH_MAX_WORKERS = os.environ.get("FETCH_MAX_WORKERS")
+DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", "100"))
+DB_FLUSH_INTERVAL = float(os.environ.get("DB_FLUSH_INTERVAL", "5.0"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "2"))
+HTTP_MAX_BYTES = int(os.environ.get("HTTP_MAX_BYTES", str(3 * 1024 * 1024)))
+RSS_FEEDS_PATH = os.environ.get("RSS_FEEDS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rss_feeds.yaml"))
 
 
 # -- RSSフィード設定読み込み --------------
-def load_rss_feeds(yaml_path: str) -> dict:
+def load_rss_config(yaml_path: str) -> dict:
     with open(yaml_path, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-    return config.get("sources", {})
+        return yaml.safe_load(f) or {}
+
+
+def load_rss_feeds(yaml_path: str) -> dict:
+    return load_rss_config(yaml_path).get("sources", {})
 
 
 # -- PostgreSQL接続 --------------
@@ -40,212 +61,433 @@ def get_db_connection():
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASSWORD
+        password=DB_PASSWORD,
+        connection_factory=InstrumentedConnection
     )
 
 
-# -- 接続確認 --------------
-def connection_confirmation(url: str) -> tuple[bool, str]:
+# -- OpenAIで日付変換（ローカルで解決できない場合のみ。クライアントは初回の呼び出し時に作成） --------------
+def parse_date_with_llm(article_date: str) -> str | None:
     try:
-        response = requests.get(url, verify=True, timeout=10)
-        response.raise_for_status()
-        return True, ""
-    except requests.exceptions.RequestException as e:
-        return False, str(e)
+        client = get_chat_client(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        response = client.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": f"What is the date '{article_date}' in the 'yyyy-mm-dd' format? Please answer with only the results."}
+            ],
+            max_tokens=50,
+            temperature=0.5
+        )
+        metrics.record_llm_usage("gpt-4o-mini", *completion_usage(response))
+        formatted_date = (completion_content(response) or "").strip()
+        print(f"  OpenAIで日付変換: {article_date} -> {formatted_date}")
+        return formatted_date
+    except Exception as parse_error:
+        # 呼び出しの失敗は resolve_date に伝え、結果をキャッシュしない
+        print(f"  日付パースエラー: {parse_error}")
+        raise
 
 
 # -- 日付抽出 --------------
-def get_date(url: str) -> str | None:
-    try:
-        response = requests.get(url, verify=True, timeout=10)
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        article_date = None
-        formatted_date = None
-        date_pattern = r'\d{4}-\d{2}-\d{2}'
-
-        # <time>タグから取得
-        date_element = soup.find("time")
-        if date_element:
-            article_date = date_element.get_text()
-            print(f"  <time>要素: {article_date}")
-
-        # <meta>タグから取得
-        if not article_date:
-            meta_tags = soup.find_all("meta")
-            for tag in meta_tags:
-                if tag.get("property") == "article:modified_time":
-                    article_date = tag.get("content")
-                    break
-                elif tag.get("property") == "date":
-                    article_date = tag.get("content")
-                    break
-            if article_date:
-                print(f"  <meta>要素: {article_date}")
-
-        # 特定のクラス名やIDから取得
-        if not article_date:
-            possible_date_elements = soup.find_all(attrs={"class": re.compile(r"date|time|datetime|published|the-date|cal", re.I)})
-            for element in possible_date_elements:
-                article_date = element.get_text().strip()
-                if article_date:
-                    print(f"  特定のクラス名やIDから取得: {article_date}")
-                    break
-
-        # 日付要素がある場合の処理
-        if article_date:
-            # 'YYYY-MM-DD' 形式に一致する場合
-            if re.fullmatch(date_pattern, article_date):
-                formatted_date = article_date
-
-            # 'YYYY-MM-DD' 形式に一致しない場合、dateutilでパース
-            else:
-                try:
-                    # dateutilで日付をパース（英語表記に対応）
-                    parsed_date = dateparser.parse(article_date, fuzzy=True)
-                    if parsed_date:
-                        formatted_date = parsed_date.strftime("%Y-%m-%d")
-                        print(f"  日付要素をISO8601形式へ: {formatted_date}")
-                    else:
-                        # dateutilでもパースできない場合のみOpenAI APIを使用
-                        response = client.chat.completions.create(
-                            model="gpt-4o-mini",
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant."},
-                                {"role": "user", "content": f"What is the date '{article_date}' in the 'yyyy-mm-dd' format? Please answer with only the results."}
-                            ],
-                            max_tokens=50,
-                            temperature=0.5
-                        )
-                        formatted_date = response.choices[0].message.content.strip()
-                        print(f"  OpenAIで日付変換: {formatted_date}")
-                except Exception as parse_error:
-                    print(f"  日付パースエラー: {parse_error}")
-                    formatted_date = None
-
-        # ISO8601形式かチェック
-        if formatted_date and re.fullmatch(date_pattern, formatted_date):
-            print(f"  日付: {formatted_date}")
-            return formatted_date
-        else:
-            print(f"  日付情報なし")
-            return None
+def get_date(page: PageResult, date_cache: DateCache, date_stats: DateParseStats) -> str | None:
+    with stage("date.resolve"):
+        formatted_date = resolve_date(page.date_candidates, date_cache, date_stats, parse_date_with_llm)
+    if formatted_date:
+        print(f"  日付: {formatted_date}")
+    else:
+        print(f"  日付情報なし")
+    return formatted_date
+
+
+# -- 記事をデータベースに保存（バッファに追加し一括書き込み） --------------
+def save_article_to_db(writer: BatchWriter, article: dict):
+    search_title, _, search_content = build_search_document(article["title"], None, None, article.get("content"))
+    writer.add((
+        article["title"],
+        article["url"],
+        article["source"],
+        article.get("image_url"),
+        article.get("published_date"),
+        article.get("content"),
+        search_title,
+        search_content
+    ))
+
+
+# -- 既知URLの一括取得 --------------
+def load_known_urls(conn, urls: list[str]) -> set[str]:
+    if not urls:
+        return set()
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT url FROM articles WHERE url = ANY(%s)", (urls,))
+    known_urls = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    return known_urls
+
+
+# -- RSSフィードから記事候補を収集 --------------
+def collect_feed_entries(sources: dict, engine: FetchEngine, feed_states: dict[str, FeedState],
+                         url_rules: UrlRules = DEFAULT_URL_RULES, http_client: HttpClient | None = None) -> list[dict]:
+    feeds = []
+    for source_name, source_config in sources.items():
+        policy = source_policy(engine, source_config)
+        rules = build_url_rules(source_config.get("url_rules"), base=url_rules)
+        for feed_config in source_config.get("feeds", []):
+            feeds.append({
+                "source": source_name,
+                "url": feed_config.get("url"),
+                "category": feed_config.get("category", "unknown"),
+                "policy": policy,
+                "url_rules": rules,
+            })
+
+    # 前回のETag/Last-Modifiedで条件付きGET
+    def parse_feed(feed_info: dict):
+        state = feed_states[feed_info["url"]]
+        return fetch_feed(feed_info["url"], state.etag, state.last_modified, http_client)
+
+    # フィードを並列取得（結果は設定順）
+    entries = []
+    parsed_feeds = engine.map_ordered(
+        parse_feed,
+        feeds,
+        url_of=lambda feed: feed["url"],
+        policy_of=lambda feed: feed["policy"],
+    )
+    for feed_info, feed in parsed_feeds:
+        print(f"\n処理中: {feed_info['source']} - {feed_info['url']}")
+
+        state = feed_states[feed_info["url"]]
+        status = feed.get("status")
+
+        # 304 Not Modified: エントリの走査を省略
+        if status == 304:
+            state.update(status, None, None, [], 0)
+            print(f"  変更なし (304)")
+            continue
+
+        seen_entry_ids = set(state.seen_entry_ids)
+        entry_ids = []
+        new_count = 0
+        for entry in feed.entries:
+            article_url = entry.get("link")
+            if not article_url:
+                continue
+
+            entry_id = entry.get("id") or article_url
+            entry_ids.append(entry_id)
+
+            # 前回までに確認済みのエントリはスキップ
+            if entry_id in seen_entry_ids:
+                continue
+
+            # 重複判定・保存は正規化したURL、取得はフィードのリンクで行う
+            new_count += 1
+            entries.append({
+                "title": entry.get("title", "No Title"),
+                "url": canonicalize_url(article_url, feed_info["url_rules"]),
+                "fetch_url": article_url,
+                "url_rules": feed_info["url_rules"],
+                "source": feed_info["source"],
+                "category": feed_info["category"],
+                "policy": feed_info["policy"],
+                "feed_url": feed_info["url"],
+                "entry_id": entry_id,
+            })
+
+        state.update(status, feed.get("etag"), feed.get("modified"), entry_ids, new_count)
+        print(f"  記事候補: {len(feed.entries)}件 (未確認{new_count}件)")
+
+    return entries
+
+
+# -- 既知URLの除外 --------------
+def filter_new_entries(conn, entries: list[dict]) -> list[dict]:
+    candidate_urls = list(dict.fromkeys(entry["url"] for entry in entries))
+
+    # 正規化前のURLで保存された既存記事も既知として扱う
+    raw_urls = [entry["fetch_url"] for entry in entries if entry["fetch_url"] != entry["url"]]
+    known_urls = load_known_urls(conn, list(dict.fromkeys(candidate_urls + raw_urls)))
+
+    # 既知URLと、同一実行内で重複するURLを除外
+    new_entries = []
+    seen_urls = set(known_urls)
+    for entry in entries:
+        if entry["url"] in seen_urls or entry["fetch_url"] in known_urls:
+            continue
+        seen_urls.add(entry["url"])
+        new_entries.append(entry)
+
+    known_count = len(candidate_urls) - len({entry["url"] for entry in new_entries})
+    hit_ratio = known_count / len(candidate_urls) if candidate_urls else 0.0
+    print(
+        f"\n既知URLフィルタ: 候補{len(entries)}件 (ユニーク{len(candidate_urls)}件, "
+        f"フィード間・URL正規化による重複{len(entries) - len(candidate_urls)}件), "
+        f"既知{known_count}件, 新規{len(new_entries)}件, ヒット率{hit_ratio:.1%}"
+    )
 
-    except Exception as e:
-        print(f"  日付取得エラー: {e}")
-        return None
+    return new_entries
 
 
-# -- トップ画像URL取得 --------------
-def get_image_url(url: str) -> str | None:
+# -- 記事1件の取得・抽出 --------------
+def build_article(entry: dict, fetch_stats: FetchStats, date_cache: DateCache, date_stats: DateParseStats,
+                  http_client: HttpClient | None = None) -> dict | None:
+    article_url = entry["url"]
+    article_title = entry["title"]
+
     try:
-        response = requests.get(url, verify=True, timeout=10)
-        soup = BeautifulSoup(response.content, "html.parser")
+        # 記事ページ取得（接続確認・日付候補・画像URLを1回の取得で抽出）
+        page = fetch_page(entry["fetch_url"], fetch_stats, http_client)
+        if not page.ok:
+            print(f"  接続エラー: {entry['fetch_url']}: {page.error}")
+            return None
 
-        # og:image メタタグから取得
-        og_image = soup.find("meta", property="og:image")
-        if og_image and og_image.get("content"):
-            return og_image["content"]
-    except Exception as e:
-        print(f"  画像URL取得エラー: {e}")
+        # rel=canonical・リダイレクト先があればそれを正規化して保存URLにする
+        resolved_url = canonicalize_url(page.canonical_url or page.final_url or article_url, entry["url_rules"])
+        if resolved_url != article_url:
+            print(f"  正規URL: {resolved_url}")
+            article_url = resolved_url
 
-    return None
+        # 日付取得
+        published_date = get_date(page, date_cache, date_stats)
 
+        # 画像URL取得
+        image_url = page.image_url
 
-# -- 記事をデータベースに保存 --------------
-def save_article_to_db(conn, article: dict):
-    try:
-        cursor = conn.cursor()
-        query = """
-            INSERT INTO articles (title, url, source, image_url, published_date)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (url) DO NOTHING
-        """
-        cursor.execute(query, (
-            article["title"],
-            article["url"],
-            article["source"],
-            article.get("image_url"),
-            article.get("published_date")
-        ))
-        conn.commit()
-        cursor.close()
-        print(f"  保存成功: {article['title'][:50]}...")
+        # 本文（Metadata Generatorで再取得しないよう保存）
+        content = page.text
     except Exception as e:
-        conn.rollback()
-        print(f"  保存エラー: {e}")
+        print(f"  記事処理エラー: {article_url}: {e}")
+        return None
 
+    # 記事データ作成（出典はYAMLのsource_nameを使用）
+    return {
+        "title": article_title,
+        "url": article_url,
+        "source": entry["source"],
+        "image_url": image_url,
+        "published_date": published_date,
+        "content": content
+    }
+
+
+# -- 共有HTTPクライアント（並列数に合わせてホストごとの接続プールを確保） --------------
+def build_http_client(engine: FetchEngine) -> HttpClient:
+    return HttpClient(
+        pool_maxsize=engine.max_workers,
+        max_retries=HTTP_MAX_RETRIES,
+        max_bytes=HTTP_MAX_BYTES,
+        hooks=[metrics.record_http],
+    )
 
-# -- RSSフィード処理 --------------
-def process_rss_feeds(sources: dict, conn):
-    article_count = 0
 
+# -- 指定したフィードのみのソース設定 --------------
+def filter_sources(sources: dict, feed_urls: set[str]) -> dict:
+    filtered = {}
     for source_name, source_config in sources.items():
-        feeds = source_config.get("feeds", [])
-
-        for feed_config in feeds:
-            feed_url = feed_config.get("url")
-            category = feed_config.get("category", "unknown")
-
-            print(f"\n処理中: {source_name} - {feed_url}")
-
-            # RSSフィードをパース
-            feed = feedparser.parse(feed_url)
-
-            for entry in feed.entries:
-                article_url = entry.get("link")
-                article_title = entry.get("title", "No Title")
-
-                if not article_url:
-                    continue
-
-                print(f"\n記事: {article_title}")
-
-                # 接続確認
-                is_connected, error_msg = connection_confirmation(article_url)
-                if not is_connected:
-                    print(f"  接続エラー: {error_msg}")
-                    continue
+        feeds = [feed for feed in source_config.get("feeds", []) if feed.get("url") in feed_urls]
+        if feeds:
+            filtered[source_name] = {**source_config, "feeds": feeds}
+    return filtered
+
+
+def feed_schedule_policies(sources: dict, schedule_policy: SchedulePolicy) -> dict[str, SchedulePolicy]:
+    """フィードURLごとの取得間隔の設定（ソースごとの schedule で上書き）"""
+    policies = {}
+    for source_config in sources.values():
+        policy = build_schedule_policy(source_config.get("schedule"), base=schedule_policy)
+        for feed in source_config.get("feeds", []):
+            policies[feed.get("url")] = policy
+    return policies
+
+
+# -- RSSフィード処理（due_only: 取得予定時刻を過ぎたフィードのみ） --------------
+def process_rss_feeds(sources: dict, conn, engine: FetchEngine | None = None,
+                      url_rules: UrlRules = DEFAULT_URL_RULES, http_client: HttpClient | None = None,
+                      schedule_policy: SchedulePolicy | None = None, due_only: bool = False,
+                      now: float | None = None) -> int:
+    article_count = 0
+    fetch_stats = FetchStats()
+    date_stats = DateParseStats()
+    engine = engine or FetchEngine()
+    http_client = http_client or build_http_client(engine)
+    schedule_policies = feed_schedule_policies(sources, schedule_policy or SchedulePolicy())
+    now = time.time() if now is None else now
+    started_at = time.monotonic()
+
+    # フィード状態（ETag/Last-Modified/既読エントリ/取得スケジュール）を読み込み
+    feed_urls = [feed.get("url") for config in sources.values() for feed in config.get("feeds", [])]
+    feed_states = load_feed_states(conn, feed_urls)
+    if due_only:
+        feed_states = {url: state for url, state in feed_states.items() if is_due(state, now)}
+        print(f"取得予定のフィード: {len(feed_urls)}件中 {len(feed_states)}件")
+        if not feed_states:
+            return 0
+        sources = filter_sources(sources, set(feed_states))
+    date_cache = DateCache.load(conn)
+
+    # 全フィードの記事候補を収集し、既知URLをネットワーク処理前に除外
+    with stage("collect_feeds", log=True):
+        entries = collect_feed_entries(sources, engine, feed_states, url_rules, http_client)
+    with stage("filter_known_urls", log=True):
+        new_entries = filter_new_entries(conn, entries)
+    failed_entry_ids: dict[str, set[str]] = {}
+    saved_entries: dict[str, dict] = {}
+
+    # 記事ページを並列取得し、入力順にDBへ受け渡す（記事ごとの所要時間を計測）
+    def fetch_article(entry: dict) -> dict | None:
+        with stage("article"):
+            return build_article(entry, fetch_stats, date_cache, date_stats, http_client)
+
+    results = engine.map_ordered(
+        fetch_article,
+        new_entries,
+        url_of=lambda entry: entry["fetch_url"],
+        policy_of=lambda entry: entry["policy"],
+    )
+    with stage("fetch_articles", log=True), article_insert_writer(conn, DB_BATCH_SIZE, DB_FLUSH_INTERVAL) as writer:
+        for entry, article in results:
+            print(f"\n記事: {entry['title']}")
+            if article is None:
+                # 取得失敗したエントリは次回再試行する
+                failed_entry_ids.setdefault(entry["feed_url"], set()).add(entry["entry_id"])
+                continue
+
+            # データベースに保存
+            save_article_to_db(writer, article)
+            saved_entries[article["url"]] = entry
+            article_count += 1
+
+    # 保存に失敗した記事のエントリも次回再試行する
+    for row in writer.failed_rows:
+        entry = saved_entries[row[1]]
+        failed_entry_ids.setdefault(entry["feed_url"], set()).add(entry["entry_id"])
+    article_count -= len(writer.failed_rows)
+
+    # 日付キャッシュ・フィード状態を保存
+    date_cache.save(conn)
+    for feed_url, entry_ids in failed_entry_ids.items():
+        feed_states[feed_url].forget(entry_ids)
+    for feed_url, state in feed_states.items():
+        update_schedule(state, schedule_policies[feed_url], now)
+    save_feed_states(conn, list(feed_states.values()))
+    not_modified = sum(1 for state in feed_states.values() if state.last_status == 304)
+    print(f"\nフィード: {len(feed_states)}件中 {not_modified}件が変更なし (304)")
+
+    elapsed = time.monotonic() - started_at
+    print(f"\n\n処理完了: {article_count}件の記事を処理 ({elapsed:.1f}秒, 並列数{engine.max_workers})")
+    print(f"DB保存: {writer.stats.summary()}")
+    print(fetch_stats.summary())
+    print(http_client.stats.summary())
+    print(date_stats.summary())
+
+    duplicated = fetch_stats.duplicated_urls()
+    if duplicated:
+        print(f"警告: 複数回取得されたURL {len(duplicated)}件")
+
+    return article_count
+
+
+# -- 常駐モード（取得予定時刻の早いフィードから順に取得） --------------
+def run_daemon(sources: dict, conn, engine: FetchEngine, url_rules: UrlRules, http_client: HttpClient,
+               schedule_policy: SchedulePolicy, max_runtime_minutes: float | None = None) -> int:
+    clock = SystemClock()
+    stop_at = clock.now() + max_runtime_minutes * 60 if max_runtime_minutes else None
+    article_count = 0
 
-                # 日付取得
-                published_date = get_date(article_url)
+    # SIGTERM（Cloud Run のタスク終了）で現在のサイクル終了後に停止
+    stop_requested = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.append(signum))
+
+    original_conn = conn
+    queue = FeedQueue()
+    feed_urls = [feed.get("url") for config in sources.values() for feed in config.get("feeds", [])]
+    for feed_url, state in load_feed_states(conn, feed_urls).items():
+        queue.push(feed_url, state.next_poll_at or clock.now())
+
+    def poll(due: list[str], now: float) -> dict[str, float]:
+        nonlocal article_count, conn
+        # 前のサイクルで接続が切れていれば再接続
+        if conn.closed:
+            print("データベース再接続")
+            conn = get_db_connection()
+        print(f"\n=== {len(due)}件のフィードを取得 ===")
+        try:
+            article_count += process_rss_feeds(filter_sources(sources, set(due)), conn, engine, url_rules,
+                                               http_client, schedule_policy, now=now)
+            # 状態の保存に失敗した場合も同じフィードを繰り返し取得しないよう最短間隔を空ける
+            earliest = now + schedule_policy.min_interval_seconds
+            states = load_feed_states(conn, due)
+        except Exception:
+            # 中断したトランザクションを破棄し、次のサイクルで同じ接続を使えるようにする（失敗分は run_scheduler が再登録）
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+            raise
+        return {url: max(state.next_poll_at or earliest, earliest) for url, state in states.items()}
 
-                # 画像URL取得
-                image_url = get_image_url(article_url)
+    try:
+        cycles = run_scheduler(queue, poll, clock, stop_at=stop_at, should_stop=lambda: bool(stop_requested),
+                               retry_delay_seconds=schedule_policy.min_interval_seconds,
+                               max_retry_delay_seconds=schedule_policy.max_interval_seconds)
+    finally:
+        # 再接続した接続を閉じる（元の接続は呼び出し元で閉じる）
+        if conn is not original_conn:
+            conn.close()
+    print(f"\n常駐モード終了: {cycles}サイクル, {article_count}件の記事を処理")
+    return article_count
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="RSSフィードの収集")
+    arg_parser.add_argument("--all", action="store_true",
+                            help="取得予定時刻に関係なく全フィードを取得する")
+    arg_parser.add_argument("--daemon", action="store_true",
+                            help="常駐し、フィードごとの取得予定時刻に取得する")
+    arg_parser.add_argument("--max-runtime", type=float, default=None,
+                            help="--daemon 指定時の最大実行時間（分）")
+    return arg_parser.parse_args()
 
-                # 記事データ作成（出典はYAMLのsource_nameを使用）
-                article = {
-                    "title": article_title,
-                    "url": article_url,
-                    "source": source_name,
-                    "image_url": image_url,
-                    "published_date": published_date
-                }
 
-                # データベースに保存
-                save_article_to_db(conn, article)
-                article_count += 1
+# -- メイン処理 --------------
+def main():
+    args = parse_args()
+    print("RSS Collector 開始" + ("（常駐モード）" if args.daemon else ""))
+    start_run("rss-collector")
 
-    print(f"\n\n処理完了: {article_count}件の記事を処理")
+    # RSSフィード設定読み込み（RSS_FEEDS_PATHで別の設定ファイルを指定可能）
+    rss_config = load_rss_config(RSS_FEEDS_PATH)
+    sources = rss_config.get("sources", {})
 
+    # 並列取得エンジン（FETCH_MAX_WORKERSで並列数を上書き可能）
+    max_workers = int(FETCH_MAX_WORKERS) if FETCH_MAX_WORKERS else None
+    engine = build_fetch_engine(rss_config.get("fetch") or {}, max_workers)
 
-# -- メイン処理 --------------
-def main():
-    print("RSS Collector 開始")
+    # URL正規化ルール（全体の設定。ソースごとの url_rules で上書き可能）
+    url_rules = build_url_rules(rss_config.get("url_rules"))
 
-    # RSSフィード設定読み込み
-    rss_feeds_path = os.path.join(os.path.dirname(__file__), "rss_feeds.yaml")
-    sources = load_rss_feeds(rss_feeds_path)
+    # 取得間隔の設定（全体の設定。ソースごとの schedule で上書き可能）
+    schedule_policy = build_schedule_policy(rss_config.get("schedule"))
 
     # DB接続
     conn = get_db_connection()
     print("データベース接続成功")
 
-    # RSSフィード処理
-    process_rss_feeds(sources, conn)
+    # RSSフィード処理（既定は取得予定時刻を過ぎたフィードのみ）
+    http_client = build_http_client(engine)
+    if args.daemon:
+        article_count = run_daemon(sources, conn, engine, url_rules, http_client, schedule_policy, args.max_runtime)
+    else:
+        article_count = process_rss_feeds(sources, conn, engine, url_rules, http_client,
+                                          schedule_policy, due_only=not args.all)
+    http_client.close()
 
     # DB接続クローズ
     conn.close()
+    finish_run(articles=article_count)
     print("\nRSS Collector 完了")
 
 
@@ -0,0 +1,151 @@
+import threading
+import feedparser
+import requests
+from collections import Counter
+from dataclasses import dataclass, field
+from bs4 import BeautifulSoup
+from common.article_text import extract_article_text
+from common.http_client import HTML_CONTENT_TYPES, HttpClient, get_http_client
+from common.instrumentation import stage
+from common.url_canonical import resolve_canonical_link
+from date_extractor import extract_date_candidates
+
+
+# -- 取得結果 --------------
+@dataclass
+class PageResult:
+    url: str
+    ok: bool
+    error: str = ""
+    status_code: int | None = None
+    date_candidates: list[str] = field(default_factory=list)
+    image_url: str | None = None
+    text: str | None = None
+    final_url: str | None = None        # リダイレクト後のURL
+    canonical_url: str | None = None    # <link rel="canonical">
+
+
+# -- 取得カウンタ --------------
+@dataclass
+class FetchStats:
+    downloads: Counter = field(default_factory=Counter)
+    parses: Counter = field(default_factory=Counter)
+    bytes_downloaded: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_download(self, url: str):
+        with self._lock:
+            self.downloads[url] += 1
+
+    def record_bytes(self, size: int):
+        with self._lock:
+            self.bytes_downloaded += size
+
+    def record_parse(self, url: str):
+        with self._lock:
+            self.parses[url] += 1
+
+    @property
+    def total_downloads(self) -> int:
+        return sum(self.downloads.values())
+
+    @property
+    def total_parses(self) -> int:
+        return sum(self.parses.values())
+
+    def duplicated_urls(self) -> list[str]:
+        return [url for url, count in self.downloads.items() if count > 1]
+
+    def summary(self) -> str:
+        return (
+            f"ページ取得: {self.total_downloads}回 / {len(self.downloads)}URL, "
+            f"HTMLパース: {self.total_parses}回, "
+            f"重複取得URL: {len(self.duplicated_urls())}件, "
+            f"受信: {self.bytes_downloaded / 1024:.1f}KB"
+        )
+
+
+# -- トップ画像URL抽出 --------------
+def extract_image_url(soup: BeautifulSoup) -> str | None:
+    og_image = soup.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        return og_image["content"]
+    return None
+
+
+# -- 正規URL（<link rel="canonical">）抽出 --------------
+def extract_canonical_href(soup: BeautifulSoup) -> str | None:
+    for link in soup.find_all("link", href=True):
+        rel = link.get("rel") or []
+        if "canonical" in [value.lower() for value in rel]:
+            return link["href"]
+    return None
+
+
+# -- 記事ページ取得（1回のGETと1回のパース） --------------
+def fetch_page(url: str, stats: FetchStats, client: HttpClient | None = None) -> PageResult:
+    """HTML以外（PDF・画像など）は本文を読まずにエラーとして返す"""
+    client = client or get_http_client()
+    stats.record_download(url)
+    try:
+        with stage("page.download"):
+            response = client.get(url, allowed_content_types=HTML_CONTENT_TYPES)
+        stats.record_bytes(len(response.content))
+    except requests.exceptions.RequestException as e:
+        status_code = e.response.status_code if e.response is not None else None
+        return PageResult(url=url, ok=False, error=str(e), status_code=status_code)
+
+    result = PageResult(url=url, ok=True, status_code=response.status_code, final_url=response.url)
+    try:
+        with stage("page.parse"):
+            soup = BeautifulSoup(response.content, "html.parser")
+        stats.record_parse(url)
+        with stage("page.date_candidates"):
+            result.date_candidates = extract_date_candidates(soup)
+        with stage("page.image"):
+            result.image_url = extract_image_url(soup)
+        result.canonical_url = resolve_canonical_link(response.url, extract_canonical_href(soup))
+        with stage("page.article_text"):
+            result.text = extract_article_text(soup) or None
+    except Exception as e:
+        print(f"  HTML解析エラー: {e}")
+
+    return result
+
+
+# -- RSSフィード取得（条件付きGET） --------------
+def fetch_feed(url: str, etag: str | None, last_modified: str | None,
+               client: HttpClient | None = None) -> feedparser.FeedParserDict:
+    """
+    共有クライアントで取得して feedparser で解析する。
+    戻り値の status / etag / modified は feedparser.parse(url) と同じ意味で設定する。
+    """
+    client = client or get_http_client()
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    try:
+        # フィードの Content-Type はサイトによって text/html なども返るため判定しない
+        with stage("feed.download"):
+            response = client.get(url, headers=headers, allowed_content_types=None)
+    except requests.exceptions.RequestException as e:
+        feed = feedparser.FeedParserDict(entries=[], bozo=1, bozo_exception=e)
+        if e.response is not None:
+            feed["status"] = e.response.status_code
+        return feed
+
+    if response.status_code == 304:
+        feed = feedparser.FeedParserDict(entries=[], bozo=0)
+    else:
+        with stage("feed.parse"):
+            feed = feedparser.parse(response.content, response_headers=response.headers)
+    feed["status"] = response.status_code
+    feed["href"] = response.url
+    if response.headers.get("ETag"):
+        feed["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        feed["modified"] = response.headers["Last-Modified"]
+    return feed
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+古い記事の本文を圧縮して退避するスクリプト
+
+メタデータ生成済み（関連度判定で対象外にした記事を含む）で作成から --older-than-days 日を過ぎた記事の本文（articles.content）を
+zstd で圧縮して article_content_archive に移し、articles.content を NULL にして content_archived_at を設定する。
+候補はサーバーサイドカーソルで読み出し（読み込み用の接続）、--batch-size 件ごとに別の接続で退避してコミットする。
+Metadata Generator は退避した本文を必要な時に展開して使用する（jobs/common/content_archive.py）。
+"""
+import argparse
+import os
+import sys
+import time
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+# 共通モジュール（jobs/common）を参照
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_DIR, "..", "..", "jobs"))
+
+from common.content_archive import CODEC, DEFAULT_LEVEL, compress_content, content_md5, decompress_content
+
+# 環境変数読み込み
+load_dotenv()
+
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_NAME = os.environ.get("DB_NAME")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+
+
+def get_db_connection():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+
+# -- 退避対象（pg_column_size は TOAST 圧縮後の保存サイズ） --------------
+CANDIDATES_QUERY = """
+    SELECT id, content, pg_column_size(content)
+    FROM articles
+    WHERE (metadata_generated = TRUE OR metadata_skipped_at IS NOT NULL)
+      AND content IS NOT NULL AND content <> ''
+      AND created_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+    ORDER BY id
+"""
+
+# 読み込み後に本文が更新された記事（md5 不一致）は退避しない
+ARCHIVE_QUERY = f"""
+    WITH input(article_id, content_md5, original_bytes, content_zstd) AS (VALUES %s),
+    archived AS (
+        UPDATE articles AS a
+        SET content = NULL, content_archived_at = CURRENT_TIMESTAMP
+        FROM input AS i
+        WHERE a.id = i.article_id AND md5(a.content) = i.content_md5
+        RETURNING a.id
+    )
+    INSERT INTO article_content_archive (article_id, codec, content_zstd, original_bytes, compressed_bytes)
+    SELECT i.article_id, '{CODEC}', i.content_zstd, i.original_bytes, octet_length(i.content_zstd)
+    FROM input AS i
+    JOIN archived ON archived.id = i.article_id
+    ON CONFLICT (article_id) DO UPDATE
+    SET codec = EXCLUDED.codec, content_zstd = EXCLUDED.content_zstd, original_bytes = EXCLUDED.original_bytes,
+        compressed_bytes = EXCLUDED.compressed_bytes, archived_at = CURRENT_TIMESTAMP
+    RETURNING article_id
+"""
+
+
+def table_bytes(conn) -> dict[str, int]:
+    """articles と article_content_archive の合計サイズ（TOAST・インデックスを含む）"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT relname, pg_total_relation_size(oid)
+        FROM pg_class
+        WHERE relname IN ('articles', 'article_content_archive') AND relkind = 'r'
+    """)
+    sizes = dict(cursor.fetchall())
+    conn.commit()
+    cursor.close()
+    return sizes
+
+
+def archive_chunk(conn, rows: list[tuple]) -> set[str]:
+    """(id, md5, 圧縮前バイト数, 圧縮本文) を退避し、退避した記事IDを返す"""
+    try:
+        cursor = conn.cursor()
+        archived = execute_values(cursor, ARCHIVE_QUERY, rows, template="(%s::uuid, %s, %s, %s::bytea)",
+                                  page_size=len(rows), fetch=True)
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+    return {str(row[0]) for row in archived}
+
+
+# -- 退避した本文を articles.content に戻す --------------
+def restore_all(conn, batch_size: int, dry_run: bool) -> int:
+    restored = 0
+    after_id = None
+    while True:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT article_id, content_zstd
+            FROM article_content_archive
+            WHERE %s::uuid IS NULL OR article_id > %s::uuid
+            ORDER BY article_id
+            LIMIT %s
+        """, (after_id, after_id, batch_size))
+        rows = [(str(article_id), decompress_content(data)) for article_id, data in cursor.fetchall()]
+        if not rows:
+            cursor.close()
+            break
+        after_id = rows[-1][0]
+
+        if dry_run:
+            conn.rollback()
+        else:
+            try:
+                execute_values(cursor, """
+                    WITH input(article_id, content) AS (VALUES %s),
+                    restored AS (
+                        UPDATE articles AS a
+                        SET content = i.content, content_archived_at = NULL
+                        FROM input AS i
+                        WHERE a.id = i.article_id
+                        RETURNING a.id
+                    )
+                    DELETE FROM article_content_archive AS c
+                    USING restored
+                    WHERE c.article_id = restored.id
+                """, rows, template="(%s::uuid, %s)", page_size=len(rows))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        cursor.close()
+        restored += len(rows)
+        print(f"  {restored}件復元 (最終id: {after_id})")
+    return restored
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="古い記事の本文の圧縮退避")
+    arg_parser.add_argument("--older-than-days", type=int, default=180, help="作成からこの日数を過ぎた記事を対象にする")
+    arg_parser.add_argument("--batch-size", type=int, default=500)
+    arg_parser.add_argument("--level", type=int, default=DEFAULT_LEVEL, help="zstd の圧縮レベル")
+    arg_parser.add_argument("--limit", type=int, default=None, help="退避する最大件数")
+    arg_parser.add_argument("--sleep", type=float, default=0.0, help="バッチ間の待ち時間（秒。DB負荷の調整用）")
+    arg_parser.add_argument("--restore", action="store_true", help="退避した本文をすべて articles に戻す")
+    arg_parser.add_argument("--dry-run", action="store_true", help="圧縮して削減量を表示するのみでDBは変更しない")
+    args = arg_parser.parse_args()
+
+    print("本文退避スクリプト開始")
+    print("=" * 50)
+
+    # DB接続（読み込み用のサーバーサイドカーソルと書き込みで接続を分ける）
+    reader = get_db_connection()
+    writer = get_db_connection()
+    print("✓ データベース接続成功")
+
+    if args.restore:
+        restored = restore_all(writer, args.batch_size, args.dry_run)
+        mode = "（dry-run。変更なし）" if args.dry_run else ""
+        print(f"\n✓ {restored}件の本文を復元しました{mode}")
+        reader.close()
+        writer.close()
+        return
+
+    sizes_before = table_bytes(writer)
+
+    reader.set_session(readonly=True)
+    cursor = reader.cursor(name="archive_candidates")
+    cursor.itersize = args.batch_size
+    cursor.execute(CANDIDATES_QUERY, (args.older_than_days,))
+
+    scanned = archived = skipped = 0
+    original_bytes = stored_bytes = compressed_bytes = 0
+    compress_seconds = write_seconds = 0.0
+    started_at = time.perf_counter()
+    while args.limit is None or scanned < args.limit:
+        size = args.batch_size if args.limit is None else min(args.batch_size, args.limit - scanned)
+        rows = cursor.fetchmany(size)
+        if not rows:
+            break
+        scanned += len(rows)
+
+        chunk_started_at = time.perf_counter()
+        chunk, sizes = [], {}
+        for article_id, content, stored_size in rows:
+            encoded_size = len(content.encode("utf-8"))
+            compressed = compress_content(content, args.level)
+            chunk.append((str(article_id), content_md5(content), encoded_size, psycopg2.Binary(compressed)))
+            sizes[str(article_id)] = (encoded_size, stored_size, len(compressed))
+        compress_seconds += time.perf_counter() - chunk_started_at
+
+        chunk_started_at = time.perf_counter()
+        done = set(sizes) if args.dry_run else archive_chunk(writer, chunk)
+        write_seconds += time.perf_counter() - chunk_started_at
+
+        archived += len(done)
+        skipped += len(rows) - len(done)
+        for article_id in done:
+            encoded_size, stored_size, compressed_size = sizes[article_id]
+            original_bytes += encoded_size
+            stored_bytes += stored_size
+            compressed_bytes += compressed_size
+        print(f"  {archived}件退避 (最終id: {rows[-1][0]})")
+        if args.sleep:
+            time.sleep(args.sleep)
+    elapsed = time.perf_counter() - started_at
+
+    cursor.close()
+    reader.rollback()
+    sizes_after = table_bytes(writer)
+
+    mode = "（dry-run。変更なし）" if args.dry_run else ""
+    per_10k = elapsed / scanned * 10000 if scanned else 0.0
+    print(f"\n✓ {archived}件の本文を退避しました{mode}（更新されていたため対象外: {skipped}件）")
+    print(f"✓ 本文 {original_bytes / 1e6:.1f}MB (保存サイズ {stored_bytes / 1e6:.1f}MB) → "
+          f"zstd {compressed_bytes / 1e6:.1f}MB, 削減 {(stored_bytes - compressed_bytes) / 1e6:.1f}MB")
+    print(f"✓ {elapsed:.1f}秒 (1万件あたり {per_10k:.1f}秒。圧縮 {compress_seconds:.1f}秒, DB更新 {write_seconds:.1f}秒)")
+    for table in ("articles", "article_content_archive"):
+        before, after = sizes_before.get(table, 0), sizes_after.get(table, 0)
+        print(f"  {table}: {before / 1e6:.1f}MB → {after / 1e6:.1f}MB")
+    if archived and not args.dry_run:
+        print("  ※ 退避前の本文の領域は VACUUM 後に再利用される（ディスクを縮小する場合は VACUUM FULL articles）")
+
+    # DB接続クローズ
+    reader.close()
+    writer.close()
+    print("\n本文退避スクリプト完了")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+既存記事の全文検索用の文書（articles.search_tsv）を作成するスクリプト
+
+Metadata Generator と同じ分割規則（jobs/common/search_document.py）を使用する。
+id順にバッチ単位で処理し、バッチごとにコミットする。既定では search_tsv が未作成の記事のみ処理するため、
+途中で停止しても再実行で続きから処理できる。
+"""
+import argparse
+import os
+import sys
+import time
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+# 共通モジュール（jobs/common）を参照
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_DIR, "..", "..", "jobs"))
+
+from common.content_archive import ARCHIVE_JOIN, CONTENT_COLUMNS, rehydrate_content
+from common.search_document import build_search_document
+
+# 環境変数読み込み
+load_dotenv()
+
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_NAME = os.environ.get("DB_NAME")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+
+
+def get_db_connection():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+
+def fetch_batch(conn, after_id: str | None, batch_size: int, rebuild: bool) -> list[tuple]:
+    # 退避済みの本文は展開して使う
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT a.id, a.title, a.summary, a.tags, {CONTENT_COLUMNS}
+        FROM articles AS a
+        {ARCHIVE_JOIN}
+        WHERE (%s OR a.search_tsv IS NULL)
+          AND (%s::uuid IS NULL OR a.id > %s::uuid)
+        ORDER BY a.id
+        LIMIT %s
+    """, (rebuild, after_id, after_id, batch_size))
+    rows = [(*row[:4], rehydrate_content(row[4], row[5])) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+def apply_batch(conn, documents: list[tuple]):
+    try:
+        cursor = conn.cursor()
+        execute_values(cursor, """
+            UPDATE articles AS a
+            SET search_tsv = build_search_tsv(v.search_title, v.search_summary, v.search_content)
+            FROM (VALUES %s) AS v(id, search_title, search_summary, search_content)
+            WHERE a.id = v.id
+        """, documents, template="(%s::uuid, %s, %s, %s)", page_size=len(documents))
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="既存記事の全文検索用文書の作成")
+    arg_parser.add_argument("--batch-size", type=int, default=500)
+    arg_parser.add_argument("--rebuild", action="store_true",
+                            help="作成済みの記事も作り直す（分割規則を変更した場合）")
+    arg_parser.add_argument("--after-id", default=None, help="このidより後の記事から再開する（--rebuild の再開用）")
+    arg_parser.add_argument("--sleep", type=float, default=0.0, help="バッチ間の待ち時間（秒。DB負荷の調整用）")
+    arg_parser.add_argument("--dry-run", action="store_true", help="文書を作成するのみでDBは変更しない")
+    args = arg_parser.parse_args()
+
+    print("検索文書作成スクリプト開始")
+    print("=" * 50)
+
+    # DB接続
+    conn = get_db_connection()
+    print("✓ データベース接続成功")
+
+    processed = 0
+    tokenize_seconds = write_seconds = 0.0
+    after_id = args.after_id
+    while True:
+        rows = fetch_batch(conn, after_id, args.batch_size, args.rebuild)
+        if not rows:
+            break
+        after_id = str(rows[-1][0])
+
+        started_at = time.perf_counter()
+        documents = [
+            (str(article_id), *build_search_document(title, summary, tags, content))
+            for article_id, title, summary, tags, content in rows
+        ]
+        tokenize_seconds += time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        if args.dry_run:
+            conn.rollback()
+        else:
+            apply_batch(conn, documents)
+        write_seconds += time.perf_counter() - started_at
+
+        processed += len(rows)
+        print(f"  {processed}件作成 (最終id: {after_id})")
+        if args.sleep:
+            time.sleep(args.sleep)
+
+    mode = "（dry-run。変更なし）" if args.dry_run else ""
+    print(f"\n✓ {processed}件の検索文書を作成しました{mode}")
+    print(f"✓ 分割 {tokenize_seconds:.1f}秒, DB更新 {write_seconds:.1f}秒")
+
+    # DB接続クローズ
+    conn.close()
+    print("\n検索文書作成スクリプト完了")
+
+
+if __name__ == "__main__":
+    main()
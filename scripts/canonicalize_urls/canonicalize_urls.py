@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+既存記事のURLを正規化し、正規化後に同じURLとなる記事を統合するスクリプト
+
+RSS Collector と同じ正規化ルール（rss_feeds.yaml の url_rules）を使用する。
+id順にバッチ単位で処理し、バッチごとにコミットする。
+"""
+import argparse
+import os
+import sys
+import psycopg2
+import yaml
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+# 共通モジュール（jobs/common）を参照
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_DIR, "..", "..", "jobs"))
+
+from common.url_canonical import UrlRules, build_url_rules, canonicalize_url
+
+# 環境変数読み込み
+load_dotenv()
+
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_NAME = os.environ.get("DB_NAME")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+RSS_FEEDS_PATH = os.environ.get(
+    "RSS_FEEDS_PATH", os.path.join(SCRIPT_DIR, "..", "..", "jobs", "rss-collector", "rss_feeds.yaml")
+)
+
+
+def get_db_connection():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+
+def load_source_rules(yaml_path: str) -> tuple[dict[str, UrlRules], UrlRules]:
+    """出典ごとの正規化ルールと、全体のルールを返す"""
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    default_rules = build_url_rules(config.get("url_rules"))
+    source_rules = {
+        source: build_url_rules(source_config.get("url_rules"), base=default_rules)
+        for source, source_config in (config.get("sources") or {}).items()
+    }
+    return source_rules, default_rules
+
+
+def fetch_batch(conn, after_id: str | None, batch_size: int) -> list[tuple]:
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, url, source
+        FROM articles
+        WHERE (%s::uuid IS NULL OR id > %s::uuid)
+        ORDER BY id
+        LIMIT %s
+    """, (after_id, after_id, batch_size))
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def load_existing(conn, urls: list[str]) -> dict[str, str]:
+    """正規化後のURLを持つ既存記事（url -> id）"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT url, id FROM articles WHERE url = ANY(%s)", (urls,))
+    existing = {row[0]: str(row[1]) for row in cursor.fetchall()}
+    cursor.close()
+    return existing
+
+
+def plan_batch(conn, rows: list[tuple], source_rules: dict[str, UrlRules], default_rules: UrlRules,
+               planned: dict[str, str]) -> tuple[list, list]:
+    """
+    URLの付け替え（id, 正規化URL）と統合（残す記事id, 削除する記事id）を決める。
+    正規化後のURLを持つ記事が既にあればその記事に統合し、なければURLを付け替える。
+    planned は実行中に付け替えたURL（dry-run ではDBに反映されないため保持する）。
+    """
+    changes = []
+    for article_id, url, source in rows:
+        canonical = canonicalize_url(url, source_rules.get(source, default_rules))
+        if canonical != url:
+            changes.append((str(article_id), canonical))
+    if not changes:
+        return [], []
+
+    owners = load_existing(conn, list({canonical for _, canonical in changes}))
+    for _, canonical in changes:
+        if canonical in planned:
+            owners.setdefault(canonical, planned[canonical])
+    rekeys, merges = [], []
+    for article_id, canonical in changes:
+        survivor_id = owners.get(canonical)
+        if survivor_id is None:
+            # 同じバッチ内で同じURLになる記事は最初の記事に統合
+            owners[canonical] = article_id
+            planned[canonical] = article_id
+            rekeys.append((article_id, canonical))
+        elif survivor_id != article_id:
+            merges.append((survivor_id, article_id))
+    return rekeys, merges
+
+
+def apply_batch(conn, rekeys: list, merges: list):
+    try:
+        cursor = conn.cursor()
+        if rekeys:
+            execute_values(cursor, """
+                UPDATE articles AS a
+                SET url = v.url
+                FROM (VALUES %s) AS v(id, url)
+                WHERE a.id = v.id
+            """, rekeys, template="(%s::uuid, %s)")
+
+        if merges:
+            # 残す記事に欠けている本文・メタデータを統合元から補完
+            # （同じ記事に複数の記事を統合する場合は統合元を集約し、古い順に最初の値を使う。
+            #   タグ・検索文書は要約と同じ記事から取る。退避済みの本文は退避先の行ごと残す記事に移す）
+            execute_values(cursor, """
+                WITH duplicates AS (
+                    SELECT v.survivor_id,
+                           (array_agg(d.content ORDER BY d.created_at, d.id) FILTER (WHERE d.content IS NOT NULL))[1] AS content,
+                           MIN(d.content_archived_at) AS content_archived_at,
+                           (array_agg(d.image_url ORDER BY d.created_at, d.id) FILTER (WHERE d.image_url IS NOT NULL))[1] AS image_url,
+                           MIN(d.published_date) AS published_date,
+                           (array_agg(d.summary ORDER BY d.created_at, d.id) FILTER (WHERE d.summary IS NOT NULL))[1] AS summary,
+                           (array_agg(d.tags ORDER BY d.created_at, d.id) FILTER (WHERE d.summary IS NOT NULL))[1] AS tags,
+                           (array_agg(d.search_tsv ORDER BY d.created_at, d.id) FILTER (WHERE d.summary IS NOT NULL))[1] AS search_tsv,
+                           bool_or(d.metadata_generated) AS metadata_generated,
+                           MAX(d.relevance_score) AS relevance_score,
+                           MIN(d.created_at) AS created_at
+                    FROM (VALUES %s) AS v(survivor_id, duplicate_id)
+                    JOIN articles AS d ON d.id = v.duplicate_id
+                    GROUP BY v.survivor_id
+                )
+                UPDATE articles AS s
+                SET content = CASE WHEN s.content_archived_at IS NULL THEN COALESCE(s.content, d.content) ELSE s.content END,
+                    content_archived_at = CASE
+                        WHEN s.content IS NULL AND s.content_archived_at IS NULL AND d.content IS NULL
+                        THEN d.content_archived_at ELSE s.content_archived_at END,
+                    image_url = COALESCE(s.image_url, d.image_url),
+                    published_date = COALESCE(s.published_date, d.published_date),
+                    summary = COALESCE(s.summary, d.summary),
+                    tags = CASE WHEN s.summary IS NULL AND d.summary IS NOT NULL THEN d.tags ELSE s.tags END,
+                    search_tsv = CASE WHEN s.summary IS NULL AND d.summary IS NOT NULL THEN d.search_tsv ELSE s.search_tsv END,
+                    metadata_generated = s.metadata_generated OR d.metadata_generated,
+                    relevance_score = COALESCE(s.relevance_score, d.relevance_score),
+                    created_at = LEAST(s.created_at, d.created_at)
+                FROM duplicates AS d
+                WHERE s.id = d.survivor_id
+            """, merges, template="(%s::uuid, %s::uuid)", page_size=len(merges))
+
+            # 本文のない残す記事には、統合元の退避済み本文を移す（削除時の CASCADE で失われないように）
+            execute_values(cursor, """
+                UPDATE article_content_archive AS c
+                SET article_id = m.survivor_id
+                FROM (
+                    SELECT DISTINCT ON (v.survivor_id) v.survivor_id, v.duplicate_id
+                    FROM (VALUES %s) AS v(survivor_id, duplicate_id)
+                    JOIN articles AS d ON d.id = v.duplicate_id
+                    JOIN article_content_archive AS a ON a.article_id = d.id
+                    ORDER BY v.survivor_id, d.created_at, d.id
+                ) AS m
+                JOIN articles AS s ON s.id = m.survivor_id
+                WHERE c.article_id = m.duplicate_id
+                  AND s.content IS NULL
+                  AND NOT EXISTS (SELECT 1 FROM article_content_archive AS e WHERE e.article_id = m.survivor_id)
+            """, merges, template="(%s::uuid, %s::uuid)", page_size=len(merges))
+
+            # 近似重複の参照を付け替えてから削除
+            execute_values(cursor, """
+                UPDATE articles AS a
+                SET duplicate_of = NULLIF(v.survivor_id, a.id)
+                FROM (VALUES %s) AS v(survivor_id, duplicate_id)
+                WHERE a.duplicate_of = v.duplicate_id
+            """, merges, template="(%s::uuid, %s::uuid)")
+            cursor.execute(
+                "DELETE FROM articles WHERE id = ANY(%s::uuid[])",
+                ([duplicate_id for _, duplicate_id in merges],),
+            )
+
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="既存記事のURL正規化・統合")
+    arg_parser.add_argument("--batch-size", type=int, default=1000)
+    arg_parser.add_argument("--dry-run", action="store_true", help="変更内容を表示するのみ")
+    args = arg_parser.parse_args()
+
+    print("URL正規化スクリプト開始")
+    print("=" * 50)
+
+    source_rules, default_rules = load_source_rules(RSS_FEEDS_PATH)
+
+    # DB接続
+    conn = get_db_connection()
+    print("✓ データベース接続成功")
+
+    scanned = rekeyed = merged = 0
+    planned: dict[str, str] = {}
+    after_id = None
+    while True:
+        rows = fetch_batch(conn, after_id, args.batch_size)
+        if not rows:
+            break
+        after_id = str(rows[-1][0])
+        scanned += len(rows)
+
+        rekeys, merges = plan_batch(conn, rows, source_rules, default_rules, planned)
+        if args.dry_run:
+            for article_id, url in rekeys[:5]:
+                print(f"  付け替え: {article_id} -> {url}")
+            for survivor_id, duplicate_id in merges[:5]:
+                print(f"  統合: {duplicate_id} -> {survivor_id}")
+            conn.rollback()
+        else:
+            apply_batch(conn, rekeys, merges)
+
+        rekeyed += len(rekeys)
+        merged += len(merges)
+        print(f"  {scanned}件確認: 付け替え{rekeyed}件, 統合{merged}件")
+
+    mode = "（dry-run。変更なし）" if args.dry_run else ""
+    print(f"\n✓ {scanned}件中 {rekeyed}件のURLを付け替え、{merged}件を統合しました{mode}")
+
+    # DB接続クローズ
+    conn.close()
+    print("\nURL正規化スクリプト完了")
+
+
+if __name__ == "__main__":
+    main()
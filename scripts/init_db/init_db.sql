@@ -22,6 +22,164 @@ CREATE INDEX IF NOT EXISTS idx_source ON articles(source);
 CREATE INDEX IF NOT EXISTS idx_tags ON articles USING GIN(tags);
 CREATE INDEX IF NOT EXISTS idx_metadata_generated ON articles(metadata_generated);
 
+-- メタデータ生成キューの確保（リース）用カラム
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+
+-- 未処理記事のキーセット取得用インデックス
+CREATE INDEX IF NOT EXISTS idx_articles_pending ON articles(created_at DESC, id DESC) WHERE metadata_generated = FALSE;
+
+-- 近似重複の正規記事（重複元）。一覧では duplicate_of IS NULL の記事のみ表示
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS duplicate_of UUID REFERENCES articles(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_articles_duplicate_of ON articles(duplicate_of) WHERE duplicate_of IS NOT NULL;
+
+-- 全文検索用の文書（日本語は文字バイグラム、英語は english 設定で語幹処理。Metadata Generator が更新）
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR;
+CREATE INDEX IF NOT EXISTS idx_articles_search_tsv ON articles USING GIN(search_tsv);
+
+-- 検索文書の作成（引数は jobs/common/search_document.py で分割したトークン列。重み A: タイトル・タグ, B: 要約, C: 本文）
+CREATE OR REPLACE FUNCTION build_search_tsv(title_text TEXT, summary_text TEXT, content_text TEXT)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(title_text, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(summary_text, '')), 'B')
+        || setweight(to_tsvector('english', COALESCE(content_text, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- feed_state テーブル作成（RSSフィードの条件付きGET・既読管理）
+CREATE TABLE IF NOT EXISTS feed_state (
+    feed_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    seen_entry_ids TEXT[] DEFAULT '{}',
+    last_status INTEGER,
+    last_fetched_at TIMESTAMP,
+    last_entry_count INTEGER DEFAULT 0,
+    last_new_entry_count INTEGER DEFAULT 0,
+    fetch_count INTEGER DEFAULT 0,
+    not_modified_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- フィードごとの取得スケジュール（RSS Collector が公開ペースから次回取得時刻を決める）
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS publish_rate DOUBLE PRECISION;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS poll_interval_seconds DOUBLE PRECISION;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS next_poll_at TIMESTAMP;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS consecutive_errors INTEGER DEFAULT 0;
+
+-- date_parse_cache テーブル作成（ローカルで解決できない日付文字列のLLM変換結果）
+CREATE TABLE IF NOT EXISTS date_parse_cache (
+    raw_text TEXT PRIMARY KEY,
+    parsed_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- llm_cache テーブル作成（正規化本文ハッシュ＋プロンプトバージョンをキーにした要約・タグ生成結果）
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,
+    prompt_version TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    tags TEXT[],
+    hit_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_hit_at ON llm_cache(last_hit_at);
+
+-- article_minhash テーブル作成（近似重複判定用の正規記事の MinHash シグネチャ）
+CREATE TABLE IF NOT EXISTS article_minhash (
+    article_id UUID PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- article_lsh_bands テーブル作成（MinHash の LSH バンド。バンドが一致する記事が重複候補）
+CREATE TABLE IF NOT EXISTS article_lsh_bands (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_lsh_bands_article_id ON article_lsh_bands(article_id);
+
+-- llm_batches テーブル作成（Metadata Generator が投入した OpenAI Batch API のバッチ）
+CREATE TABLE IF NOT EXISTS llm_batches (
+    batch_id TEXT PRIMARY KEY,
+    input_file_id TEXT,
+    output_file_id TEXT,
+    error_file_id TEXT,
+    status VARCHAR(20) NOT NULL,
+    prompt_version TEXT NOT NULL,
+    request_count INTEGER NOT NULL,
+    applied_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    applied_at TIMESTAMP
+);
+
+-- 投入前に記録する行（status = 'submitting'）は入力ファイルIDを持たない
+ALTER TABLE llm_batches ALTER COLUMN input_file_id DROP NOT NULL;
+
+-- tags テーブル作成（正規化済みタグの辞書。slug は大文字小文字・全角半角を統一した照合キー）
+CREATE TABLE IF NOT EXISTS tags (
+    id SERIAL PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- article_tags テーブル作成（記事とタグの対応。articles.tags からトリガーで同期）
+CREATE TABLE IF NOT EXISTS article_tags (
+    tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+    article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag_id, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_tags_article_id ON article_tags(article_id);
+
+-- tag_counts テーブル作成（タグごとの記事数。article_tags の増減からトリガーで更新）
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag_id INTEGER PRIMARY KEY REFERENCES tags(id) ON DELETE CASCADE,
+    article_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- article_content_archive テーブル作成（古い記事の本文を zstd 圧縮で退避。退避した記事は articles.content が NULL）
+CREATE TABLE IF NOT EXISTS article_content_archive (
+    article_id UUID PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    codec VARCHAR(20) NOT NULL DEFAULT 'zstd',
+    content_zstd BYTEA NOT NULL,
+    original_bytes INTEGER NOT NULL,
+    compressed_bytes INTEGER NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 圧縮済みのため TOAST の再圧縮（pglz）を行わない
+ALTER TABLE article_content_archive ALTER COLUMN content_zstd SET STORAGE EXTERNAL;
+
+-- 本文の退避日時（article_content_archive への参照。NULL でなければ本文は退避済み）
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS content_archived_at TIMESTAMP;
+
+-- 半導体との関連度（Metadata Generator が LLM 呼び出し前に判定。閾値未満の記事は要約・タグを生成しない）
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS relevance_score REAL;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS metadata_skipped_at TIMESTAMP;
+
+-- 関連度の段階（0〜3。未判定は0）。未処理記事は段階の高い順、同じ段階では新しい順に処理する
+CREATE OR REPLACE FUNCTION relevance_tier(score REAL)
+RETURNS INTEGER AS $$
+    SELECT COALESCE(LEAST(3, floor(score * 4))::INTEGER, 0);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 関連度判定で対象外にした記事は metadata_generated = FALSE のまま metadata_skipped_at を設定し、未処理の対象から外す
+-- （以前の版で metadata_generated = TRUE にした対象外の記事を戻す）
+UPDATE articles SET metadata_generated = FALSE
+WHERE metadata_generated = TRUE AND metadata_skipped_at IS NOT NULL AND summary IS NULL;
+
+DROP INDEX IF EXISTS idx_articles_pending_relevance;
+CREATE INDEX IF NOT EXISTS idx_articles_queue_relevance
+    ON articles(relevance_tier(relevance_score) DESC, created_at DESC, id DESC)
+    WHERE metadata_generated = FALSE AND metadata_skipped_at IS NULL;
+
 -- updated_at自動更新トリガー関数
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -37,3 +195,68 @@ CREATE TRIGGER update_articles_updated_at
     BEFORE UPDATE ON articles
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_feed_state_updated_at ON feed_state;
+CREATE TRIGGER update_feed_state_updated_at
+    BEFORE UPDATE ON feed_state
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_llm_batches_updated_at ON llm_batches;
+CREATE TRIGGER update_llm_batches_updated_at
+    BEFORE UPDATE ON llm_batches
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- articles.tags を article_tags に同期（近似重複の記事は一覧に表示しないため対象外）
+CREATE OR REPLACE FUNCTION sync_article_tags()
+RETURNS TRIGGER AS $$
+DECLARE
+    target_tags TEXT[];
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.tags IS NOT DISTINCT FROM OLD.tags
+       AND NEW.duplicate_of IS NOT DISTINCT FROM OLD.duplicate_of THEN
+        RETURN NULL;
+    END IF;
+
+    target_tags := CASE WHEN NEW.duplicate_of IS NULL THEN COALESCE(NEW.tags, '{}') ELSE '{}' END;
+
+    DELETE FROM article_tags AS at
+    USING tags AS t
+    WHERE at.article_id = NEW.id
+      AND t.id = at.tag_id
+      AND NOT (t.name = ANY(target_tags));
+
+    INSERT INTO article_tags (tag_id, article_id)
+    SELECT t.id, NEW.id FROM tags AS t WHERE t.name = ANY(target_tags)
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_articles_tags ON articles;
+CREATE TRIGGER sync_articles_tags
+    AFTER INSERT OR UPDATE OF tags, duplicate_of ON articles
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_article_tags();
+
+-- article_tags の増減を tag_counts に反映
+CREATE OR REPLACE FUNCTION update_tag_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO tag_counts (tag_id, article_count) VALUES (NEW.tag_id, 1)
+        ON CONFLICT (tag_id) DO UPDATE SET article_count = tag_counts.article_count + 1;
+    ELSE
+        UPDATE tag_counts SET article_count = article_count - 1 WHERE tag_id = OLD.tag_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_article_tags_counts ON article_tags;
+CREATE TRIGGER update_article_tags_counts
+    AFTER INSERT OR DELETE ON article_tags
+    FOR EACH ROW
+    EXECUTE FUNCTION update_tag_counts();
@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
 """
-既存記事の出典名を正規化するスクリプト
+既存記事の出典名を統一し、不要な出典の記事を削除するスクリプト
+
+ルールは source_rules.yaml（統一: aliases, 削除: deny）で定義する。
+出典ごとの件数を1回の GROUP BY で集計して対象を決め、記事を id 順のチャンク単位で
+1つの UPDATE / DELETE（FROM VALUES）で処理し、チャンクごとにコミットする。
 """
+import argparse
 import os
+import time
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+
 import psycopg2
+import yaml
 from dotenv import load_dotenv
 
 # 環境変数読み込み
 load_dotenv()
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
 DB_HOST = os.environ.get("DB_HOST")
 DB_PORT = os.environ.get("DB_PORT", "5432")
 DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
+SOURCE_RULES_PATH = os.environ.get("SOURCE_RULES_PATH", os.path.join(SCRIPT_DIR, "source_rules.yaml"))
+RSS_FEEDS_PATH = os.environ.get(
+    "RSS_FEEDS_PATH", os.path.join(SCRIPT_DIR, "..", "..", "jobs", "rss-collector", "rss_feeds.yaml")
+)
 
 
 def get_db_connection():
@@ -26,121 +42,191 @@ def get_db_connection():
     )
 
 
-def show_current_sources(conn):
-    """現在の出典を表示"""
-    print("\n=== 現在の出典一覧 ===")
+# -- ルール --------------
+@dataclass
+class SourceRules:
+    deny: list[str] = field(default_factory=list)                      # 削除する出典のパターン
+    aliases: list[tuple[str, str]] = field(default_factory=list)       # (パターン, 統一後の出典名)
+
+    def resolve(self, source: str) -> tuple[str, str | None] | None:
+        """("delete", None) / ("rename", 統一後の出典名) / None（変更なし）"""
+        if any(fnmatchcase(source, pattern) for pattern in self.deny):
+            return "delete", None
+        for pattern, target in self.aliases:
+            if fnmatchcase(source, pattern):
+                return ("rename", target) if source != target else None
+        return None
+
+
+def load_source_rules(path: str) -> SourceRules:
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return SourceRules(
+        deny=[str(pattern) for pattern in config.get("deny") or []],
+        aliases=[
+            (str(pattern), str(target))
+            for target, patterns in (config.get("aliases") or {}).items()
+            for pattern in patterns or []
+        ],
+    )
+
+
+def load_feed_sources(path: str) -> set[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return set((yaml.safe_load(f) or {}).get("sources") or {})
+
+
+# -- 対象の集計（1回の GROUP BY） --------------
+def count_sources(conn) -> dict[str, int]:
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT source, COUNT(*) as count 
-        FROM articles 
-        GROUP BY source 
+        SELECT source, COUNT(*) AS count
+        FROM articles
+        GROUP BY source
         ORDER BY count DESC
     """)
-    
-    results = cursor.fetchall()
-    for source, count in results:
-        print(f"  {source}: {count}件")
-    
+    counts = dict(cursor.fetchall())
     cursor.close()
-    print(f"\n合計: {sum(row[1] for row in results)}件")
+    return counts
+
+
+def plan_changes(counts: dict[str, int], rules: SourceRules) -> dict[str, str | None]:
+    """出典ごとの変更（統一後の出典名。削除は None）"""
+    plan = {}
+    for source in counts:
+        action = rules.resolve(source or "")
+        if action is not None:
+            plan[source] = action[1]
+    return plan
+
+
+def show_plan(counts: dict[str, int], plan: dict[str, str | None]):
+    deleted = {source: counts[source] for source, target in plan.items() if target is None}
+    renamed = {source: counts[source] for source, target in plan.items() if target is not None}
+
+    print("\n=== 削除対象 ===")
+    for source, count in deleted.items():
+        print(f"  '{source}': {count}件")
+    print("\n=== 統一対象 ===")
+    for source, count in renamed.items():
+        print(f"  '{source}' -> '{plan[source]}': {count}件")
+    print(f"\n削除 {sum(deleted.values())}件, 更新 {sum(renamed.values())}件")
+
+
+def show_sources(counts: dict[str, int], feed_sources: set[str]):
+    print("\n=== 出典一覧 ===")
+    for source, count in counts.items():
+        mark = "" if source in feed_sources else "（rss_feeds.yaml に未定義）"
+        print(f"  {source}: {count}件{mark}")
+    print(f"\n合計: {sum(counts.values())}件")
+
+
+# -- チャンク単位の適用（主キー順。チャンクごとにコミット） --------------
+APPLY_CHUNK_QUERY = """
+    WITH changes(source, target) AS (VALUES {changes}),
+    chunk AS (
+        SELECT a.id, c.target
+        FROM articles AS a
+        JOIN changes AS c ON c.source = a.source
+        WHERE %s::uuid IS NULL OR a.id > %s::uuid
+        ORDER BY a.id
+        LIMIT %s
+    ),
+    updated AS (
+        UPDATE articles AS a
+        SET source = chunk.target
+        FROM chunk
+        WHERE a.id = chunk.id AND chunk.target IS NOT NULL
+    ),
+    deleted AS (
+        DELETE FROM articles AS a
+        USING chunk
+        WHERE a.id = chunk.id AND chunk.target IS NULL
+    )
+    SELECT (array_agg(id ORDER BY id DESC))[1],
+           COUNT(*) FILTER (WHERE target IS NOT NULL),
+           COUNT(*) FILTER (WHERE target IS NULL)
+    FROM chunk
+"""
 
 
-def delete_unwanted_sources(conn):
-    """不要な出典の記事を削除"""
+def build_apply_query(conn, plan: dict[str, str | None]) -> str:
+    """変更内容を VALUES に埋め込んだチャンク処理のクエリ（チャンクごとに id 範囲のみ渡す）"""
     cursor = conn.cursor()
-
-    sources_to_delete = ['マイナビニュース', 'Semiconductor Today', 'Semiconductor-today']
-    total_deleted = 0
-
-    for source in sources_to_delete:
-        cursor.execute("""
-            DELETE FROM articles
-            WHERE source = %s
-            RETURNING id
-        """, (source,))
-
-        deleted_count = cursor.rowcount
-        if deleted_count > 0:
-            print(f"  '{source}': {deleted_count}件削除")
-            total_deleted += deleted_count
-
-    conn.commit()
+    values = ", ".join(
+        cursor.mogrify("(%s, %s::text)", (source, target)).decode("utf-8") for source, target in plan.items()
+    )
     cursor.close()
+    return APPLY_CHUNK_QUERY.format(changes=values.replace("%", "%%"))
 
-    return total_deleted
-
-
-def normalize_sources(conn):
-    """出典名を正規化"""
-    cursor = conn.cursor()
-
-    updates = [
-        # ITmedia系を統一
-        ("ITmedia", "ITmedia%", "ITmedia"),
-
-        # マイナビ系を統一
-        ("マイナビ Tech+", "マイナビ%", "マイナビ Tech+"),
-        ("マイナビ Tech+", "TECH+%", None),  # TECH+系もマイナビ Tech+に統一
-
-        # 日経系を統一
-        ("日経XTECH", "日経%", "日経XTECH"),
-    ]
-
-    total_updated = 0
-
-    for target, pattern, exclude in updates:
-        if exclude:
-            cursor.execute("""
-                UPDATE articles
-                SET source = %s
-                WHERE source LIKE %s AND source != %s
-                RETURNING id
-            """, (target, pattern, exclude))
-        else:
-            cursor.execute("""
-                UPDATE articles
-                SET source = %s
-                WHERE source LIKE %s
-                RETURNING id
-            """, (target, pattern))
-
-        updated_count = cursor.rowcount
-        if updated_count > 0:
-            print(f"  '{pattern}' -> '{target}': {updated_count}件更新")
-            total_updated += updated_count
-
-    conn.commit()
-    cursor.close()
 
-    return total_updated
+def apply_chunk(conn, query: str, after_id: str | None, batch_size: int) -> tuple[str | None, int, int]:
+    """(チャンクの最終id, 更新件数, 削除件数)。対象がなくなれば最終idは None"""
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, (after_id, after_id, batch_size))
+        last_id, updated, deleted = cursor.fetchone()
+        conn.commit()
+        cursor.close()
+        return (str(last_id) if last_id else None), updated, deleted
+    except Exception:
+        conn.rollback()
+        raise
 
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="出典名の統一・不要な出典の記事削除")
+    arg_parser.add_argument("--rules", default=SOURCE_RULES_PATH, help="ルールファイル（YAML）")
+    arg_parser.add_argument("--batch-size", type=int, default=1000, help="1チャンクで処理する記事数")
+    arg_parser.add_argument("--sleep", type=float, default=0.0, help="チャンク間の待ち時間（秒）")
+    arg_parser.add_argument("--dry-run", action="store_true", help="対象件数を表示するのみ")
+    args = arg_parser.parse_args()
+
     print("出典名正規化スクリプト開始")
     print("=" * 50)
 
+    rules = load_source_rules(args.rules)
+    feed_sources = load_feed_sources(RSS_FEEDS_PATH)
+
     # DB接続
     conn = get_db_connection()
     print("✓ データベース接続成功")
 
-    # 現在の出典を表示
-    show_current_sources(conn)
-
-    # 不要な出典を削除
-    print("\n=== 不要な出典を削除中 ===")
-    deleted = delete_unwanted_sources(conn)
-
-    # 正規化実行
-    print("\n=== 出典名を正規化中 ===")
-    updated = normalize_sources(conn)
-
-    if deleted > 0 or updated > 0:
-        print(f"\n✓ {deleted}件の記事を削除、{updated}件の記事を更新しました")
+    # 出典ごとの件数から対象を決める
+    counts = count_sources(conn)
+    conn.rollback()
+    show_sources(counts, feed_sources)
+    plan = plan_changes(counts, rules)
+    show_plan(counts, plan)
 
-        # 更新後の出典を表示
-        show_current_sources(conn)
-    else:
+    if not plan:
         print("\n更新対象の記事はありませんでした")
+        conn.close()
+        return
+    if args.dry_run:
+        print("\n（dry-run。変更なし）")
+        conn.close()
+        return
+
+    print("\n=== 適用中 ===")
+    query = build_apply_query(conn, plan)
+    total_updated = total_deleted = 0
+    after_id = None
+    while True:
+        after_id, updated, deleted = apply_chunk(conn, query, after_id, args.batch_size)
+        if after_id is None:
+            break
+        total_updated += updated
+        total_deleted += deleted
+        print(f"  更新 {total_updated}件, 削除 {total_deleted}件")
+        if args.sleep:
+            time.sleep(args.sleep)
+
+    print(f"\n✓ {total_deleted}件の記事を削除、{total_updated}件の記事を更新しました")
+
+    # 更新後の出典を表示
+    show_sources(count_sources(conn), feed_sources)
+    conn.rollback()
 
     # DB接続クローズ
     conn.close()
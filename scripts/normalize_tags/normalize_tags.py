@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+既存記事のタグを正規化し、tags / article_tags / tag_counts に移行するスクリプト
+
+Metadata Generator と同じ正規化ルール（jobs/common/tag_aliases.yaml）を使用する。
+id順にバッチ単位で処理し、バッチごとにコミットする。
+"""
+import argparse
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+# 共通モジュール（jobs/common）を参照
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_DIR, "..", "..", "jobs"))
+
+from common.tag_normalizer import DEFAULT_TAG_ALIASES_PATH, TagDictionary, TagNormalizer, load_tag_rules
+
+# 環境変数読み込み
+load_dotenv()
+
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_NAME = os.environ.get("DB_NAME")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+TAG_ALIASES_PATH = os.environ.get("TAG_ALIASES_PATH", DEFAULT_TAG_ALIASES_PATH)
+
+
+def get_db_connection():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+
+def fetch_batch(conn, after_id: str | None, batch_size: int) -> list[tuple]:
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, tags
+        FROM articles
+        WHERE tags IS NOT NULL
+          AND (%s::uuid IS NULL OR id > %s::uuid)
+        ORDER BY id
+        LIMIT %s
+    """, (after_id, after_id, batch_size))
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def apply_batch(conn, article_ids: list[str], updates: list[tuple]):
+    """
+    タグが変わる記事を更新し（article_tags はトリガーで同期）、
+    タグが変わらない記事も含めてバッチ内の article_tags を補完する。
+    """
+    try:
+        cursor = conn.cursor()
+        if updates:
+            execute_values(cursor, """
+                UPDATE articles AS a
+                SET tags = v.tags
+                FROM (VALUES %s) AS v(id, tags)
+                WHERE a.id = v.id
+            """, updates, template="(%s::uuid, %s::text[])")
+
+        cursor.execute("""
+            INSERT INTO article_tags (tag_id, article_id)
+            SELECT t.id, a.id
+            FROM articles AS a
+            CROSS JOIN LATERAL unnest(a.tags) AS tag(name)
+            JOIN tags AS t ON t.name = tag.name
+            WHERE a.id = ANY(%s::uuid[])
+              AND a.duplicate_of IS NULL
+            ON CONFLICT DO NOTHING
+        """, (article_ids,))
+        conn.commit()
+        cursor.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def rebuild_counts(conn) -> int:
+    """tag_counts を article_tags から再集計する"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO tag_counts (tag_id, article_count)
+        SELECT t.id, COUNT(at.article_id)
+        FROM tags AS t
+        LEFT JOIN article_tags AS at ON at.tag_id = t.id
+        GROUP BY t.id
+        ON CONFLICT (tag_id) DO UPDATE SET article_count = EXCLUDED.article_count
+        WHERE tag_counts.article_count IS DISTINCT FROM EXCLUDED.article_count
+    """)
+    corrected = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return corrected
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="既存記事のタグ正規化・タグ辞書への移行")
+    arg_parser.add_argument("--batch-size", type=int, default=1000)
+    arg_parser.add_argument("--dry-run", action="store_true", help="変更内容を表示するのみ")
+    arg_parser.add_argument("--rebuild-counts", action="store_true", help="最後に tag_counts を再集計する")
+    args = arg_parser.parse_args()
+
+    print("タグ正規化スクリプト開始")
+    print("=" * 50)
+
+    normalizer = TagNormalizer(load_tag_rules(TAG_ALIASES_PATH))
+
+    # DB接続
+    conn = get_db_connection()
+    print("✓ データベース接続成功")
+
+    # dry-run ではタグ辞書に登録せず、正規化結果のみ確認する
+    dictionary = None if args.dry_run else TagDictionary(conn, normalizer)
+
+    scanned = updated = 0
+    after_id = None
+    while True:
+        rows = fetch_batch(conn, after_id, args.batch_size)
+        if not rows:
+            break
+        after_id = str(rows[-1][0])
+        scanned += len(rows)
+
+        updates = []
+        for article_id, tags in rows:
+            normalized = dictionary.resolve(tags) if dictionary is not None else normalizer.normalize(tags)
+            if normalized != tags:
+                updates.append((str(article_id), normalized))
+
+        if args.dry_run:
+            for article_id, tags in updates[:5]:
+                print(f"  {article_id}: {', '.join(tags)}")
+            conn.rollback()
+        else:
+            apply_batch(conn, [str(row[0]) for row in rows], updates)
+
+        updated += len(updates)
+        print(f"  {scanned}件確認: タグ変更{updated}件")
+
+    mode = "（dry-run。変更なし）" if args.dry_run else ""
+    print(f"\n✓ {scanned}件中 {updated}件のタグを正規化しました{mode}")
+    if dictionary is not None:
+        print(f"✓ タグ辞書: {len(dictionary.names)}件")
+
+    if args.rebuild_counts and not args.dry_run:
+        corrected = rebuild_counts(conn)
+        print(f"✓ tag_counts を再集計: {corrected}件更新")
+
+    # DB接続クローズ
+    conn.close()
+    print("\nタグ正規化スクリプト完了")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Metadata Generator の関連度判定モデル（jobs/metadata-generator/relevance.py）を学習するスクリプト
+
+要約・タグ生成済みの記事のうち、タグに「半導体」（--label-tag）を含む記事を正例として、
+タイトルと本文の先頭の TF-IDF（search_tokens で分割）からロジスティック回帰を学習する。
+学習用と評価用に分け、評価用の記事でキーワード辞書のみ・モデルのみ・併用（本番と同じ）の
+適合率・再現率・対象外にする割合を表示してからモデルをJSONで保存する。外部の機械学習ライブラリは使わない。
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+import psycopg2
+from dotenv import load_dotenv
+
+# 共通モジュール（jobs/common）と Metadata Generator のモジュールを参照
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DIR = os.path.join(SCRIPT_DIR, "..", "..", "jobs")
+sys.path.append(JOBS_DIR)
+sys.path.append(os.path.join(JOBS_DIR, "metadata-generator"))
+
+from common.content_archive import ARCHIVE_JOIN, CONTENT_COLUMNS, rehydrate_content
+from common.search_document import search_tokens
+from relevance import (DEFAULT_RELEVANCE_MODEL_PATH, DEFAULT_THRESHOLD, RelevanceModel, RelevanceScorer,
+                       load_relevance_rules, model_text)
+
+# 環境変数読み込み
+load_dotenv()
+
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_NAME = os.environ.get("DB_NAME")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+
+
+def get_db_connection():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+
+# -- 学習データ（LLMで要約・タグを生成した記事。対象外にした記事・近似重複の記事は除く） --------------
+def load_examples(conn, label_tag: str, limit: int | None, batch_size: int) -> list[dict]:
+    # 件数が多いためサーバー側カーソルで読み込む。退避済みの本文は展開して使う
+    cursor = conn.cursor(name="train_relevance_examples")
+    cursor.itersize = batch_size
+    cursor.execute(f"""
+        SELECT a.title, a.source, {CONTENT_COLUMNS}, %s = ANY(a.tags)
+        FROM articles AS a
+        {ARCHIVE_JOIN}
+        WHERE a.metadata_generated = TRUE
+          AND a.metadata_skipped_at IS NULL
+          AND a.summary IS NOT NULL
+          AND a.duplicate_of IS NULL
+        ORDER BY a.created_at DESC
+        LIMIT %s
+    """, (label_tag, limit))
+    examples = [
+        {"title": title, "source": source, "content": rehydrate_content(content, content_zstd), "label": bool(label)}
+        for title, source, content, content_zstd, label in cursor
+    ]
+    cursor.close()
+    conn.rollback()
+    return examples
+
+
+# -- TF-IDF --------------
+def build_idf(documents: list[list[str]], min_df: int, max_features: int) -> dict[str, float]:
+    """文書頻度が min_df 以上の語のうち頻度の高い max_features 語の IDF（平滑化あり）"""
+    document_frequency = Counter(token for tokens in documents for token in set(tokens))
+    vocabulary = [token for token, count in document_frequency.most_common(max_features) if count >= min_df]
+    total = len(documents)
+    return {token: math.log((1 + total) / (1 + document_frequency[token])) + 1 for token in vocabulary}
+
+
+# -- ロジスティック回帰（確率的勾配降下法、L2正則化） --------------
+def train_logistic(vectors: list[dict[str, float]], labels: list[bool], epochs: int, learning_rate: float,
+                   l2: float, seed: int) -> tuple[dict[str, float], float]:
+    # 正例が少ないため、正例・負例の重みを件数の逆数で均等にする
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    class_weight = {True: len(labels) / (2 * max(1, positives)), False: len(labels) / (2 * max(1, negatives))}
+
+    weights: dict[str, float] = {}
+    bias = 0.0
+    order = list(range(len(vectors)))
+    rng = random.Random(seed)
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        rate = learning_rate / (1 + epoch)
+        loss = 0.0
+        for index in order:
+            vector, label = vectors[index], labels[index]
+            z = bias + sum(weights.get(token, 0.0) * value for token, value in vector.items())
+            probability = 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+            gradient = (probability - label) * class_weight[label]
+            loss -= class_weight[label] * math.log(max(1e-12, probability if label else 1 - probability))
+            for token, value in vector.items():
+                weight = weights.get(token, 0.0)
+                weights[token] = weight - rate * (gradient * value + l2 * weight)
+            bias -= rate * gradient
+        print(f"  エポック {epoch + 1}/{epochs}: 損失 {loss / max(1, len(vectors)):.4f}")
+
+    return {token: weight for token, weight in weights.items() if abs(weight) > 1e-6}, bias
+
+
+# -- 評価（閾値以上を「処理する」とみなした適合率・再現率と、対象外にする割合） --------------
+def evaluate(name: str, scores: list[float], labels: list[bool], threshold: float) -> dict:
+    kept = [score >= threshold for score in scores]
+    true_positive = sum(1 for keep, label in zip(kept, labels) if keep and label)
+    precision = true_positive / sum(kept) if any(kept) else 0.0
+    recall = true_positive / sum(labels) if any(labels) else 0.0
+    skip_ratio = 1 - sum(kept) / len(kept) if kept else 0.0
+    print(f"  {name:<12} 適合率 {precision:.3f}, 再現率 {recall:.3f}, 対象外 {skip_ratio:.1%}")
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "skip_ratio": round(skip_ratio, 4)}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="関連度判定モデルの学習")
+    arg_parser.add_argument("--output", default=DEFAULT_RELEVANCE_MODEL_PATH, help="モデルの保存先（JSON）")
+    arg_parser.add_argument("--label-tag", default="半導体", help="正例とするタグ")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="評価に使う閾値（RELEVANCE_THRESHOLD）")
+    arg_parser.add_argument("--min-df", type=int, default=3, help="語彙に含める最小の文書頻度")
+    arg_parser.add_argument("--max-features", type=int, default=20000, help="語彙数の上限")
+    arg_parser.add_argument("--epochs", type=int, default=5)
+    arg_parser.add_argument("--learning-rate", type=float, default=0.5)
+    arg_parser.add_argument("--l2", type=float, default=1e-5, help="L2正則化の係数")
+    arg_parser.add_argument("--holdout", type=float, default=0.2, help="評価用に分ける記事の割合")
+    arg_parser.add_argument("--limit", type=int, default=None, help="学習に使う記事数の上限（新しい順）")
+    arg_parser.add_argument("--batch-size", type=int, default=2000, help="DBから読み込む単位")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--dry-run", action="store_true", help="学習・評価のみでモデルを保存しない")
+    args = arg_parser.parse_args()
+
+    print("関連度判定モデル学習スクリプト開始")
+    print("=" * 50)
+
+    # DB接続
+    conn = get_db_connection()
+    print("✓ データベース接続成功")
+
+    started_at = time.perf_counter()
+    examples = load_examples(conn, args.label_tag, args.limit, args.batch_size)
+    conn.close()
+    positives = sum(example["label"] for example in examples)
+    print(f"✓ {len(examples)}件読み込み（正例 {positives}件, {time.perf_counter() - started_at:.1f}秒）")
+    if not positives or positives == len(examples):
+        print("✗ 正例・負例の両方が必要です")
+        sys.exit(1)
+
+    # 学習用・評価用に分割
+    random.Random(args.seed).shuffle(examples)
+    holdout_count = int(len(examples) * args.holdout)
+    test, train = examples[:holdout_count], examples[holdout_count:]
+
+    # 学習（IDFは学習用の記事のみから計算）
+    started_at = time.perf_counter()
+    train_tokens = [search_tokens(model_text(example["title"], example["content"])) for example in train]
+    idf = build_idf(train_tokens, args.min_df, args.max_features)
+    model = RelevanceModel(idf=idf, weights={}, bias=0.0)
+    vectors = [model.vectorize(tokens) for tokens in train_tokens]
+    model.weights, model.bias = train_logistic(vectors, [example["label"] for example in train], args.epochs,
+                                               args.learning_rate, args.l2, args.seed)
+    print(f"✓ 学習 {len(train)}件, 語彙 {len(idf)}語, 重み {len(model.weights)}語 ({time.perf_counter() - started_at:.1f}秒)")
+
+    # 評価（本番と同じく、出典による判定とキーワード・モデルの大きい方を使う）
+    metrics = {}
+    if test:
+        print(f"\n評価 {len(test)}件（閾値 {args.threshold}）")
+        labels = [example["label"] for example in test]
+        keyword_scorer = RelevanceScorer(load_relevance_rules())
+        combined_scorer = RelevanceScorer(keyword_scorer.rules, model)
+        metrics = {
+            "keyword": evaluate("キーワード", [keyword_scorer.score(e["title"], e["content"], e["source"]) for e in test],
+                                labels, args.threshold),
+            "model": evaluate("モデル", [model.predict(model_text(e["title"], e["content"])) for e in test],
+                              labels, args.threshold),
+            "combined": evaluate("併用", [combined_scorer.score(e["title"], e["content"], e["source"]) for e in test],
+                                 labels, args.threshold),
+        }
+
+    if args.dry_run:
+        print("\n✓ dry-run のためモデルは保存しません")
+    else:
+        model.metadata = {
+            "label_tag": args.label_tag,
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "train_count": len(train),
+            "positive_count": positives,
+            "holdout": metrics,
+        }
+        model.save(args.output)
+        print(f"\n✓ モデルを保存しました: {args.output} ({os.path.getsize(args.output) / 1024:.0f}KB)")
+
+    print("\n関連度判定モデル学習スクリプト完了")
+
+
+if __name__ == "__main__":
+    main()